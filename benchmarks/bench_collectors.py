@@ -0,0 +1,214 @@
+"""
+Benchmark: пропускна здатність колекторів на локальних mock-сервісах
+Records/s та bytes/s для кожного колектора без доступу до мережі
+
+Usage:
+    python benchmarks/bench_collectors.py
+    python benchmarks/bench_collectors.py --latency 0.05 --error-rate 0.02 --page-limit 500
+    python benchmarks/bench_collectors.py --collectors gbif obis shipping --json results.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_services import DEFAULT_BBOX, MockConfig, MockServiceServer, install_client_shims
+from utils.http_session import get_session
+
+SPECIES = 'Zalophus californianus'
+
+
+def run_gbif(server, workdir, args):
+    from data_collection.gbif_obis_collector import GBIFOBISCollector
+    collector = GBIFOBISCollector(data_dir=workdir, max_workers=args.workers)
+    return len(collector.collect_from_gbif(SPECIES, DEFAULT_BBOX, limit=None)), 'records'
+
+
+def run_obis(server, workdir, args):
+    from data_collection.gbif_obis_collector import GBIFOBISCollector
+    collector = GBIFOBISCollector(data_dir=workdir, max_workers=args.workers)
+    return len(collector.collect_from_obis(SPECIES, DEFAULT_BBOX, max_records=None)), 'records'
+
+
+def run_ocearch(server, workdir, args):
+    from data_collection.ocearch_collector import OCEARCHCollector
+    collector = OCEARCHCollector(data_dir=workdir)
+    collector.base_url = server.url('ocearch')
+    tracks = collector.collect_all_white_shark_tracks(
+        save=False, max_workers=args.workers, checkpoint=False
+    )
+    return len(tracks), 'points'
+
+
+def run_shipping(server, workdir, args):
+    from data_collection.shipping_lanes_collector import ShippingLanesCollector
+    collector = ShippingLanesCollector(data_dir=workdir, max_workers=args.workers)
+    collector.layer_url = server.url('arcgis/lanes')
+    collector.base_url = f"{collector.layer_url}/query"
+    lanes = collector.download_shipping_lanes(DEFAULT_BBOX, save=True, max_allowable_offset=0.05)
+    return len(lanes), 'features'
+
+
+def run_woa(server, workdir, args):
+    from data_collection.woa_collector import WOACollector
+    collector = WOACollector(data_dir=workdir)
+    collector.base_url = server.url('grid/woa/')
+    collector.download_oxygen(save=True)
+    return 1, 'files'
+
+
+def _date_range(args):
+    """Діапазон дат довжиною args.months місяців від 2020-01-01"""
+    start = pd.Timestamp('2020-01-01')
+    end = start + pd.DateOffset(months=args.months) - pd.Timedelta(days=1)
+    return (str(start.date()), str(end.date()))
+
+
+def run_modis_sst(server, workdir, args):
+    from data_collection.nasa_ocean_collector import NASAOceanCollector
+    collector = NASAOceanCollector(data_dir=workdir, max_workers=args.workers)
+    collector.download_modis_sst(_date_range(args), DEFAULT_BBOX, save=True)
+    return args.months, 'granules'
+
+
+def run_modis_chlorophyll(server, workdir, args):
+    from data_collection.nasa_ocean_collector import NASAOceanCollector
+    collector = NASAOceanCollector(data_dir=workdir, max_workers=args.workers)
+    collector.download_modis_chlorophyll(_date_range(args), DEFAULT_BBOX, save=True)
+    return args.months, 'granules'
+
+
+def run_smap(server, workdir, args):
+    from data_collection.smap_collector import SMAPCollector
+    collector = SMAPCollector(data_dir=workdir, max_workers=args.workers)
+    collector.download_salinity(_date_range(args), DEFAULT_BBOX, save=True)
+    return args.months, 'granules'
+
+
+def run_copernicus(server, workdir, args):
+    from data_collection.copernicus_collector import CopernicusCollector
+    collector = CopernicusCollector(data_dir=workdir, max_workers=args.workers)
+    collector.download_sea_level_anomaly(_date_range(args), DEFAULT_BBOX, save=True)
+    return args.months, 'windows'
+
+
+def run_gfw(server, workdir, args):
+    from data_collection.gfw_collector import GFWCollector
+    collector = GFWCollector(api_token='mock', data_dir=workdir)
+    effort = collector.download_fishing_effort(_date_range(args), DEFAULT_BBOX, save=True)
+    return len(effort), 'records'
+
+
+def run_gebco(server, workdir, args):
+    from data_collection.gebco_collector import GEBCOCollector
+    collector = GEBCOCollector(data_dir=workdir)
+    grid = collector.download_bathymetry(DEFAULT_BBOX, save=True)
+    return int(grid.size), 'cells'
+
+
+COLLECTORS = {
+    'gbif': run_gbif,
+    'obis': run_obis,
+    'ocearch': run_ocearch,
+    'shipping': run_shipping,
+    'woa': run_woa,
+    'modis_sst': run_modis_sst,
+    'modis_chlorophyll': run_modis_chlorophyll,
+    'smap': run_smap,
+    'copernicus': run_copernicus,
+    'gfw': run_gfw,
+    'gebco': run_gebco,
+}
+
+
+def run_one(name, server, args) -> dict:
+    """Запустити один колектор і зібрати метрики"""
+    server.reset_stats()
+
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+        start = time.perf_counter()
+        try:
+            n, unit = COLLECTORS[name](server, workdir, args)
+            error = None
+        except Exception as e:
+            n, unit, error = 0, '-', f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+
+    stats = server.stats()
+    return {
+        'collector': name,
+        'seconds': round(seconds, 3),
+        'items': n,
+        'unit': unit,
+        'items_per_s': round(n / seconds, 1) if seconds > 0 else None,
+        'requests': stats['requests'],
+        'errors_injected': stats['errors'],
+        'bytes': stats['bytes'],
+        'mb_per_s': round(stats['bytes'] / 1e6 / seconds, 2) if seconds > 0 else None,
+        'error': error
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collector throughput benchmark on mock services")
+    parser.add_argument('--collectors', nargs='+', choices=sorted(COLLECTORS),
+                        default=list(COLLECTORS), help='Collectors to run')
+    parser.add_argument('--latency', type=float, default=0.02, help='Per-response latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of 503 responses')
+    parser.add_argument('--page-limit', type=int, default=1000, help='Max records per page')
+    parser.add_argument('--records', type=int, default=20000, help='GBIF/OBIS/GFW records in bbox')
+    parser.add_argument('--features', type=int, default=5000, help='ArcGIS features')
+    parser.add_argument('--sharks', type=int, default=40, help='OCEARCH sharks')
+    parser.add_argument('--grid-size', type=int, default=400, help='NetCDF grid size (lat, lon)')
+    parser.add_argument('--months', type=int, default=12, help='Months of gridded data')
+    parser.add_argument('--workers', type=int, default=4, help='Collector worker threads')
+    parser.add_argument('--json', type=str, default=None, help='Write results to JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show collector logs')
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency, error_rate=args.error_rate, page_limit=args.page_limit,
+        n_records=args.records, n_sharks=args.sharks, n_features=args.features,
+        grid_size=args.grid_size
+    )
+
+    # Колектори викликають logging.basicConfig(INFO) при імпорті -
+    # налаштувати root logger раніше, щоб їхній виклик нічого не змінив
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    with MockServiceServer(config) as server:
+        # Shim-и (earthaccess, pygbif, ...) ходять через ту ж сесію з повторами,
+        # що й HTTP-колектори, - інакше з --error-rate результати непорівнянні
+        install_client_shims(server, get_session())
+
+        print(f"Mock services at {server.base_url} "
+              f"(latency {args.latency}s, error rate {args.error_rate}, page limit {args.page_limit})")
+        print(f"{'collector':<18} {'time, s':>8} {'items':>9} {'unit':<9} {'items/s':>10} "
+              f"{'requests':>8} {'MB':>8} {'MB/s':>7}")
+
+        results = []
+        for name in args.collectors:
+            result = run_one(name, server, args)
+            results.append(result)
+            print(f"{name:<18} {result['seconds']:>8.2f} {result['items']:>9} {result['unit']:<9} "
+                  f"{result['items_per_s'] or 0:>10.1f} {result['requests']:>8} "
+                  f"{result['bytes'] / 1e6:>8.2f} {result['mb_per_s'] or 0:>7.2f}")
+            if result['error']:
+                print(f"    FAILED: {result['error']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Benchmark: час і пікова пам'ять етапів обробки на синтетичних даних
+Wall time та peak RSS кожного етапу для small/regional/global bbox
+
+Дані генеруються SyntheticOceanDataGenerator у форматах колекторів,
+записуються у тимчасову директорію і читаються назад, як у main.py.
+
+Usage:
+    python benchmarks/bench_processing.py
+    python benchmarks/bench_processing.py --presets small regional --json results.json
+    python benchmarks/bench_processing.py --presets global --stages sst bathymetry
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import geopandas as gpd
+import xarray as xr
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from utils.profiling import PeakMemoryMonitor
+
+# Розміри сценаріїв: bbox, кількість точок і часових кроків
+PRESETS = {
+    'small': {
+        'bbox': {'min_lon': -125, 'max_lon': -120, 'min_lat': 33, 'max_lat': 38},
+        'date_range': ('2020-06-01', '2020-08-31'),
+        'n_track_points': 500,
+        'n_occurrences': 500,
+        'n_lanes': 20,
+        'bathymetry_resolution': 1 / 240
+    },
+    'regional': {
+        'bbox': {'min_lon': -130, 'max_lon': -110, 'min_lat': 25, 'max_lat': 45},
+        'date_range': ('2020-06-01', '2020-08-31'),
+        'n_track_points': 5000,
+        'n_occurrences': 5000,
+        'n_lanes': 200,
+        'bathymetry_resolution': 1 / 120
+    },
+    'global': {
+        'bbox': {'min_lon': -180, 'max_lon': 180, 'min_lat': -80, 'max_lat': 80},
+        'date_range': ('2020-07-01', '2020-07-31'),
+        'n_track_points': 20000,
+        'n_occurrences': 20000,
+        'n_lanes': 2000,
+        'bathymetry_resolution': 1 / 30
+    }
+}
+
+
+def stage_sst(ctx):
+    ds = xr.open_dataset(ctx['paths']['sst'])
+    ctx['sst'] = ctx['standardizer'].process_sst(ds)
+    return int(ds['sst'].size), 'cells'
+
+
+def stage_sst_gradient(ctx):
+    gradient = ctx['standardizer'].process_sst_gradient(ctx['sst'])
+    return int(gradient.size), 'cells'
+
+
+def stage_chlorophyll(ctx):
+    ds = xr.open_dataset(ctx['paths']['chlorophyll'])
+    ctx['chlorophyll'] = ctx['standardizer'].process_chlorophyll(ds)
+    return int(ds['chlor_a'].size), 'cells'
+
+
+def stage_bathymetry(ctx):
+    grid = xr.open_dataset(ctx['paths']['bathymetry'])['elevation']
+    ctx['depth'], ctx['slope'] = ctx['standardizer'].process_bathymetry(grid)
+    return int(grid.size), 'cells'
+
+
+def stage_rookeries(ctx):
+    prey = gpd.read_file(ctx['paths']['prey'])
+    ctx['standardizer'].process_rookeries(prey)
+    return len(prey), 'points'
+
+
+def stage_shipping(ctx):
+    lanes = gpd.read_file(ctx['paths']['shipping'])
+    ctx['standardizer'].process_shipping_lanes(lanes)
+    return len(lanes), 'lines'
+
+
+def stage_orca(ctx):
+    orca = gpd.read_file(ctx['paths']['orca'])
+    ctx['standardizer'].process_orca_density(orca)
+    return len(orca), 'points'
+
+
+def stage_absence(ctx):
+    from synthetic.generate_absence_points import AbsencePointsGenerator
+    tracks = gpd.read_file(ctx['paths']['tracks'])
+    generator = AbsencePointsGenerator(buffer_distance_km=100)
+    absence = generator.generate_absence_points(tracks, ctx['bbox'], ratio=1.0)
+    return len(absence), 'points'
+
+
+def stage_nursery(ctx):
+    from synthetic.nursery_index import NurserySuitabilityCalculator
+    sst = ctx['sst']
+    summer = sst.where(sst.time.dt.month.isin([6, 7, 8]), drop=True)
+    sst_summer = (summer if summer.sizes['time'] else sst).mean('time')
+
+    calculator = NurserySuitabilityCalculator()
+    index = calculator.calculate_index(
+        ctx['depth'].values, ctx['slope'], sst_summer.values,
+        ctx['chlorophyll'].mean('time').values,
+        transform=ctx['standardizer'].transform, save=True,
+        output_dir=str(ctx['standardizer'].output_dir)
+    )
+    return int(index.size), 'cells'
+
+
+STAGES = {
+    'sst': stage_sst,
+    'sst_gradient': stage_sst_gradient,
+    'chlorophyll': stage_chlorophyll,
+    'bathymetry': stage_bathymetry,
+    'rookeries': stage_rookeries,
+    'shipping': stage_shipping,
+    'orca': stage_orca,
+    'absence': stage_absence,
+    'nursery': stage_nursery,
+}
+
+# Етапи, результати яких потрібні іншим етапам
+REQUIRES = {
+    'sst_gradient': ['sst'],
+    'nursery': ['sst', 'chlorophyll', 'bathymetry']
+}
+
+
+def measure(func, *args) -> dict:
+    """Виконати func під PeakMemoryMonitor і повернути метрики"""
+    with PeakMemoryMonitor() as mem:
+        start = time.perf_counter()
+        try:
+            n, unit = func(*args)
+            error = None
+        except Exception as e:
+            n, unit, error = 0, '-', f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+
+    return {
+        'seconds': round(seconds, 3),
+        'items': n,
+        'unit': unit,
+        'peak_rss_mb': round(mem.peak_mb, 1),
+        'delta_rss_mb': round(mem.delta_mb, 1),
+        'error': error
+    }
+
+
+def run_preset(name: str, stages: list, args) -> list:
+    """Згенерувати дані для сценарію і виміряти етапи обробки"""
+    from synthetic.ocean_data_generator import SyntheticOceanDataGenerator
+    from processing.standardize_data import DataStandardizer
+
+    preset = PRESETS[name]
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix=f"bench_processing_{name}_") as workdir:
+        workdir = Path(workdir)
+        generator = SyntheticOceanDataGenerator(preset['bbox'], random_seed=args.seed)
+        ctx = {'bbox': preset['bbox']}
+
+        def generate():
+            ctx['paths'] = generator.write_all(
+                str(workdir / "raw"), date_range=preset['date_range'],
+                n_track_points=preset['n_track_points'],
+                n_occurrences=preset['n_occurrences'], n_lanes=preset['n_lanes'],
+                bathymetry_resolution=preset['bathymetry_resolution']
+            )
+            size = sum(p.stat().st_size for p in ctx['paths'].values())
+            return round(size / 1e6, 1), 'MB'
+
+        results.append({'preset': name, 'stage': 'generate', **measure(generate)})
+        if results[-1]['error']:
+            return results
+
+        ctx['standardizer'] = DataStandardizer(
+            preset['bbox'], resolution=args.resolution, output_dir=str(workdir / "processed"),
+            distance_method=args.distance_method,
+            line_distance_method=args.line_distance_method
+        )
+
+        # Залежності невибраних етапів виконуються без вимірювання
+        failed = set()
+        for stage in stages:
+            for required in REQUIRES.get(stage, []):
+                if required not in stages:
+                    try:
+                        STAGES[required](ctx)
+                    except Exception:
+                        failed.add(required)
+
+            missing = [r for r in REQUIRES.get(stage, []) if r in failed]
+            if missing:
+                results.append({'preset': name, 'stage': stage, 'seconds': 0.0, 'items': 0,
+                                'unit': '-', 'peak_rss_mb': 0.0, 'delta_rss_mb': 0.0,
+                                'error': f"skipped, failed inputs: {', '.join(missing)}"})
+                continue
+
+            result = measure(STAGES[stage], ctx)
+            if result['error']:
+                failed.add(stage)
+            results.append({'preset': name, 'stage': stage, **result})
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Processing stage benchmark on synthetic data")
+    parser.add_argument('--presets', nargs='+', choices=list(PRESETS),
+                        default=['small', 'regional'], help='Bbox scenarios to run')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES),
+                        default=list(STAGES), help='Processing stages to run')
+    parser.add_argument('--resolution', type=float, default=0.1, help='Target grid resolution (deg)')
+    parser.add_argument('--distance-method', choices=['kdtree', 'edt', 'geodesic'], default='kdtree',
+                        help='Distance raster engine for rookeries/shipping')
+    parser.add_argument('--line-distance-method', choices=['kdtree', 'edt', 'geodesic', 'segments'],
+                        default=None, help='Distance raster engine for shipping lanes '
+                        '(default: --distance-method)')
+    parser.add_argument('--seed', type=int, default=42, help='Generator random seed')
+    parser.add_argument('--json', type=str, default=None, help='Write results to JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline logs')
+    args = parser.parse_args()
+
+    # Модулі обробки викликають logging.basicConfig(INFO) при імпорті -
+    # налаштувати root logger раніше, щоб їхній виклик нічого не змінив
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    # Зберегти порядок STAGES незалежно від порядку аргументів
+    stages = [stage for stage in STAGES if stage in args.stages]
+
+    print(f"{'preset':<10} {'stage':<12} {'time, s':>8} {'items':>10} {'unit':<7} "
+          f"{'peak RSS, MB':>12} {'delta, MB':>10}")
+
+    results = []
+    for name in args.presets:
+        for result in run_preset(name, stages, args):
+            results.append(result)
+            print(f"{name:<10} {result['stage']:<12} {result['seconds']:>8.2f} {result['items']:>10} "
+                  f"{result['unit']:<7} {result['peak_rss_mb']:>12.1f} {result['delta_rss_mb']:>10.1f}")
+            if result['error']:
+                print(f"    FAILED: {result['error']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'presets': PRESETS, 'results': results}, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: час запуску CLI та імпорту модулів
+Медіанний час холодного старту в окремих процесах і найдорожчі імпорти (-X importtime)
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --top 15
+    python benchmarks/bench_startup.py --budget 1.0 --json startup.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+SRC = ROOT / 'src'
+
+# Сценарії: назва -> аргументи інтерпретатора
+SCENARIOS = {
+    'main --help': [str(ROOT / 'main.py'), '--help'],
+    'import main': ['-c', f"import sys; sys.path.insert(0, {str(ROOT)!r}); import main"],
+    'import utils': ['-c', f"import sys; sys.path.insert(0, {str(SRC)!r}); import utils"],
+    'utils.load_config': ['-c', f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+                                "from utils import load_config"],
+    'import standardize_data': ['-c', f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+                                      "import processing.standardize_data"],
+}
+
+# Сценарії, для яких діє бюджет --budget
+CLI_SCENARIOS = ['main --help', 'import main']
+
+
+def time_scenario(args: list, runs: int) -> dict:
+    """Запустити сценарій runs разів в окремих процесах"""
+    timings = []
+    error = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, *args], cwd=ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        timings.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'
+            break
+
+    return {
+        'median_s': round(statistics.median(timings), 3),
+        'min_s': round(min(timings), 3),
+        'runs': len(timings),
+        'error': error
+    }
+
+
+def top_imports(args: list, top: int) -> list:
+    """Найдорожчі модулі верхнього рівня за -X importtime (кумулятивний час)"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Вкладеність позначена відступом у назві модуля (2 пробіли на рівень)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append({'module': name.strip(), 'depth': depth,
+                     'cumulative_ms': round(int(cumulative_us) / 1000, 1)})
+
+    top_level = [row for row in rows if row['depth'] <= 1]
+    return sorted(top_level, key=lambda r: r['cumulative_ms'], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup and import time benchmark")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS),
+                        default=list(SCENARIOS), help='Scenarios to run')
+    parser.add_argument('--runs', type=int, default=5, help='Processes per scenario')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports to show')
+    parser.add_argument('--budget', type=float, default=None,
+                        help='Fail if a CLI scenario median exceeds this many seconds')
+    parser.add_argument('--json', type=str, default=None, help='Write results to JSON file')
+    args = parser.parse_args()
+
+    print(f"{'scenario':<26} {'median, s':>10} {'min, s':>8}")
+
+    results = {}
+    for name in args.scenarios:
+        result = time_scenario(SCENARIOS[name], args.runs)
+        result['top_imports'] = top_imports(SCENARIOS[name], args.top)
+        results[name] = result
+
+        print(f"{name:<26} {result['median_s']:>10.3f} {result['min_s']:>8.3f}")
+        if result['error']:
+            print(f"    FAILED: {result['error']}")
+
+    for name, result in results.items():
+        print(f"\nHeaviest imports: {name}")
+        for row in result['top_imports']:
+            print(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+    if args.budget is not None:
+        over = [name for name in CLI_SCENARIOS
+                if name in results and results[name]['median_s'] > args.budget]
+        if over:
+            print(f"\nOver the {args.budget:.2f}s startup budget: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Benchmark: гарячі функції spatial_utils та temporal_utils з порогами регресії
+Час і пік пам'яті для сіток від 0.1° (регіон) до 0.01° (глобус)
+
+Результати порівнюються з baseline (benchmarks/baselines/bench_utils.json).
+Якщо час або пам'ять перевищують baseline більше ніж на поріг, скрипт
+завершується з кодом 1 - його можна ставити у CI перед зміною bbox.
+Без baseline (файлу або окремих випадків) - код 2, якщо не вказано
+--allow-missing-baseline: інакше перевірка в CI мовчки проходить.
+
+Usage:
+    python benchmarks/bench_utils.py --save-baseline
+    python benchmarks/bench_utils.py
+    python benchmarks/bench_utils.py --grids regional-0.1 global-0.1 --days 365 --time-threshold 0.3
+    python benchmarks/bench_utils.py --grids global-0.01 --functions calculate_slope calculate_gradient
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+import xarray as xr
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from utils.profiling import traced_peak_mb
+from utils.spatial_utils import (
+    create_target_grid, resample_to_grid, calculate_distance_raster, kernel_density_raster,
+    calculate_slope, calculate_gradient, points_to_geodataframe, buffer_points
+)
+from utils.temporal_utils import aggregate_to_weekly, get_climatology, interpolate_to_weekly
+
+DEFAULT_BASELINE = Path(__file__).parent / 'baselines' / 'bench_utils.json'
+
+REGIONAL_BBOX = {'min_lon': -130, 'max_lon': -110, 'min_lat': 25, 'max_lat': 45}
+GLOBAL_BBOX = {'min_lon': -180, 'max_lon': 180, 'min_lat': -80, 'max_lat': 80}
+
+# Цільові сітки: (bbox, роздільність у градусах)
+GRIDS = {
+    'regional-0.1': (REGIONAL_BBOX, 0.1),
+    'regional-0.05': (REGIONAL_BBOX, 0.05),
+    'regional-0.01': (REGIONAL_BBOX, 0.01),
+    'global-0.1': (GLOBAL_BBOX, 0.1),
+    'global-0.05': (GLOBAL_BBOX, 0.05),
+    'global-0.01': (GLOBAL_BBOX, 0.01),
+}
+
+SPATIAL_FUNCTIONS = [
+    'resample_to_grid', 'resample_to_grid_conservative', 'calculate_distance_raster',
+    'calculate_distance_raster_edt', 'calculate_distance_raster_geodesic',
+    'calculate_distance_raster_segments', 'kernel_density_raster', 'calculate_slope',
+    'calculate_gradient', 'buffer_points', 'buffer_points_geodesic'
+]
+TEMPORAL_FUNCTIONS = ['aggregate_to_weekly', 'get_climatology', 'interpolate_to_weekly']
+
+
+class Inputs:
+    """Лінивий кеш вхідних даних для однієї сітки"""
+
+    def __init__(self, grid: str, n_points: int, seed: int):
+        self.bbox, self.resolution = GRIDS[grid]
+        self.n_points = n_points
+        self.rng = np.random.default_rng(seed)
+        self._cache = {}
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def target_grid(self):
+        def build():
+            lon_grid, lat_grid, _ = create_target_grid(self.bbox, self.resolution)
+            return lon_grid, lat_grid
+        return self._cached('target_grid', build)
+
+    @property
+    def field(self) -> np.ndarray:
+        """Гладке 2D поле на цільовій сітці (батиметрія/SST)"""
+        def build():
+            lon_grid, lat_grid = self.target_grid
+            return (-2000 * np.sin(np.radians(lat_grid) * 4) * np.cos(np.radians(lon_grid) * 3)
+                    ).astype(np.float32)
+        return self._cached('field', build)
+
+    @property
+    def source(self) -> xr.DataArray:
+        """Джерело для ресемплінгу з удвічі більшою роздільністю (як MODIS -> 0.1°)"""
+        def build():
+            res = self.resolution / 2
+            lats = np.arange(self.bbox['max_lat'], self.bbox['min_lat'], -res)
+            lons = np.arange(self.bbox['min_lon'], self.bbox['max_lon'], res)
+            values = self.rng.standard_normal((lats.size, lons.size)).astype(np.float32)
+            return xr.DataArray(values, dims=('lat', 'lon'), coords={'lat': lats, 'lon': lons})
+        return self._cached('source', build)
+
+    @property
+    def points(self):
+        def build():
+            lons = self.rng.uniform(self.bbox['min_lon'], self.bbox['max_lon'], self.n_points)
+            lats = self.rng.uniform(self.bbox['min_lat'], self.bbox['max_lat'], self.n_points)
+            return points_to_geodataframe(lons, lats)
+        return self._cached('points', build)
+
+    @property
+    def lines(self):
+        """Випадкові ламані (як морські шляхи) по 50 вершин"""
+        def build():
+            n_lines = max(1, self.n_points // 50)
+            step = self.resolution * 2
+            starts = np.column_stack([
+                self.rng.uniform(self.bbox['min_lon'], self.bbox['max_lon'], n_lines),
+                self.rng.uniform(self.bbox['min_lat'], self.bbox['max_lat'], n_lines)
+            ])
+            walks = starts[:, None] + np.cumsum(self.rng.normal(0, step, (n_lines, 50, 2)), axis=1)
+            return gpd.GeoDataFrame(geometry=shapely.linestrings(walks), crs='EPSG:4326')
+        return self._cached('lines', build)
+
+    def cube(self, days: int) -> xr.DataArray:
+        """Денний куб (time, lat, lon) на цільовій сітці"""
+        def build():
+            lon_grid, lat_grid = self.target_grid
+            times = pd.date_range('2020-01-01', periods=days, freq='D')
+            season = np.cos(2 * np.pi * np.arange(days) / 365.25).astype(np.float32)
+            values = self.field[None] / 100 + season[:, None, None]
+            return xr.DataArray(
+                values, dims=('time', 'lat', 'lon'),
+                coords={'time': times, 'lat': lat_grid[:, 0], 'lon': lon_grid[0, :]}
+            )
+        return self._cached(('cube', days), build)
+
+
+def make_call(name: str, inputs: Inputs, days: int = None):
+    """Підготувати вхідні дані і повернути виклик без аргументів"""
+    if name == 'resample_to_grid':
+        source, grid = inputs.source, inputs.target_grid
+        return lambda: resample_to_grid(source, grid, method='bilinear')
+    if name == 'resample_to_grid_conservative':
+        source, grid = inputs.source, inputs.target_grid
+        return lambda: resample_to_grid(source, grid, method='conservative')
+    if name == 'calculate_distance_raster':
+        points, grid = inputs.points, inputs.target_grid
+        return lambda: calculate_distance_raster(points, grid, max_distance=500)
+    if name == 'calculate_distance_raster_edt':
+        points, grid = inputs.points, inputs.target_grid
+        return lambda: calculate_distance_raster(points, grid, max_distance=500, method='edt')
+    if name == 'calculate_distance_raster_geodesic':
+        points, grid = inputs.points, inputs.target_grid
+        return lambda: calculate_distance_raster(points, grid, max_distance=500, method='geodesic')
+    if name == 'calculate_distance_raster_segments':
+        lines, grid = inputs.lines, inputs.target_grid
+        return lambda: calculate_distance_raster(lines, grid, max_distance=500, method='segments')
+    if name == 'kernel_density_raster':
+        points, grid = inputs.points, inputs.target_grid
+        return lambda: kernel_density_raster(points, grid, bandwidth_km=50)
+    if name == 'calculate_slope':
+        field = inputs.field
+        return lambda: calculate_slope(field, inputs.resolution)
+    if name == 'calculate_gradient':
+        field = inputs.field
+        return lambda: calculate_gradient(field, inputs.resolution)
+    if name == 'buffer_points':
+        points = inputs.points
+        return lambda: buffer_points(points, 100)
+    if name == 'buffer_points_geodesic':
+        points = inputs.points
+        return lambda: buffer_points(points, 100, method='geodesic')
+
+    cube = inputs.cube(days)
+    if name == 'aggregate_to_weekly':
+        return lambda: aggregate_to_weekly(cube, method='mean')
+    if name == 'get_climatology':
+        return lambda: get_climatology(cube, groupby='month')
+    if name == 'interpolate_to_weekly':
+        start, end = str(cube.time.values[0])[:10], str(cube.time.values[-1])[:10]
+        return lambda: interpolate_to_weekly(cube, start, end)
+
+    raise ValueError(f"Unknown function: {name}")
+
+
+def run_case(call, repeat: int) -> dict:
+    """Пік пам'яті з одного прогону під tracemalloc, час - мінімум з repeat прогонів"""
+    _, peak_mb = traced_peak_mb(call)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'seconds': round(min(timings), 4),
+        'median_seconds': round(float(np.median(timings)), 4),
+        'peak_mb': round(peak_mb, 2)
+    }
+
+
+def case_id(function: str, grid: str, days: int = None) -> str:
+    return f"{function}[{grid}]" if days is None else f"{function}[{grid},{days}d]"
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'xarray': xr.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(results: dict, baseline: dict, time_threshold: float,
+            memory_threshold: float, min_seconds: float, min_mb: float) -> list:
+    """
+    Знайти регресії відносно baseline
+
+    Дуже короткі виклики (< min_seconds) і малі алокації (< min_mb)
+    не перевіряються - їхній шум більший за поріг.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+
+        if previous['seconds'] >= min_seconds:
+            ratio = current['seconds'] / previous['seconds']
+            if ratio > 1 + time_threshold:
+                regressions.append(f"{key}: time {previous['seconds']:.4f}s -> "
+                                   f"{current['seconds']:.4f}s (x{ratio:.2f})")
+
+        if max(previous['peak_mb'], current['peak_mb']) >= min_mb:
+            limit = previous['peak_mb'] * (1 + memory_threshold)
+            if current['peak_mb'] > max(limit, min_mb):
+                regressions.append(f"{key}: memory {previous['peak_mb']:.1f}MB -> "
+                                   f"{current['peak_mb']:.1f}MB")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="spatial/temporal utils benchmark with regression check")
+    parser.add_argument('--grids', nargs='+', choices=list(GRIDS),
+                        default=['regional-0.1', 'regional-0.05', 'global-0.1'],
+                        help='Target grids for spatial functions')
+    parser.add_argument('--temporal-grids', nargs='+', choices=list(GRIDS),
+                        default=['regional-0.1', 'regional-0.05'],
+                        help='Target grids for temporal functions (cube = grid x days)')
+    parser.add_argument('--days', nargs='+', type=int, default=[90, 365],
+                        help='Time series lengths (daily steps) for temporal functions')
+    parser.add_argument('--functions', nargs='+', choices=SPATIAL_FUNCTIONS + TEMPORAL_FUNCTIONS,
+                        default=SPATIAL_FUNCTIONS + TEMPORAL_FUNCTIONS, help='Functions to run')
+    parser.add_argument('--points', type=int, default=5000, help='Points for distance/buffer')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--baseline', type=str, default=str(DEFAULT_BASELINE), help='Baseline JSON')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Merge results into the baseline instead of checking')
+    parser.add_argument('--time-threshold', type=float, default=0.25,
+                        help='Allowed relative slowdown (0.25 = +25%%)')
+    parser.add_argument('--memory-threshold', type=float, default=0.10,
+                        help='Allowed relative peak memory growth')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Skip time check for cases faster than this')
+    parser.add_argument('--min-mb', type=float, default=1.0,
+                        help='Skip memory check for cases below this')
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help='Exit 0 when the baseline file or some cases are missing')
+    parser.add_argument('--json', type=str, default=None, help='Write results to JSON file')
+    args = parser.parse_args()
+
+    # buffer_points свідомо буферизує в градусах - попередження geopandas лише шум
+    warnings.filterwarnings('ignore', message='Geometry is in a geographic CRS')
+
+    cases = []
+    for grid in args.grids:
+        cases += [(f, grid, None) for f in args.functions if f in SPATIAL_FUNCTIONS]
+    for grid in args.temporal_grids:
+        for days in args.days:
+            cases += [(f, grid, days) for f in args.functions if f in TEMPORAL_FUNCTIONS]
+
+    print(f"{'case':<48} {'time, s':>9} {'median, s':>10} {'peak, MB':>10}")
+
+    results = {}
+    inputs = {}
+    for function, grid, days in cases:
+        if grid not in inputs:
+            inputs.clear()  # звільнити вхідні дані попередньої сітки
+            inputs[grid] = Inputs(grid, args.points, args.seed)
+
+        key = case_id(function, grid, days)
+        results[key] = run_case(make_call(function, inputs[grid], days), args.repeat)
+        print(f"{key:<48} {results[key]['seconds']:>9.4f} "
+              f"{results[key]['median_seconds']:>10.4f} {results[key]['peak_mb']:>10.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+    baseline_file = Path(args.baseline)
+    stored = {'environment': environment(), 'results': {}}
+    if baseline_file.exists():
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+
+    if args.save_baseline:
+        stored['environment'] = environment()
+        stored['results'].update(results)
+        baseline_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_file, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {baseline_file} ({len(results)} cases)")
+        return
+
+    if not baseline_file.exists():
+        print(f"No baseline at {baseline_file}, run with --save-baseline first")
+        if not args.allow_missing_baseline:
+            sys.exit(2)
+        return
+
+    if stored.get('environment') != environment():
+        print("WARNING: baseline was recorded in a different environment: "
+              f"{stored.get('environment')}")
+
+    missing = [key for key in results if key not in stored['results']]
+    if missing:
+        print(f"{len(missing)} cases have no baseline: {', '.join(missing)}")
+
+    regressions = compare(results, stored['results'], args.time_threshold,
+                          args.memory_threshold, args.min_seconds, args.min_mb)
+    if regressions:
+        print(f"\n{len(regressions)} regressions "
+              f"(time > +{args.time_threshold:.0%}, memory > +{args.memory_threshold:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+    if missing and not args.allow_missing_baseline:
+        print("Cases without baseline are not checked; run with --save-baseline "
+              "or pass --allow-missing-baseline")
+        sys.exit(2)
+
+    print(f"\nNo regressions against {baseline_file}")
+
+
+if __name__ == "__main__":
+    main()
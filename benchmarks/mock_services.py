@@ -0,0 +1,569 @@
+"""
+Mock services: локальні замінники зовнішніх API для офлайн-бенчмарків
+GBIF, OBIS, OCEARCH, NOAA ArcGIS, NCEI (WOA), Earthdata/CMR, CMEMS, GFW, GEBCO
+
+Сервер (http.server у фоновому потоці) віддає синтетичні відповіді з
+налаштовуваною затримкою, лімітами сторінок та часткою помилок (503).
+Клієнтські бібліотеки, через які колектори звертаються до сервісів
+(pygbif, pyobis, earthaccess, copernicusmarine, gfwapiclient, pygmt),
+підміняються в sys.modules тонкими shim-модулями, що ходять на той самий
+сервер, тому затримка та помилки однаково діють на всі колектори.
+
+Usage:
+    with MockServiceServer(MockConfig(latency=0.02)) as server:
+        install_client_shims(server)
+        ...  # імпортувати та запускати колектори з URL server.url(...)
+"""
+
+import hashlib
+import io
+import json
+import re
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+import xarray as xr
+
+DEFAULT_BBOX = {'min_lon': -130.0, 'max_lon': -110.0, 'min_lat': 25.0, 'max_lat': 45.0}
+
+
+class MockConfig:
+    """
+    Параметри mock-сервісів
+
+    Parameters:
+    -----------
+    latency : float
+        Затримка кожної відповіді (с)
+    error_rate : float
+        Частка запитів, що отримують 503 (0..1)
+    page_limit : int
+        Максимум записів на сторінку (обрізає limit/size/resultRecordCount)
+    n_records : int
+        Кількість записів GBIF/OBIS/GFW для повного DEFAULT_BBOX
+    n_sharks : int
+        Кількість акул OCEARCH
+    points_per_shark : int
+        Кількість точок треку на акулу
+    n_features : int
+        Кількість ліній ArcGIS
+    grid_size : int
+        Розмір (lat, lon) синтетичних NetCDF-сіток
+    seed : int
+        Seed генератора
+    """
+
+    def __init__(self, latency: float = 0.02, error_rate: float = 0.0,
+                 page_limit: int = 1000, n_records: int = 20000,
+                 n_sharks: int = 40, points_per_shark: int = 500,
+                 n_features: int = 5000, grid_size: int = 400, seed: int = 42):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.page_limit = page_limit
+        self.n_records = n_records
+        self.n_sharks = n_sharks
+        self.points_per_shark = points_per_shark
+        self.n_features = n_features
+        self.grid_size = grid_size
+        self.seed = seed
+
+
+def _seed_for(*parts) -> int:
+    """Стабільний seed для набору параметрів (відповіді детерміновані)"""
+    digest = hashlib.md5('|'.join(map(str, parts)).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16)
+
+
+def _area_fraction(bbox: dict) -> float:
+    full = (DEFAULT_BBOX['max_lon'] - DEFAULT_BBOX['min_lon']) * \
+           (DEFAULT_BBOX['max_lat'] - DEFAULT_BBOX['min_lat'])
+    area = (bbox['max_lon'] - bbox['min_lon']) * (bbox['max_lat'] - bbox['min_lat'])
+    return min(max(area / full, 0.0), 1.0)
+
+
+def _parse_range(value: str, default: tuple) -> tuple:
+    if not value:
+        return default
+    low, high = value.split(',')
+    return float(low), float(high)
+
+
+def _wkt_bbox(wkt: str) -> dict:
+    numbers = [float(x) for x in re.findall(r'-?\d+(?:\.\d+)?', wkt or '')]
+    if not numbers:
+        return dict(DEFAULT_BBOX)
+    lons, lats = numbers[0::2], numbers[1::2]
+    return {'min_lon': min(lons), 'max_lon': max(lons), 'min_lat': min(lats), 'max_lat': max(lats)}
+
+
+def _points(n: int, bbox: dict, seed: int):
+    rng = np.random.default_rng(seed)
+    lons = rng.uniform(bbox['min_lon'], bbox['max_lon'], n)
+    lats = rng.uniform(bbox['min_lat'], bbox['max_lat'], n)
+    return lons.round(5), lats.round(5)
+
+
+def synthetic_grid(name: str, variables, start: str = None, end: str = None,
+                   bbox: dict = None, grid_size: int = 400, freq: str = 'D') -> bytes:
+    """
+    Синтетичний NetCDF (netCDF3, scipy) з регулярною сіткою lat/lon
+
+    Часова вісь - pd.date_range(start, end, freq); без start/end - один крок 2020-01-01.
+
+    Returns:
+    --------
+    data : bytes
+    """
+    bbox = bbox or DEFAULT_BBOX
+    rng = np.random.default_rng(_seed_for(name, start, end))
+
+    lat = np.linspace(bbox['max_lat'], bbox['min_lat'], grid_size)
+    lon = np.linspace(bbox['min_lon'], bbox['max_lon'], grid_size)
+
+    if start and end:
+        time = pd.date_range(start, end, freq=freq)
+    else:
+        time = pd.DatetimeIndex([pd.Timestamp('2020-01-01')])
+
+    shape = (len(time), grid_size, grid_size)
+    ds = xr.Dataset(
+        {var: (('time', 'lat', 'lon'), rng.random(shape, dtype=np.float32)) for var in variables},
+        coords={'time': time, 'lat': lat, 'lon': lon},
+        attrs={'title': name, 'time_coverage_start': str(time[0].date())}
+    )
+    return bytes(ds.to_netcdf(engine='scipy'))
+
+
+class MockServiceServer:
+    """
+    Локальний HTTP-сервер з усіма mock-сервісами
+
+    Лічильники (requests, bytes_sent, errors) доступні через stats() і
+    скидаються reset_stats().
+    """
+
+    def __init__(self, config: MockConfig = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockConfig()
+        self._files = {}
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(self.config.seed)
+        self.reset_stats()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.errors = 0
+
+    def stats(self) -> dict:
+        return {'requests': self.requests, 'bytes': self.bytes_sent, 'errors': self.errors}
+
+    # ------------------------------------------------------------------
+    # Обробка запитів
+    # ------------------------------------------------------------------
+
+    def _send(self, handler, status: int, body: bytes, content_type: str,
+              headers: dict = None):
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+        with self._lock:
+            self.bytes_sent += len(body)
+
+    def _send_json(self, handler, data):
+        self._send(handler, 200, json.dumps(data).encode('utf-8'), 'application/json')
+
+    def _handle(self, handler):
+        parsed = urlparse(handler.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        parts = [p for p in parsed.path.split('/') if p]
+
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.config.error_rate
+
+        if self.config.latency:
+            time.sleep(self.config.latency)
+
+        if fail:
+            with self._lock:
+                self.errors += 1
+            self._send(handler, 503, b'{"error": "service unavailable"}', 'application/json',
+                       {'Retry-After': '0'})
+            return
+
+        routes = {
+            'gbif': self._gbif,
+            'obis': self._obis,
+            'ocearch': self._ocearch,
+            'arcgis': self._arcgis,
+            'grid': self._grid,
+            'cmr': self._cmr,
+            'gfw': self._gfw,
+        }
+
+        route = routes.get(parts[0]) if parts else None
+        if route is None:
+            self._send(handler, 404, b'{"error": "not found"}', 'application/json')
+            return
+
+        try:
+            route(handler, parts[1:], query)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _gbif(self, handler, parts, query):
+        cfg = self.config
+
+        if parts[:2] == ['species', 'match']:
+            self._send_json(handler, {'usageKey': 2440000 + _seed_for(query.get('name')) % 1000,
+                                      'scientificName': query.get('name')})
+            return
+
+        lat = _parse_range(query.get('decimalLatitude'), (DEFAULT_BBOX['min_lat'], DEFAULT_BBOX['max_lat']))
+        lon = _parse_range(query.get('decimalLongitude'), (DEFAULT_BBOX['min_lon'], DEFAULT_BBOX['max_lon']))
+        bbox = {'min_lat': lat[0], 'max_lat': lat[1], 'min_lon': lon[0], 'max_lon': lon[1]}
+
+        count = int(cfg.n_records * _area_fraction(bbox))
+        offset = int(query.get('offset', 0))
+        limit = min(int(query.get('limit', 20)), cfg.page_limit)
+        n = max(0, min(limit, count - offset))
+
+        tile = f"{lat[0]:.4f},{lat[1]:.4f},{lon[0]:.4f},{lon[1]:.4f}"
+        lons, lats = _points(n, bbox, _seed_for('gbif', tile, offset))
+        results = [
+            {
+                'key': f"{tile}:{offset + i}",
+                'decimalLongitude': float(lons[i]),
+                'decimalLatitude': float(lats[i]),
+                'eventDate': '2021-06-01',
+                'basisOfRecord': 'HUMAN_OBSERVATION',
+                'individualCount': 1,
+                'taxonKey': query.get('taxonKey')
+            }
+            for i in range(n)
+        ]
+
+        self._send_json(handler, {
+            'offset': offset, 'limit': limit, 'count': count,
+            'endOfRecords': offset + n >= count, 'results': results
+        })
+
+    def _obis(self, handler, parts, query):
+        cfg = self.config
+        bbox = _wkt_bbox(query.get('geometry'))
+        total = int(cfg.n_records * _area_fraction(bbox))
+        size = min(int(query.get('size', 5000)), cfg.page_limit)
+
+        tile = hashlib.md5(query.get('geometry', '').encode('utf-8')).hexdigest()[:8]
+        after = query.get('after')
+        start = int(after.rsplit('-', 1)[1]) + 1 if after else 0
+        n = max(0, min(size, total - start))
+
+        lons, lats = _points(n, bbox, _seed_for('obis', tile, start))
+        results = [
+            {
+                'id': f"{tile}-{start + i:09d}",
+                'scientificName': query.get('scientificname'),
+                'decimalLongitude': float(lons[i]),
+                'decimalLatitude': float(lats[i]),
+                'eventDate': '2021-06-01',
+                'date_year': 2021,
+                'basisOfRecord': 'HumanObservation',
+                'individualCount': 1
+            }
+            for i in range(n)
+        ]
+
+        self._send_json(handler, {'total': total, 'results': results})
+
+    def _ocearch(self, handler, parts, query):
+        cfg = self.config
+
+        if parts[-1] == 'sharks':
+            rng = np.random.default_rng(cfg.seed)
+            self._send_json(handler, [
+                {
+                    'id': f"shark-{i:04d}",
+                    'name': f"Shark {i}",
+                    'species': 'Carcharodon carcharias',
+                    'sex': 'Male' if i % 2 else 'Female',
+                    'length': round(float(rng.uniform(2.0, 5.5)), 2),
+                    'weight': round(float(rng.uniform(200, 1500)), 1)
+                }
+                for i in range(cfg.n_sharks)
+            ])
+            return
+
+        shark_id = parts[-1]
+        lons, lats = _points(cfg.points_per_shark, DEFAULT_BBOX, _seed_for('ocearch', shark_id))
+        dates = pd.date_range('2020-01-01', periods=cfg.points_per_shark, freq='6h')
+        self._send_json(handler, [
+            {'longitude': float(lons[i]), 'latitude': float(lats[i]), 'datetime': str(dates[i])}
+            for i in range(cfg.points_per_shark)
+        ])
+
+    def _arcgis(self, handler, parts, query):
+        cfg = self.config
+
+        if not parts or parts[-1] != 'query':
+            self._send_json(handler, {'maxRecordCount': cfg.page_limit, 'objectIdField': 'OBJECTID'})
+            return
+
+        if query.get('returnCountOnly') == 'true':
+            self._send_json(handler, {'count': cfg.n_features})
+            return
+
+        offset = int(query.get('resultOffset', 0))
+        size = min(int(query.get('resultRecordCount', cfg.page_limit)), cfg.page_limit)
+        n = max(0, min(size, cfg.n_features - offset))
+
+        # Генералізація зменшує кількість вершин
+        n_vertices = 4 if query.get('maxAllowableOffset') else 40
+        rng = np.random.default_rng(_seed_for('arcgis', offset))
+        features = []
+        for i in range(n):
+            lon0 = rng.uniform(DEFAULT_BBOX['min_lon'], DEFAULT_BBOX['max_lon'] - 2)
+            lat0 = rng.uniform(DEFAULT_BBOX['min_lat'], DEFAULT_BBOX['max_lat'] - 2)
+            coords = np.column_stack([
+                lon0 + np.linspace(0, 2, n_vertices),
+                lat0 + np.cumsum(rng.normal(0, 0.02, n_vertices))
+            ]).round(5).tolist()
+            features.append({
+                'type': 'Feature',
+                'properties': {'OBJECTID': offset + i + 1, 'THEMELAYER': 'Shipping Lanes'},
+                'geometry': {'type': 'LineString', 'coordinates': coords}
+            })
+
+        self._send_json(handler, {
+            'type': 'FeatureCollection',
+            'features': features,
+            'exceededTransferLimit': offset + n < cfg.n_features
+        })
+
+    def _grid(self, handler, parts, query):
+        """NetCDF-сітки: WOA, гранули Earthdata, CMEMS, GEBCO (з підтримкою Range)"""
+        key = handler.path
+        with self._lock:
+            body = self._files.get(key)
+
+        if body is None:
+            variables = query.get('var', 'value').split(',')
+            bbox = _wkt_bbox(query.get('region')) if query.get('region') else None
+            body = synthetic_grid('/'.join(parts), variables, query.get('start'),
+                                  query.get('end'), bbox, self.config.grid_size,
+                                  query.get('freq', 'D'))
+            with self._lock:
+                self._files[key] = body
+
+        range_header = handler.headers.get('Range')
+        if range_header:
+            start = int(range_header.split('=')[1].split('-')[0])
+            if start >= len(body):
+                self._send(handler, 416, b'', 'application/octet-stream')
+                return
+            self._send(handler, 206, body[start:], 'application/x-netcdf', {
+                'Content-Range': f"bytes {start}-{len(body) - 1}/{len(body)}",
+                'Accept-Ranges': 'bytes'
+            })
+            return
+
+        self._send(handler, 200, body, 'application/x-netcdf', {'Accept-Ranges': 'bytes'})
+
+    def _cmr(self, handler, parts, query):
+        """
+        Пошук гранул: одна гранула на місяць діапазону
+
+        Часове покриття гранули передається в URL (start/end/freq=MS), тож кожен
+        файл має власний крок часу і open_mfdataset(combine='by_coords') їх склеює.
+        """
+        short_name = query.get('short_name', 'PRODUCT')
+        variable = query.get('var', 'value')
+        months = pd.date_range(query['start'], query['end'], freq='MS')
+        granules = []
+        for month in months:
+            name = f"{short_name}.{month:%Y%m}.nc"
+            start = str(month.date())
+            end = str((month + pd.offsets.MonthEnd(0)).date())
+            granules.append({
+                'name': name,
+                'url': self.url(f"grid/{short_name}/{name}?var={variable}"
+                                f"&start={start}&end={end}&freq=MS"),
+                'start': start,
+                'end': end
+            })
+        self._send_json(handler, granules)
+
+    def _gfw(self, handler, parts, query):
+        cfg = self.config
+        lons, lats = _points(cfg.n_records, DEFAULT_BBOX, _seed_for('gfw'))
+        self._send_json(handler, [
+            {'lat': float(lats[i]), 'lon': float(lons[i]), 'date': '2021-06',
+             'hours': 1.5, 'geartype': 'drifting_longlines'}
+            for i in range(cfg.n_records)
+        ])
+
+
+# ----------------------------------------------------------------------
+# Shim-модулі клієнтських бібліотек
+# ----------------------------------------------------------------------
+
+class _MockGranule(dict):
+    """Гранула в стилі earthaccess.DataGranule"""
+
+    def __init__(self, record: dict):
+        super().__init__(
+            meta={'native-id': record['name']},
+            umm={'TemporalExtent': {'RangeDateTime': {
+                'BeginningDateTime': record['start'], 'EndingDateTime': record['end']
+            }}}
+        )
+        self._url = record['url']
+
+    def data_links(self):
+        return [self._url]
+
+
+def install_client_shims(server: MockServiceServer, session: requests.Session = None):
+    """
+    Підмінити клієнтські бібліотеки в sys.modules shim-модулями
+
+    Викликати до імпорту колекторів.
+
+    Parameters:
+    -----------
+    server : MockServiceServer
+        Запущений сервер
+    session : requests.Session, optional
+        Сесія для shim-ів (за замовчуванням - нова, без повторів; з
+        error_rate > 0 передайте utils.http_session.get_session())
+    """
+    http = session or requests.Session()
+
+    def get_json(path, params=None):
+        response = http.get(server.url(path), params=params, timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    # pygbif
+    gbif_occ = module('pygbif.occurrences', search=lambda **kw: get_json('gbif/occurrence/search', kw))
+    gbif_species = module('pygbif.species', name_backbone=lambda name, **kw: get_json(
+        'gbif/species/match', dict(kw, name=name)))
+    module('pygbif', occurrences=gbif_occ, species=gbif_species)
+
+    # pyobis
+    obis_occ = module('pyobis.occurrences', search=lambda **kw: get_json('obis/occurrence', kw))
+    module('pyobis', occurrences=obis_occ)
+
+    # earthaccess
+    variables = {'MODIS_AQUA': 'sst', 'MODISA_L3m_CHL': 'chlor_a', 'SMAP': 'sss_smap'}
+
+    def search_data(short_name, temporal, bounding_box=None, **kw):
+        var = next((v for k, v in variables.items() if short_name.startswith(k)), 'value')
+        records = get_json('cmr/granules', {
+            'short_name': short_name, 'start': temporal[0], 'end': temporal[1], 'var': var
+        })
+        return [_MockGranule(r) for r in records]
+
+    def open_granules(granules, **kw):
+        return [io.BytesIO(http.get(g.data_links()[0], timeout=60).content) for g in granules]
+
+    module(
+        'earthaccess',
+        login=lambda *a, **kw: object(),
+        search_data=search_data,
+        open=open_granules,
+        get_requests_https_session=lambda: http
+    )
+
+    # copernicusmarine
+    def cmems_subset(dataset_id, variables, start_datetime, end_datetime,
+                     output_filename, output_directory, **kw):
+        region = (f"POLYGON(({kw['minimum_longitude']} {kw['minimum_latitude']}, "
+                  f"{kw['maximum_longitude']} {kw['maximum_latitude']}))")
+        response = http.get(server.url(f"grid/cmems/{dataset_id}"), params={
+            'var': ','.join(variables), 'start': start_datetime,
+            'end': end_datetime, 'region': region
+        }, timeout=120)
+        response.raise_for_status()
+        with open(f"{output_directory}/{output_filename}", 'wb') as f:
+            f.write(response.content)
+
+    module('copernicusmarine', subset=cmems_subset)
+
+    # gfwapiclient
+    class GFWClient:
+        def __init__(self, access_token=None):
+            self.access_token = access_token
+
+        def get_4wings_data(self, **params):
+            return get_json('gfw/4wings', {'date-range': params.get('date-range')})
+
+    module('gfwapiclient', Client=GFWClient)
+
+    # pygmt
+    def load_earth_relief(resolution, region):
+        region_wkt = f"POLYGON(({region[0]} {region[2]}, {region[1]} {region[3]}))"
+        response = http.get(server.url(f"grid/gebco/{resolution}"),
+                            params={'var': 'elevation', 'region': region_wkt}, timeout=120)
+        response.raise_for_status()
+        return xr.open_dataset(io.BytesIO(response.content), engine='scipy')['elevation'].isel(time=0).load()
+
+    datasets = module('pygmt.datasets', load_earth_relief=load_earth_relief)
+    module('pygmt', datasets=datasets)
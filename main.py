@@ -7,35 +7,30 @@ Usage:
     python main.py --step collect
     python main.py --step process
     python main.py --step integrate
+    python main.py --step process --profile
+    python main.py --step process --force
 """
 
 import argparse
 import logging
+import os
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 import sys
 
 # Додати src до Python path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
+# Лише легкі модулі: колектори, обробка та наукові бібліотеки
+# імпортуються всередині кроків, які їх використовують
 from utils.config_loader import load_config, get_bbox, get_date_range, create_output_paths
-
-# Data collectors
-from data_collection.ocearch_collector import OCEARCHCollector
-from data_collection.gbif_obis_collector import GBIFOBISCollector
-from data_collection.nasa_ocean_collector import NASAOceanCollector
-from data_collection.copernicus_collector import CopernicusCollector
-from data_collection.smap_collector import SMAPCollector
-from data_collection.woa_collector import WOACollector
-from data_collection.gebco_collector import GEBCOCollector
-from data_collection.gfw_collector import GFWCollector
-from data_collection.shipping_lanes_collector import ShippingLanesCollector
-
-# Processing
-from processing.standardize_data import DataStandardizer
-
-# Synthetic
-from synthetic.generate_absence_points import AbsencePointsGenerator
-from synthetic.nursery_index import NurserySuitabilityCalculator
+from utils.task_graph import TaskGraph
+from utils.response_cache import ResponseCache
+from utils.http_session import configure_session, get_session
+from utils.profiling import RunMetrics, set_active_metrics, increment_counter
+from utils.build_cache import BuildCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -47,12 +42,19 @@ logger = logging.getLogger(__name__)
 class SharkVoyagerPipeline:
     """Головний pipeline для проєкту Shark Voyager AI"""
 
-    def __init__(self, config_path: str = "config/config.yaml"):
+    def __init__(self, config_path: str = "config/config.yaml", offline: bool = False,
+                 profile: bool = False, force: bool = False):
         """
         Parameters:
         -----------
         config_path : str
             Шлях до конфігураційного файлу
+        offline : bool
+            Працювати лише з кешу відповідей, без звернень до мережі
+        profile : bool
+            Профілювати кожен крок cProfile (.prof поруч зі звітом)
+        force : bool
+            Перерахувати всі задачі обробки, ігноруючи відбитки
         """
         logger.info("=" * 70)
         logger.info("SHARK VOYAGER AI - Data Collection and Processing Pipeline")
@@ -72,82 +74,525 @@ class SharkVoyagerPipeline:
         logger.info(f"Study area: {self.bbox}")
         logger.info(f"Date range: {self.date_range}")
 
-    def step_1_collect_data(self):
-        """Крок 1: Збір даних з усіх джерел"""
-        logger.info("\n" + "=" * 70)
-        logger.info("STEP 1: DATA COLLECTION")
-        logger.info("=" * 70 + "\n")
+        # Спільна HTTP-сесія (пул з'єднань, повтори, ліміти запитів)
+        http_cfg = self.config.get('http', {})
+        configure_session(
+            pool_size=http_cfg.get('pool_size'),
+            max_retries=http_cfg.get('max_retries'),
+            backoff_factor=http_cfg.get('backoff_factor'),
+            rate_limits=http_cfg.get('rate_limits')
+        )
 
-        # 1. OCEARCH Shark Tracks
-        logger.info("1/9: Collecting OCEARCH shark tracks...")
-        logger.warning("OCEARCH requires permission - see data_collection/ocearch_collector.py")
-        # ocearch = OCEARCHCollector()
-        # shark_tracks = ocearch.collect_all_white_shark_tracks(save=True)
+        # Кеш відповідей HTTP-колекторів
+        cache_cfg = self.config.get('cache', {})
+        self.response_cache = None
+        if cache_cfg.get('enabled', True) or offline:
+            self.response_cache = ResponseCache(
+                cache_dir=cache_cfg.get('directory', './data/cache/responses'),
+                ttl_hours=cache_cfg.get('ttl_hours', 168),
+                max_size_mb=cache_cfg.get('max_size_mb', 2048),
+                offline=offline or cache_cfg.get('offline', False)
+            )
+            if self.response_cache.offline:
+                logger.info("Offline mode: serving API responses from cache only")
+
+        # Відбитки виходів для інкрементальних перезапусків
+        pipeline_cfg = self.config.get('pipeline', {})
+        self.build_cache = BuildCache(
+            manifest_path=pipeline_cfg.get(
+                'manifest', self.paths['data_processed'] / ".build_manifest.json"
+            ),
+            enabled=pipeline_cfg.get('incremental', True) and not force
+        )
+        if force:
+            logger.info("Force mode: all processing tasks will be recomputed")
+
+        # Метрики запуску
+        metrics_cfg = self.config.get('metrics', {})
+        self.metrics = None
+        if metrics_cfg.get('enabled', True) or profile:
+            self.report_dir = Path(metrics_cfg.get('report_dir', self.paths['data_processed']))
+            self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            profile_dir = None
+            if profile or metrics_cfg.get('profile', False):
+                profile_dir = self.report_dir / f"profiles_{self.run_id}"
+
+            self.metrics = RunMetrics(
+                profile_dir=profile_dir,
+                memory_interval=metrics_cfg.get('memory_interval', 0.2)
+            )
+            set_active_metrics(self.metrics)
+            get_session().hooks['response'].append(self.metrics.http_hook)
+            logger.info(f"Run metrics enabled (pid {os.getpid()})")
 
-        # 2. GBIF/OBIS - Marine Mammals and Orcas
-        logger.info("2/9: Collecting marine mammal and orca data...")
-        gbif_obis = GBIFOBISCollector()
+    def _stage(self, name: str):
+        """Етап для метрик (або порожній контекст, якщо метрики вимкнено)"""
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
 
-        prey_species = [sp['scientific_name'] for sp in self.config['prey_species']]
-        prey_data = gbif_obis.collect_prey_species(prey_species, self.bbox, save=True)
-        orca_data = gbif_obis.collect_orca_data(self.bbox, save=True)
+    def write_run_report(self) -> Optional[Path]:
+        """Записати JSON-звіт запуску в report_dir"""
+        if self.metrics is None:
+            return None
+        return self.metrics.write_report(self.report_dir / f"run_report_{self.run_id}.json")
 
-        # Визначити колонії
-        if not prey_data.empty:
-            rookeries = gbif_obis.filter_rookeries(prey_data, min_observations=10)
-            rookeries.to_file(
-                self.paths['data_raw'] / "biodiversity" / "marine_mammal_rookeries.gpkg",
-                driver="GPKG"
-            )
+    def _collection_jobs(self) -> list:
+        """
+        Сформувати список незалежних задач збору даних
 
-        # 3. NASA OceanColor - MODIS SST and Chlorophyll
-        logger.info("3/9: Collecting MODIS SST and Chlorophyll data...")
+        Returns:
+        --------
+        jobs : list
+            Список кортежів (name, source, func)
+        """
         nasa_creds = self.config.get('credentials', {}).get('nasa_earthdata', {})
-        nasa = NASAOceanCollector(
-            username=nasa_creds.get('username'),
-            password=nasa_creds.get('password')
-        )
-        sst_data = nasa.download_modis_sst(self.date_range, self.bbox, save=True)
-        chl_data = nasa.download_modis_chlorophyll(self.date_range, self.bbox, save=True)
-
-        # 4. Copernicus Marine - Sea Level Anomaly
-        logger.info("4/9: Collecting Sea Level Anomaly data...")
         copernicus_creds = self.config.get('credentials', {}).get('copernicus_marine', {})
-        copernicus = CopernicusCollector(
-            username=copernicus_creds.get('username'),
-            password=copernicus_creds.get('password')
+        granule_workers = self.config.get('collection', {}).get('granule_workers', 4)
+
+        def collect_biodiversity():
+            from data_collection.gbif_obis_collector import GBIFOBISCollector
+
+            # GBIF/OBIS - Marine Mammals and Orcas
+            gbif_obis = GBIFOBISCollector(cache=self.response_cache)
+
+            prey_species = [sp['scientific_name'] for sp in self.config['prey_species']]
+            prey_data = gbif_obis.collect_prey_species(prey_species, self.bbox, save=True)
+            gbif_obis.collect_orca_data(self.bbox, save=True, return_features=False)
+
+            # Визначити колонії
+            if not prey_data.empty:
+                rookeries = gbif_obis.filter_rookeries(prey_data, min_observations=10)
+                rookeries.to_file(self._raw_file('rookeries'), driver="GPKG")
+
+        def collect_modis_sst():
+            from data_collection.nasa_ocean_collector import NASAOceanCollector
+            nasa = NASAOceanCollector(
+                username=nasa_creds.get('username'),
+                password=nasa_creds.get('password'),
+                max_workers=granule_workers
+            )
+            product = self.config['data_products']['modis_sst']
+            return nasa.download_modis_sst(
+                self.date_range, self.bbox, save=True,
+                remote_subset=product.get('remote_subset', False),
+                variables=product.get('variables')
+            )
+
+        def collect_modis_chlorophyll():
+            from data_collection.nasa_ocean_collector import NASAOceanCollector
+            nasa = NASAOceanCollector(
+                username=nasa_creds.get('username'),
+                password=nasa_creds.get('password'),
+                max_workers=granule_workers
+            )
+            product = self.config['data_products']['modis_chlorophyll']
+            return nasa.download_modis_chlorophyll(
+                self.date_range, self.bbox, save=True,
+                remote_subset=product.get('remote_subset', False),
+                variables=product.get('variables')
+            )
+
+        def collect_sea_level():
+            from data_collection.copernicus_collector import CopernicusCollector
+            copernicus = CopernicusCollector(
+                username=copernicus_creds.get('username'),
+                password=copernicus_creds.get('password'),
+                max_workers=granule_workers
+            )
+            product = self.config['data_products']['copernicus_sla']
+            return copernicus.download_sea_level_anomaly(
+                self.date_range, self.bbox, save=True,
+                window_freq=product.get('download_window', 'MS'),
+                variables=product.get('variables')
+            )
+
+        def collect_salinity():
+            from data_collection.smap_collector import SMAPCollector
+            smap = SMAPCollector(
+                username=nasa_creds.get('username'),
+                password=nasa_creds.get('password'),
+                max_workers=granule_workers
+            )
+            return smap.download_salinity(self.date_range, self.bbox, save=True)
+
+        def collect_oxygen():
+            from data_collection.woa_collector import WOACollector
+            return WOACollector(cache=self.response_cache).download_oxygen(save=True)
+
+        def collect_bathymetry():
+            from data_collection.gebco_collector import GEBCOCollector
+            return GEBCOCollector().download_bathymetry(self.bbox, resolution="15s", save=True)
+
+        def collect_shipping_lanes():
+            from data_collection.shipping_lanes_collector import ShippingLanesCollector
+
+            # Генералізація геометрії до половини кроку сітки
+            resolution = self.config['spatial']['resolution']
+            ShippingLanesCollector(cache=self.response_cache).download_shipping_lanes(
+                self.bbox, save=True,
+                max_allowable_offset=resolution / 2,
+                return_features=False
+            )
+
+        return [
+            ('gbif_obis', 'gbif_obis', collect_biodiversity),
+            ('modis_sst', 'earthdata', collect_modis_sst),
+            ('modis_chlorophyll', 'earthdata', collect_modis_chlorophyll),
+            ('copernicus_sla', 'copernicus', collect_sea_level),
+            ('smap_salinity', 'earthdata', collect_salinity),
+            ('woa_oxygen', 'ncei', collect_oxygen),
+            ('gebco_bathymetry', 'gebco', collect_bathymetry),
+            ('shipping_lanes', 'noaa_arcgis', collect_shipping_lanes),
+        ]
+
+    def _timed_job(self, name: str, func):
+        """Обгорнути задачу етапом метрик name"""
+        def job(*args):
+            with self._stage(name):
+                return func(*args)
+        return job
+
+    def _raw_file(self, layer: str) -> Path:
+        """Шлях до векторного шару, який записують колектори"""
+        files = {
+            'rookeries': "biodiversity/marine_mammal_rookeries.gpkg",
+            'orca': "biodiversity/orca_occurrences.gpkg",
+            'shipping_lanes': "shipping/shipping_lanes.gpkg",
+            'shark_tracks': "ocearch/white_shark_tracks.gpkg",
+        }
+        return self.paths['data_raw'] / files[layer]
+
+    def _open_raw_grid(self, product: str):
+        """
+        Відкрити збережені гранули продукту NASA, обрізані до bbox
+
+        Використовується, коли крок обробки запускається окремо від збору.
+        """
+        import xarray as xr
+        from utils.remote_subset import subset_bbox
+
+        files = self._raw_grid_files(product)
+        if not files:
+            raise FileNotFoundError(
+                f"No saved granules of {product} for {self.date_range} "
+                f"in {self.paths['data_raw'] / 'nasa_ocean' / product}"
+            )
+
+        return subset_bbox(xr.open_mfdataset(files, combine='by_coords'), self.bbox)
+
+    def _raw_grid_files(self, product: str) -> list:
+        """
+        Збережені гранули продукту NASA для поточного запуску
+
+        Файли беруться з маніфесту (GranuleManager) і лише ті, що
+        перетинають date_range. У режимі remote_subset - subset-и
+        поточних bbox і variables, а не залишки інших діапазонів чи регіонів.
+        """
+        from utils.granule_manager import files_in_range
+        from utils.remote_subset import subset_digest
+
+        settings = self.config['data_products'][product]
+        directory = self.paths['data_raw'] / "nasa_ocean" / product
+
+        if not settings.get('remote_subset', False):
+            return files_in_range(directory, self.date_range)
+
+        suffix = f".{subset_digest(self.bbox, settings.get('variables'))}.nc"
+        return [path for path in files_in_range(directory / "subset", self.date_range)
+                if path.name.endswith(suffix)]
+
+    def _processing_tasks(self) -> list:
+        """
+        Задачі обробки та синтезу з їхніми залежностями
+
+        Кожна задача бере результат попередньої з inputs, а якщо його
+        немає (крок запущено окремо або задачу пропущено як актуальну) -
+        читає збережені файли.
+
+        build описує, від чого залежить результат задачі (для BuildCache):
+        inputs - функція, що повертає вхідні файли, params - релевантна
+        частина конфігурації, code - модулі реалізації, outputs - виходи.
+
+        Returns:
+        --------
+        tasks : list
+            Список кортежів (name, deps, func, build), func(inputs)
+        """
+        from processing.standardize_data import DataStandardizer
+
+        processed_dir = self.paths['data_processed']
+        distance_cfg = self.config.get('processing', {}).get('distance', {})
+        kde_cfg = self.config.get('processing', {}).get('kde', {})
+        regrid_cfg = self.config.get('processing', {}).get('regrid', {})
+        orca_outputs = ["Orca_Density_Index.tif"]
+        if kde_cfg.get('period') in ('week', 'season'):
+            orca_outputs.append(
+                "Orca_Density_weekly.nc" if kde_cfg['period'] == 'week' else "Orca_Density_seasonal.nc"
+            )
+        standardizer = DataStandardizer(
+            self.bbox, resolution=self.config['spatial']['resolution'],
+            output_dir=str(processed_dir),
+            distance_method=distance_cfg.get('method', 'kdtree'),
+            line_distance_method=distance_cfg.get('lines'),
+            regrid_weights_dir=(str(processed_dir / ".regrid_weights")
+                                if regrid_cfg.get('cache_weights', True) else None),
+            regrid_chunk_mb=regrid_cfg.get('chunk_mb', 256)
         )
-        sla_data = copernicus.download_sea_level_anomaly(self.date_range, self.bbox, save=True)
+        if self.metrics is not None:
+            self.metrics.instrument(standardizer, prefix='standardize')
+
+        synthetic_cfg = self.config.get('synthetic', {})
+
+        def standardize_sst(inputs):
+            ds = inputs.get('collect.modis_sst')
+            return standardizer.process_sst(ds if ds is not None else self._open_raw_grid("modis_sst"))
+
+        def standardize_sst_gradient(inputs):
+            import xarray as xr
+            sst = inputs.get('standardize.sst')
+            if sst is None:
+                sst = xr.load_dataarray(processed_dir / "SST_weekly.nc")
+            return standardizer.process_sst_gradient(sst)
+
+        def standardize_chlorophyll(inputs):
+            ds = inputs.get('collect.modis_chlorophyll')
+            if ds is None:
+                ds = self._open_raw_grid("modis_chlorophyll")
+            return standardizer.process_chlorophyll(ds)
+
+        def standardize_bathymetry(inputs):
+            import xarray as xr
+            grid = inputs.get('collect.gebco_bathymetry')
+            if grid is None:
+                grid = xr.open_dataarray(self.paths['data_raw'] / "gebco" / "gebco_bathymetry_15s.nc")
+            return standardizer.process_bathymetry(grid)
+
+        def standardize_rookeries(inputs):
+            import geopandas as gpd
+            return standardizer.process_rookeries(gpd.read_file(self._raw_file('rookeries')))
+
+        def standardize_orca_density(inputs):
+            import geopandas as gpd
+            return standardizer.process_orca_density(
+                gpd.read_file(self._raw_file('orca')),
+                bandwidth_km=kde_cfg.get('bandwidth', 50), period=kde_cfg.get('period')
+            )
+
+        def standardize_shipping_lanes(inputs):
+            import geopandas as gpd
+            return standardizer.process_shipping_lanes(gpd.read_file(self._raw_file('shipping_lanes')))
+
+        def nursery_index(inputs):
+            from synthetic.nursery_index import NurserySuitabilityCalculator
+
+            criteria = synthetic_cfg.get('nursery_index', {})
+            summer_months = criteria.get('summer_months', [6, 7, 8])
+            calculator = NurserySuitabilityCalculator(
+                max_depth=criteria.get('max_depth', 100),
+                max_slope=criteria.get('max_slope', 5),
+                min_sst_summer=criteria.get('min_sst_summer', 16),
+                summer_months=summer_months
+            )
+
+            sst = inputs.get('standardize.sst')
+            chlorophyll = inputs.get('standardize.chlorophyll')
+            bathymetry = inputs.get('standardize.bathymetry')
+            if sst is None or chlorophyll is None or bathymetry is None:
+                return calculator.calculate_from_files(
+                    depth_file=str(processed_dir / "Depth.tif"),
+                    slope_file=str(processed_dir / "Slope.tif"),
+                    sst_files=[str(processed_dir / "SST_weekly.nc")],
+                    chlorophyll_files=[str(processed_dir / "Chlorophyll_weekly.nc")],
+                    save=True, output_dir=str(processed_dir)
+                )
+
+            depth, slope = bathymetry
+            sst_summer = sst.where(sst.time.dt.month.isin(summer_months), drop=True).mean('time')
+            return calculator.calculate_index(
+                depth.values, slope, sst_summer.values, chlorophyll.mean('time').values,
+                transform=standardizer.transform, save=True, output_dir=str(processed_dir)
+            )
+
+        def absence_points(inputs):
+            tracks_file = self._raw_file('shark_tracks')
+            if not tracks_file.exists():
+                logger.warning(f"No shark tracks at {tracks_file}, absence points not generated")
+                return None
+
+            import geopandas as gpd
+            from synthetic.generate_absence_points import AbsencePointsGenerator
+
+            absence_cfg = synthetic_cfg.get('absence_points', {})
+            generator = AbsencePointsGenerator(
+                buffer_distance_km=absence_cfg.get('buffer_distance', 100),
+                random_seed=absence_cfg.get('random_seed', 42),
+                buffer_method=absence_cfg.get('buffer_method', 'degrees')
+            )
+            return generator.generate_for_all_life_stages(
+                gpd.read_file(tracks_file), self.bbox,
+                ratio=absence_cfg.get('ratio', 1.0), save=True, output_dir=str(processed_dir)
+            )
+
+        # Параметри сітки впливають на всі растрові виходи
+        grid = {'bbox': self.bbox, 'resolution': self.config['spatial']['resolution']}
+        standardize_code = ['processing.standardize_data', 'utils.spatial_utils', 'utils.regrid',
+                            'utils.temporal_utils']
+
+        def build(inputs, outputs, params=None, code=standardize_code):
+            return {
+                'inputs': inputs,
+                'outputs': [processed_dir / name for name in outputs],
+                'params': {**grid, **(params or {})},
+                'code': code
+            }
+
+        def files(*paths):
+            return lambda: list(paths)
+
+        def granules(product):
+            """Гранули продукту в date_range; параметри - діапазон і налаштування вибірки"""
+            settings = self.config['data_products'][product]
+            return (lambda: self._raw_grid_files(product)), {
+                'date_range': [str(date) for date in self.date_range],
+                'product': {key: settings.get(key) for key in ('variables', 'remote_subset')}
+            }
+
+        sst_inputs, sst_params = granules('modis_sst')
+        chlorophyll_inputs, chlorophyll_params = granules('modis_chlorophyll')
+
+        nursery_inputs = [processed_dir / name for name in
+                          ("Depth.tif", "Slope.tif", "SST_weekly.nc", "Chlorophyll_weekly.nc")]
+        life_stages = ['Adult_Male', 'Adult_Female', 'Juvenile']
+
+        return [
+            ('standardize.sst', ['collect.modis_sst'], standardize_sst,
+             build(sst_inputs, ["SST_weekly.nc"], params=sst_params)),
+            ('standardize.sst_gradient', ['standardize.sst'], standardize_sst_gradient,
+             build(files(processed_dir / "SST_weekly.nc"), ["SST_gradient.nc"])),
+            ('standardize.chlorophyll', ['collect.modis_chlorophyll'], standardize_chlorophyll,
+             build(chlorophyll_inputs, ["Chlorophyll_weekly.nc"], params=chlorophyll_params)),
+            ('standardize.bathymetry', ['collect.gebco_bathymetry'], standardize_bathymetry,
+             build(files(self.paths['data_raw'] / "gebco" / "gebco_bathymetry_15s.nc"),
+                   ["Depth.tif", "Slope.tif"])),
+            ('standardize.rookeries', ['collect.gbif_obis'], standardize_rookeries,
+             build(files(self._raw_file('rookeries')), ["Dist_to_Rookery.tif"],
+                   params={'distance': distance_cfg})),
+            ('standardize.orca_density', ['collect.gbif_obis'], standardize_orca_density,
+             build(files(self._raw_file('orca')), orca_outputs, params={'kde': kde_cfg})),
+            ('standardize.shipping_lanes', ['collect.shipping_lanes'], standardize_shipping_lanes,
+             build(files(self._raw_file('shipping_lanes')), ["Dist_to_Shipping_Lane.tif"],
+                   params={'distance': distance_cfg})),
+            ('synthetic.nursery_index',
+             ['standardize.sst', 'standardize.chlorophyll', 'standardize.bathymetry'], nursery_index,
+             build(files(*nursery_inputs), ["Nursery_Suitability_Index.tif"],
+                   params={'nursery_index': synthetic_cfg.get('nursery_index', {})},
+                   code=['synthetic.nursery_index', 'utils.spatial_utils', 'utils.temporal_utils'])),
+            ('synthetic.absence_points', [], absence_points,
+             build(files(self._raw_file('shark_tracks')),
+                   [f"absence_points_{stage}.gpkg" for stage in life_stages],
+                   params={'absence_points': synthetic_cfg.get('absence_points', {})},
+                   code=['synthetic.generate_absence_points', 'utils.spatial_utils'])),
+        ]
+
+    def _incremental(self, name: str, func, build: dict):
+        """
+        Обгорнути задачу обробки перевіркою відбитка
 
-        # 5. SMAP - Sea Surface Salinity
-        logger.info("5/9: Collecting SMAP Salinity data...")
-        smap = SMAPCollector(
-            username=nasa_creds.get('username'),
-            password=nasa_creds.get('password')
+        Актуальна задача не виконується і повертає None - залежні задачі
+        тоді читають її виходи з диску.
+        """
+        def task(inputs):
+            fingerprint = self.build_cache.fingerprint(
+                build['inputs'](), params=build['params'], code=build['code']
+            )
+            if self.build_cache.is_fresh(name, fingerprint, build['outputs']):
+                logger.info(f"[{name}] up to date, skipped")
+                increment_counter('build.up_to_date')
+                return None
+
+            result = func(inputs)
+            self.build_cache.record(name, fingerprint, build['outputs'])
+            increment_counter('build.rebuilt')
+            return result
+        return task
+
+    def build_task_graph(self, stages: tuple = ('collect', 'standardize', 'synthetic')) -> TaskGraph:
+        """
+        Побудувати DAG pipeline з вибраних груп задач
+
+        Залежності на задачі з невибраних груп відкидаються - такі задачі
+        читають збережені результати попередніх запусків.
+
+        Parameters:
+        -----------
+        stages : tuple
+            Групи задач: 'collect', 'standardize', 'synthetic'
+
+        Returns:
+        --------
+        graph : TaskGraph
+        """
+        collection_cfg = self.config.get('collection', {})
+        pipeline_cfg = self.config.get('pipeline', {})
+
+        if 'max_workers' in collection_cfg:
+            logger.warning("collection.max_workers is ignored; "
+                           "collectors run in the task graph (pipeline.max_workers)")
+
+        source_limits = dict(collection_cfg.get('source_limits') or {})
+        source_limits['processing'] = pipeline_cfg.get('processing_workers', 2)
+
+        graph = TaskGraph(
+            max_workers=pipeline_cfg.get('max_workers', 6),
+            source_limits=source_limits
         )
-        salinity_data = smap.download_salinity(self.date_range, self.bbox, save=True)
 
-        # 6. WOA - Dissolved Oxygen
-        logger.info("6/9: Collecting WOA Dissolved Oxygen data...")
-        woa = WOACollector()
-        oxygen_data = woa.download_oxygen(save=True)
+        tasks = []
+        if 'collect' in stages:
+            tasks += [(f"collect.{name}", [], source, lambda inputs, func=func: func())
+                      for name, source, func in self._collection_jobs()]
+        if 'standardize' in stages or 'synthetic' in stages:
+            tasks += [(name, deps, 'processing', self._incremental(name, func, build))
+                      for name, deps, func, build in self._processing_tasks()
+                      if name.split('.')[0] in stages]
+
+        names = {name for name, _, _, _ in tasks}
+        for name, deps, source, func in tasks:
+            graph.add_task(name, self._timed_job(name, func),
+                           deps=[dep for dep in deps if dep in names], source=source)
+
+        return graph
+
+    def _run_graph(self, stages: tuple) -> TaskGraph:
+        graph = self.build_task_graph(stages)
+        graph.run()
+        graph.log_summary()
+        logger.info(f"Build cache: {self.build_cache.stats()}")
+        return graph
 
-        # 7. GEBCO - Bathymetry
-        logger.info("7/9: Collecting GEBCO Bathymetry data...")
-        gebco = GEBCOCollector()
-        bathy_data = gebco.download_bathymetry(self.bbox, resolution="15s", save=True)
+    def step_1_collect_data(self):
+        """Крок 1: Збір даних з усіх джерел"""
+        logger.info("\n" + "=" * 70)
+        logger.info("STEP 1: DATA COLLECTION")
+        logger.info("=" * 70 + "\n")
 
-        # 8. Global Fishing Watch
-        logger.info("8/9: Collecting Global Fishing Watch data...")
+        # OCEARCH Shark Tracks
+        logger.warning("OCEARCH requires permission - see data_collection/ocearch_collector.py")
+        # from data_collection.ocearch_collector import OCEARCHCollector
+        # ocearch = OCEARCHCollector(cache=self.response_cache)
+        # shark_tracks = ocearch.collect_all_white_shark_tracks(save=True)
+
+        # Global Fishing Watch
         logger.warning("GFW requires API token - see config/config.yaml")
         # gfw_token = self.config['credentials']['global_fishing_watch']['api_token']
+        # from data_collection.gfw_collector import GFWCollector
         # gfw = GFWCollector(api_token=gfw_token)
         # fishing_data = gfw.download_fishing_effort(self.date_range, self.bbox, save=True)
 
-        # 9. Shipping Lanes
-        logger.info("9/9: Collecting Shipping Lanes data...")
-        shipping = ShippingLanesCollector()
-        lanes_data = shipping.download_shipping_lanes(self.bbox, save=True)
+        # Незалежні джерела збираються паралельно з лімітами collection.source_limits
+        self._run_graph(('collect',))
+
+        if self.response_cache is not None:
+            logger.info(f"Response cache: {self.response_cache.stats()}")
 
         logger.info("\nStep 1: Data collection completed!")
 
@@ -157,24 +602,8 @@ class SharkVoyagerPipeline:
         logger.info("STEP 2: DATA PROCESSING AND STANDARDIZATION")
         logger.info("=" * 70 + "\n")
 
-        standardizer = DataStandardizer(self.bbox, resolution=0.1)
-
-        # Тут потрібно завантажити збережені дані та обробити їх
-        # Приклад структури:
-
-        # logger.info("Processing SST data...")
-        # sst_ds = xr.open_mfdataset("./data/raw/nasa_ocean/modis_sst/*.nc")
-        # standardizer.process_sst(sst_ds)
-
-        # logger.info("Processing Chlorophyll data...")
-        # chl_ds = xr.open_mfdataset("./data/raw/nasa_ocean/modis_chlorophyll/*.nc")
-        # standardizer.process_chlorophyll(chl_ds)
-
-        # logger.info("Processing Bathymetry...")
-        # bathy = xr.open_dataarray("./data/raw/gebco/gebco_bathymetry_15s.nc")
-        # standardizer.process_bathymetry(bathy)
-
-        # і т.д. для інших даних...
+        # Обробка шарів зі збережених даних, незалежні шари паралельно
+        self._run_graph(('standardize',))
 
         logger.info("\nStep 2: Data processing completed!")
 
@@ -184,26 +613,8 @@ class SharkVoyagerPipeline:
         logger.info("STEP 3: GENERATE SYNTHETIC VARIABLES")
         logger.info("=" * 70 + "\n")
 
-        # 1. Генерувати точки відсутності
-        logger.info("Generating absence points...")
-
-        # absence_gen = AbsencePointsGenerator(buffer_distance_km=100)
-        # presence_points = gpd.read_file("./data/raw/ocearch/white_shark_tracks.gpkg")
-        # absence_datasets = absence_gen.generate_for_all_life_stages(
-        #     presence_points, self.bbox, save=True
-        # )
-
-        # 2. Розрахувати Nursery Suitability Index
-        logger.info("Calculating Nursery Suitability Index...")
-
-        # nursery_calc = NurserySuitabilityCalculator()
-        # nursery_index = nursery_calc.calculate_from_files(
-        #     depth_file="./data/processed/Depth.tif",
-        #     slope_file="./data/processed/Slope.tif",
-        #     sst_files=["./data/processed/SST_weekly.nc"],
-        #     chlorophyll_files=["./data/processed/Chlorophyll_weekly.nc"],
-        #     save=True
-        # )
+        # Точки відсутності та Nursery Suitability Index зі збережених шарів
+        self._run_graph(('synthetic',))
 
         logger.info("\nStep 3: Synthetic variables generated!")
 
@@ -219,14 +630,35 @@ class SharkVoyagerPipeline:
         logger.info("Integrating all data layers...")
         logger.info("\nStep 4: Data integration completed!")
 
+    def run_step(self, step: str):
+        """Виконати один крок як етап метрик"""
+        steps = {
+            'collect': self.step_1_collect_data,
+            'process': self.step_2_process_data,
+            'synthetic': self.step_3_generate_synthetic,
+            'integrate': self.step_4_integrate_data,
+        }
+        with self._stage(step):
+            steps[step]()
+
     def run_all(self):
         """Виконати весь pipeline"""
         logger.info("\nRunning complete pipeline...\n")
 
-        self.step_1_collect_data()
-        self.step_2_process_data()
-        self.step_3_generate_synthetic()
-        self.step_4_integrate_data()
+        # Збір, обробка та синтез як один граф: обробка шару починається,
+        # щойно завантажено його дані, паралельно з іншими джерелами
+        with self._stage('graph'):
+            graph = self._run_graph(('collect', 'standardize', 'synthetic'))
+
+        if self.response_cache is not None:
+            logger.info(f"Response cache: {self.response_cache.stats()}")
+
+        self.run_step('integrate')
+
+        failed = [row['name'] for row in graph.summary() if row['status'] != 'ok']
+        if failed:
+            logger.warning(f"Pipeline finished with failed or skipped tasks: {', '.join(failed)}")
+            return
 
         logger.info("\n" + "=" * 70)
         logger.info("PIPELINE COMPLETED SUCCESSFULLY!")
@@ -254,22 +686,38 @@ def main():
         help='Pipeline step to run'
     )
 
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Serve API responses only from the local response cache'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile each step and worker task with cProfile (.prof files next to the run report)'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Recompute processing outputs even if their inputs and parameters are unchanged'
+    )
+
     args = parser.parse_args()
 
     # Створити pipeline
-    pipeline = SharkVoyagerPipeline(config_path=args.config)
-
-    # Виконати вибраний крок
-    if args.step == 'all':
-        pipeline.run_all()
-    elif args.step == 'collect':
-        pipeline.step_1_collect_data()
-    elif args.step == 'process':
-        pipeline.step_2_process_data()
-    elif args.step == 'synthetic':
-        pipeline.step_3_generate_synthetic()
-    elif args.step == 'integrate':
-        pipeline.step_4_integrate_data()
+    pipeline = SharkVoyagerPipeline(config_path=args.config, offline=args.offline,
+                                    profile=args.profile, force=args.force)
+
+    # Виконати вибраний крок; звіт пишеться і після помилки
+    try:
+        if args.step == 'all':
+            pipeline.run_all()
+        else:
+            pipeline.run_step(args.step)
+    finally:
+        pipeline.write_run_report()
 
 
 if __name__ == "__main__":
@@ -5,56 +5,186 @@ Copernicus Marine data collector
 
 import copernicusmarine
 import xarray as xr
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+import json
 import logging
-from typing import Optional, Tuple
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.temporal_utils import split_date_range
+from utils.profiling import increment_counter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SLA_DATASET_ID = "cmems_obs-sl_glo_phy-ssh_my_allsat-l4-duacs-0.25deg_P1D"
+SLA_VARIABLES = ["sla", "adt"]
+
 
 class CopernicusCollector:
     """Collector for Copernicus Marine sea level data"""
 
     def __init__(self, username: Optional[str] = None, password: Optional[str] = None,
-                 data_dir: str = "./data/raw/copernicus"):
+                 data_dir: str = "./data/raw/copernicus", max_workers: int = 4):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.username = username
         self.password = password
+        self.max_workers = max_workers
+        self._manifest_lock = threading.Lock()
+
+    def _load_manifest(self, manifest_file: Path) -> dict:
+        if manifest_file.exists():
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self, manifest_file: Path, manifest: dict):
+        tmp_file = manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        tmp_file.replace(manifest_file)
+
+    def _download_window(self, dataset_id: str, variables: List[str], bbox: dict,
+                         window: Tuple[str, str], output_file: Path):
+        """Завантажити одне часове вікно в окремий файл"""
+        part_file = output_file.with_suffix('.part.nc')
+        if part_file.exists():
+            part_file.unlink()
+
+        copernicusmarine.subset(
+            dataset_id=dataset_id,
+            variables=variables,
+            minimum_longitude=bbox['min_lon'],
+            maximum_longitude=bbox['max_lon'],
+            minimum_latitude=bbox['min_lat'],
+            maximum_latitude=bbox['max_lat'],
+            start_datetime=window[0],
+            end_datetime=window[1],
+            output_filename=part_file.name,
+            output_directory=str(output_file.parent),
+            username=self.username,
+            password=self.password
+        )
+
+        part_file.replace(output_file)
+        increment_counter('copernicus.bytes', output_file.stat().st_size)
+        increment_counter('copernicus.windows')
 
     def download_sea_level_anomaly(self, date_range: Tuple[str, str], bbox: dict,
-                                   save: bool = True) -> xr.Dataset:
-        logger.info(f"Downloading Sea Level Anomaly data for {date_range}...")
+                                   save: bool = True, window_freq: str = "MS",
+                                   variables: Optional[List[str]] = None) -> xr.Dataset:
+        """
+        Завантажити Sea Level Anomaly
 
-        dataset_id = "cmems_obs-sl_glo_phy-ssh_my_allsat-l4-duacs-0.25deg_P1D"
+        При save=True запит розбивається на часові вікна (за замовчуванням
+        місячні), які завантажуються паралельно, кожне у власний файл.
+        Маніфест (sla/manifest.json) відстежує завершені вікна, тому
+        повторний запуск завантажує лише відсутні або невдалі вікна.
 
-        output_file = self.data_dir / f"sla_{date_range[0]}_{date_range[1]}.nc"
+        Parameters:
+        -----------
+        date_range : tuple
+            (start_date, end_date)
+        bbox : dict
+            Bounding box
+        save : bool
+            Зберегти файли (інакше - віддалене відкриття)
+        window_freq : str
+            Частота вікон pandas ('MS' - місяці, 'QS' - квартали)
+        variables : list, optional
+            Змінні (default: ['sla', 'adt'])
 
-        if save:
-            copernicusmarine.subset(
-                dataset_id=dataset_id,
-                variables=["sla", "adt"],
-                minimum_longitude=bbox['min_lon'],
-                maximum_longitude=bbox['max_lon'],
-                minimum_latitude=bbox['min_lat'],
-                maximum_latitude=bbox['max_lat'],
-                start_datetime=date_range[0],
-                end_datetime=date_range[1],
-                output_filename=output_file.name,
-                output_directory=str(self.data_dir)
-            )
-            ds = xr.open_dataset(output_file)
-        else:
+        Returns:
+        --------
+        ds : xr.Dataset
+            Лінивий dataset, об'єднаний по часу
+        """
+        logger.info(f"Downloading Sea Level Anomaly data for {date_range}...")
+
+        dataset_id = SLA_DATASET_ID
+        variables = variables or SLA_VARIABLES
+
+        if not save:
             ds = copernicusmarine.open_dataset(
                 dataset_id=dataset_id,
+                variables=variables,
                 minimum_longitude=bbox['min_lon'],
                 maximum_longitude=bbox['max_lon'],
                 minimum_latitude=bbox['min_lat'],
                 maximum_latitude=bbox['max_lat'],
                 start_datetime=date_range[0],
-                end_datetime=date_range[1]
+                end_datetime=date_range[1],
+                username=self.username,
+                password=self.password
             )
+            logger.info(f"Loaded SLA data: {ds}")
+            return ds
+
+        output_dir = self.data_dir / "sla"
+        output_dir.mkdir(exist_ok=True)
+        manifest_file = output_dir / "manifest.json"
+        manifest = self._load_manifest(manifest_file)
+
+        # Параметри запиту, від яких залежить вміст вікна
+        request = {
+            'dataset_id': dataset_id,
+            'variables': sorted(variables),
+            'bbox': {k: float(v) for k, v in bbox.items()}
+        }
+
+        windows = split_date_range(date_range[0], date_range[1], window_freq)
+        files = []
+        missing = []
+
+        for window in windows:
+            output_file = output_dir / f"sla_{window[0]}_{window[1]}.nc"
+            entry = manifest.get(output_file.name)
+            if entry is not None and entry['request'] == request and output_file.exists():
+                files.append(output_file)
+            else:
+                missing.append((window, output_file))
+
+        logger.info(f"{len(files)} windows up to date, {len(missing)} to download")
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._download_window, dataset_id, variables,
+                                bbox, window, output_file): (window, output_file)
+                for window, output_file in missing
+            }
+
+            for future in as_completed(futures):
+                window, output_file = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Failed to download SLA window {window}: {e}")
+                    failed.append(window)
+                    continue
+
+                files.append(output_file)
+                with self._manifest_lock:
+                    manifest[output_file.name] = {
+                        'start': window[0],
+                        'end': window[1],
+                        'request': request,
+                        'size': output_file.stat().st_size
+                    }
+                    self._save_manifest(manifest_file, manifest)
+
+        if failed:
+            logger.warning(f"{len(failed)} SLA windows failed, rerun to retry: {sorted(failed)}")
+
+        if not files:
+            logger.warning("No SLA data downloaded")
+            return None
+
+        ds = xr.open_mfdataset(sorted(files), combine='by_coords')
 
         logger.info(f"Loaded SLA data: {ds}")
         return ds
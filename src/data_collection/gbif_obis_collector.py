@@ -3,41 +3,256 @@ GBIF/OBIS data collector
 Збір даних про морських ссавців (здобич) та косаток (конкуренти/хижаки)
 """
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
 from pygbif import occurrences as gbif_occ
 from pygbif import species as gbif_species
 from pyobis import occurrences as obis_occ
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional
 from pathlib import Path
 import logging
+import os
+import queue
+import threading
 import time
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.paging import ColumnarBuffer, retry_with_backoff, split_bbox
+from utils.response_cache import ResponseCache, cached_json
+from utils.spatial_utils import (
+    EARTH_RADIUS_KM, dataframe_to_geodataframe, points_to_geodataframe,
+    unit_vectors, unit_vectors_to_lonlat
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Обмеження GBIF occurrence search API
+GBIF_PAGE_SIZE = 300          # максимум записів на сторінку
+GBIF_MAX_OFFSET = 100000      # offset + limit не може перевищувати це значення
+GBIF_MAX_TILE_DEPTH = 4       # максимальна глибина розбиття bbox на тайли
+
+# OBIS occurrence API: курсорна пагінація через параметр 'after'
+OBIS_PAGE_SIZE = 5000         # записів на сторінку (максимум API: 10000)
+
+# Колонки, що зберігаються при потоковому записі OBIS на диск
+OBIS_STREAM_FIELDS = [
+    'id', 'scientificName', 'decimalLongitude', 'decimalLatitude',
+    'eventDate', 'date_year', 'basisOfRecord', 'individualCount',
+    'datasetID', 'dataset_id', 'occurrenceID'
+]
+
+# Відповідні поля GBIF для тієї ж схеми
+GBIF_STREAM_FIELDS = {'key': 'id', 'year': 'date_year', 'datasetKey': 'datasetID'}
+
+# Числові поля схеми (решта - рядки)
+_NUMERIC_STREAM_FIELDS = ['decimalLongitude', 'decimalLatitude', 'date_year', 'individualCount']
+
+# Маркер завершення тайлу в черзі батчів
+_TILE_DONE = object()
+
+
+def _bbox_to_wkt(bbox: dict) -> str:
+    """Bounding box у WKT POLYGON для OBIS"""
+    return (
+        f"POLYGON(("
+        f"{bbox['min_lon']} {bbox['min_lat']}, "
+        f"{bbox['max_lon']} {bbox['min_lat']}, "
+        f"{bbox['max_lon']} {bbox['max_lat']}, "
+        f"{bbox['min_lon']} {bbox['max_lat']}, "
+        f"{bbox['min_lon']} {bbox['min_lat']}))"
+    )
+
 
 class GBIFOBISCollector:
     """
     Collector for marine mammal and orca observations from GBIF/OBIS
     """
 
-    def __init__(self, data_dir: str = "./data/raw/biodiversity"):
+    def __init__(
+        self,
+        data_dir: str = "./data/raw/biodiversity",
+        max_workers: int = 4,
+        max_retries: int = 3,
+        cache: Optional[ResponseCache] = None
+    ):
         """
         Parameters:
         -----------
         data_dir : str
             Директорія для збереження даних
+        max_workers : int
+            Кількість паралельних запитів сторінок
+        max_retries : int
+            Кількість повторних спроб для кожної сторінки
+        cache : ResponseCache, optional
+            Дисковий кеш відповідей GBIF/OBIS
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.cache = cache
+
+    def _harvest_obis_tile(
+        self,
+        params: dict,
+        geometry: Optional[str],
+        page_size: int,
+        out_queue: queue.Queue,
+        stop_event: threading.Event
+    ):
+        """
+        Зібрати один тайл OBIS курсором 'after' і покласти сторінки в чергу
+
+        Черга обмежена, тому тайли не завантажуються швидше, ніж
+        споживач встигає обробляти батчі.
+        """
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    out_queue.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        try:
+            after = None
+            n_fetched = 0
+            while not stop_event.is_set():
+                query = dict(params, size=page_size)
+                if geometry:
+                    query['geometry'] = geometry
+                if after:
+                    query['after'] = after
+
+                result = cached_json(
+                    self.cache, 'obis_occurrence_search', query,
+                    lambda: retry_with_backoff(
+                        obis_occ.search, retries=self.max_retries, **query
+                    )
+                )
+                records = (result or {}).get('results') or []
+                if not records:
+                    break
+
+                put(pd.DataFrame(records))
+                n_fetched += len(records)
+
+                # Сервер може обрізати size нижче page_size - орієнтуватись на total
+                total = result.get('total')
+                if total is not None:
+                    done = n_fetched >= total
+                else:
+                    done = len(records) < page_size
+                if done or 'id' not in records[-1]:
+                    break
+                after = records[-1]['id']
+
+        except Exception as e:
+            put(e)
+        finally:
+            put(_TILE_DONE)
+
+    def iter_obis_batches(
+        self,
+        species_name: str,
+        bbox: Optional[dict] = None,
+        max_records: Optional[int] = None,
+        tiles: tuple = (2, 2),
+        page_size: int = OBIS_PAGE_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Потоково зібрати дані OBIS батчами
+
+        Bbox ділиться на тайли, які завантажуються паралельно; кожен тайл
+        гортається курсором 'after'. Записи дедуплікуються за OBIS id,
+        тому точки на спільних межах тайлів не повторюються.
+
+        Parameters:
+        -----------
+        species_name : str
+            Наукова назва виду
+        bbox : dict, optional
+            Bounding box (min_lon, max_lon, min_lat, max_lat)
+        max_records : int, optional
+            Максимальна кількість записів (None - всі)
+        tiles : tuple
+            Кількість тайлів (по довготі, по широті)
+        page_size : int
+            Розмір сторінки OBIS
+
+        Yields:
+        -------
+        batch : pd.DataFrame
+            Сторінка унікальних записів
+        """
+        params = {'scientificname': species_name}
+
+        if bbox:
+            geometries = [_bbox_to_wkt(tile) for tile in split_bbox(bbox, *tiles)]
+        else:
+            geometries = [None]
+
+        out_queue = queue.Queue(maxsize=2 * self.max_workers)
+        stop_event = threading.Event()
+        seen_ids = set()
+        n_yielded = 0
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(geometries)))
+        for geometry in geometries:
+            executor.submit(
+                self._harvest_obis_tile, params, geometry, page_size, out_queue, stop_event
+            )
+
+        n_active = len(geometries)
+        try:
+            while n_active:
+                item = out_queue.get()
+
+                if item is _TILE_DONE:
+                    n_active -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+
+                batch = item
+                if 'id' in batch.columns:
+                    batch = batch.drop_duplicates(subset='id')
+                    batch = batch[~batch['id'].isin(seen_ids)]
+                    seen_ids.update(batch['id'])
+
+                if max_records is not None:
+                    batch = batch.iloc[:max_records - n_yielded]
+
+                if not batch.empty:
+                    n_yielded += len(batch)
+                    yield batch.reset_index(drop=True)
+
+                if max_records is not None and n_yielded >= max_records:
+                    break
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True)
+
+    def _obis_batch_to_geodataframe(self, df: pd.DataFrame, species_name: str) -> gpd.GeoDataFrame:
+        """Перетворити батч OBIS у GeoDataFrame"""
+        # Записи без коректних координат відкидаються
+        gdf = dataframe_to_geodataframe(df, 'decimalLongitude', 'decimalLatitude')
+
+        # Додати назву виду
+        gdf['Species'] = species_name
+
+        return gdf
 
     def collect_from_obis(
         self,
         species_name: str,
         bbox: Optional[dict] = None,
-        max_records: int = 10000
+        max_records: Optional[int] = 10000
     ) -> gpd.GeoDataFrame:
         """
         Зібрати дані з OBIS для конкретного виду
@@ -48,8 +263,8 @@ class GBIFOBISCollector:
             Наукова назва виду
         bbox : dict, optional
             Bounding box (min_lon, max_lon, min_lat, max_lat)
-        max_records : int
-            Максимальна кількість записів
+        max_records : int, optional
+            Максимальна кількість записів (None - всі)
 
         Returns:
         --------
@@ -59,46 +274,17 @@ class GBIFOBISCollector:
         logger.info(f"Collecting OBIS data for {species_name}...")
 
         try:
-            # Параметри запиту
-            params = {
-                'scientificname': species_name,
-                'size': max_records
-            }
+            batches = list(self.iter_obis_batches(species_name, bbox, max_records))
 
-            # Додати bbox, якщо вказано
-            if bbox:
-                params['geometry'] = (
-                    f"POLYGON(("
-                    f"{bbox['min_lon']} {bbox['min_lat']}, "
-                    f"{bbox['max_lon']} {bbox['min_lat']}, "
-                    f"{bbox['max_lon']} {bbox['max_lat']}, "
-                    f"{bbox['min_lon']} {bbox['max_lat']}, "
-                    f"{bbox['min_lon']} {bbox['min_lat']}))"
-                )
-
-            # Виконати запит
-            result = obis_occ.search(**params)
-
-            if not result or 'results' not in result or not result['results']:
+            if not batches:
                 logger.warning(f"No records found for {species_name}")
                 return gpd.GeoDataFrame()
 
             # Конвертувати в DataFrame
-            df = pd.DataFrame(result['results'])
-
-            # Фільтрувати записи з координатами
-            df = df.dropna(subset=['decimalLatitude', 'decimalLongitude'])
+            df = pd.concat(batches, ignore_index=True)
 
             # Створити GeoDataFrame
-            geometry = [
-                Point(row['decimalLongitude'], row['decimalLatitude'])
-                for _, row in df.iterrows()
-            ]
-
-            gdf = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
-
-            # Додати назву виду
-            gdf['Species'] = species_name
+            gdf = self._obis_batch_to_geodataframe(df, species_name)
 
             logger.info(f"Found {len(gdf)} records for {species_name}")
 
@@ -108,23 +294,189 @@ class GBIFOBISCollector:
             logger.error(f"Error collecting OBIS data: {e}")
             return gpd.GeoDataFrame()
 
+    def _stream_schema(self, gdf: gpd.GeoDataFrame, species_name: str, source: str) -> gpd.GeoDataFrame:
+        """
+        Привести записи до стабільної схеми файлу спостережень
+
+        OBIS_STREAM_FIELDS + Species + Source з фіксованими типами, тож
+        батчі OBIS і GBIF можна дописувати в один шар GeoPackage.
+        """
+        if source == 'GBIF':
+            gdf = gdf.rename(columns=GBIF_STREAM_FIELDS)
+
+        columns = {}
+        for field in OBIS_STREAM_FIELDS:
+            values = gdf[field] if field in gdf.columns else pd.Series(np.nan, index=gdf.index)
+            if field in _NUMERIC_STREAM_FIELDS:
+                columns[field] = pd.to_numeric(values, errors='coerce').astype(float)
+            else:
+                columns[field] = values.astype(object).where(values.notna(), None).map(
+                    lambda v: v if v is None else str(v)
+                )
+
+        columns['Species'] = species_name
+        columns['Source'] = source
+        return gpd.GeoDataFrame(columns, geometry=gdf.geometry.values, crs="EPSG:4326", index=gdf.index)
+
+    def stream_obis_to_file(
+        self,
+        species_name: str,
+        output_file: str,
+        bbox: Optional[dict] = None,
+        max_records: Optional[int] = None,
+        append: bool = False
+    ) -> int:
+        """
+        Потоково зберегти дані OBIS у GeoPackage
+
+        Кожен батч дописується у файл одразу після отримання, тому
+        використання пам'яті не залежить від загальної кількості записів.
+        Зберігаються лише колонки OBIS_STREAM_FIELDS, Species і Source
+        (стабільна схема, див. _stream_schema).
+
+        Parameters:
+        -----------
+        species_name : str
+            Наукова назва виду
+        output_file : str
+            Шлях до GeoPackage
+        bbox : dict, optional
+            Bounding box
+        max_records : int, optional
+            Максимальна кількість записів (None - всі)
+        append : bool
+            Дописувати в наявний файл (False - перезаписати)
+
+        Returns:
+        --------
+        n_records : int
+            Кількість записаних записів
+        """
+        logger.info(f"Streaming OBIS data for {species_name} to {output_file}...")
+
+        output_file = Path(output_file)
+        if output_file.exists() and not append:
+            output_file.unlink()
+
+        n_written = 0
+        for batch in self.iter_obis_batches(species_name, bbox, max_records):
+            gdf = self._obis_batch_to_geodataframe(batch, species_name)
+            if gdf.empty:
+                continue
+
+            gdf = self._stream_schema(gdf, species_name, 'OBIS')
+            gdf.to_file(output_file, driver="GPKG", mode='a' if output_file.exists() else 'w')
+            n_written += len(gdf)
+
+        logger.info(f"Saved {n_written} records to {output_file}")
+
+        return n_written
+
+    def _gbif_page(self, params: dict, offset: int, limit: int) -> dict:
+        """Отримати одну сторінку GBIF з повторними спробами"""
+        return cached_json(
+            self.cache, 'gbif_occurrence_search', dict(params, offset=offset, limit=limit),
+            lambda: retry_with_backoff(
+                gbif_occ.search,
+                retries=self.max_retries,
+                offset=offset,
+                limit=limit,
+                **params
+            )
+        )
+
+    def _harvest_gbif(
+        self,
+        params: dict,
+        bbox: Optional[dict],
+        limit: Optional[int],
+        buffer: ColumnarBuffer,
+        depth: int = 0
+    ) -> int:
+        """
+        Зібрати всі сторінки запиту GBIF у колонковий буфер
+
+        Якщо кількість записів перевищує ліміт пагінації GBIF
+        (GBIF_MAX_OFFSET), bbox рекурсивно ділиться на 4 тайли.
+
+        Returns:
+        --------
+        n_records : int
+            Кількість доданих записів
+        """
+        query = dict(params)
+        if bbox:
+            query['decimalLatitude'] = f"{bbox['min_lat']},{bbox['max_lat']}"
+            query['decimalLongitude'] = f"{bbox['min_lon']},{bbox['max_lon']}"
+
+        first_page = self._gbif_page(query, 0, GBIF_PAGE_SIZE)
+        if not first_page or 'results' not in first_page:
+            return 0
+
+        count = first_page.get('count', len(first_page['results']))
+        target = count if limit is None else min(count, limit)
+
+        # Запит перевищує ліміт пагінації - розбити на тайли
+        if target > GBIF_MAX_OFFSET and bbox and depth < GBIF_MAX_TILE_DEPTH:
+            logger.info(
+                f"{count} records exceed GBIF paging limit, "
+                f"splitting bbox into tiles (depth {depth + 1})"
+            )
+            n_total = 0
+            for tile in split_bbox(bbox):
+                remaining = None if limit is None else limit - n_total
+                if remaining is not None and remaining <= 0:
+                    break
+                n_total += self._harvest_gbif(params, tile, remaining, buffer, depth + 1)
+            return n_total
+
+        if target > GBIF_MAX_OFFSET:
+            logger.warning(
+                f"{count} records exceed GBIF paging limit, "
+                f"only {GBIF_MAX_OFFSET} will be retrieved"
+            )
+            target = GBIF_MAX_OFFSET
+
+        n_added = buffer.append(first_page['results'][:target])
+
+        offsets = range(GBIF_PAGE_SIZE, target, GBIF_PAGE_SIZE)
+        if not offsets:
+            return n_added
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._gbif_page, query, offset, min(GBIF_PAGE_SIZE, target - offset)
+                )
+                for offset in offsets
+            ]
+
+            for future in as_completed(futures):
+                page = future.result()
+                n_added += buffer.append(page.get('results', []))
+
+        return n_added
+
     def collect_from_gbif(
         self,
         species_name: str,
         bbox: Optional[dict] = None,
-        limit: int = 10000
+        limit: Optional[int] = 10000
     ) -> gpd.GeoDataFrame:
         """
         Зібрати дані з GBIF для конкретного виду
 
+        Сторінки по 300 записів завантажуються паралельно (offset),
+        великі запити автоматично розбиваються на просторові тайли.
+
         Parameters:
         -----------
         species_name : str
             Наукова назва виду
         bbox : dict, optional
             Bounding box
-        limit : int
-            Ліміт записів
+        limit : int, optional
+            Ліміт записів (None - всі доступні записи)
 
         Returns:
         --------
@@ -134,7 +486,10 @@ class GBIFOBISCollector:
 
         try:
             # Отримати taxon key
-            species_info = gbif_species.name_backbone(name=species_name)
+            species_info = cached_json(
+                self.cache, 'gbif_name_backbone', {'name': species_name},
+                lambda: gbif_species.name_backbone(name=species_name)
+            )
 
             if 'usageKey' not in species_info:
                 logger.warning(f"Species not found in GBIF: {species_name}")
@@ -145,35 +500,28 @@ class GBIFOBISCollector:
             # Параметри запиту
             params = {
                 'taxonKey': taxon_key,
-                'hasCoordinate': True,
-                'limit': min(limit, 300)  # GBIF limit per request
+                'hasCoordinate': True
             }
 
-            # Додати bbox
-            if bbox:
-                params['decimalLatitude'] = f"{bbox['min_lat']},{bbox['max_lat']}"
-                params['decimalLongitude'] = f"{bbox['min_lon']},{bbox['max_lon']}"
+            # Виконати запит (всі сторінки)
+            buffer = ColumnarBuffer()
+            self._harvest_gbif(params, bbox, limit, buffer)
 
-            # Виконати запит
-            result = gbif_occ.search(**params)
-
-            if not result or 'results' not in result:
+            if len(buffer) == 0:
                 logger.warning(f"No records found for {species_name}")
                 return gpd.GeoDataFrame()
 
-            # Конвертувати в DataFrame
-            df = pd.DataFrame(result['results'])
+            df = buffer.to_frame()
 
-            # Фільтрувати записи з координатами
-            df = df.dropna(subset=['decimalLatitude', 'decimalLongitude'])
+            # Тайли мають спільні межі - прибрати дублікати
+            if 'key' in df.columns:
+                df = df.drop_duplicates(subset='key')
 
-            # Створити GeoDataFrame
-            geometry = [
-                Point(row['decimalLongitude'], row['decimalLatitude'])
-                for _, row in df.iterrows()
-            ]
+            if limit is not None:
+                df = df.iloc[:limit]
 
-            gdf = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+            # Створити GeoDataFrame (записи без координат відкидаються)
+            gdf = dataframe_to_geodataframe(df, 'decimalLongitude', 'decimalLatitude')
             gdf['Species'] = species_name
 
             logger.info(f"Found {len(gdf)} records for {species_name}")
@@ -184,14 +532,106 @@ class GBIFOBISCollector:
             logger.error(f"Error collecting GBIF data: {e}")
             return gpd.GeoDataFrame()
 
+    def _collect_occurrences(
+        self,
+        species_list: List[str],
+        bbox: Optional[dict],
+        use_obis: bool,
+        use_gbif: bool,
+        output_file: Optional[Path],
+        obis_max_records: Optional[int],
+        gbif_limit: Optional[int],
+        pause: float = 0.0,
+        return_features: bool = True
+    ) -> Optional[gpd.GeoDataFrame]:
+        """
+        Зібрати спостереження видів з OBIS і GBIF у спільну схему
+
+        З output_file записи OBIS кожного виду потоково пишуться в окремий
+        тимчасовий файл (stream_obis_to_file) і переносяться в результат
+        частинами лише після успішного завершення виду, а GBIF - одним шаром
+        на вид, тож у пам'яті не тримаються всі джерела одночасно. Помилка
+        OBIS для виду відкидає лише його записи. Файл пишеться як .part і
+        атомарно перейменовується після завершення.
+
+        Returns:
+        --------
+        gdf : gpd.GeoDataFrame or None
+            Всі спостереження (None, якщо return_features=False і є output_file)
+        """
+        tmp_file = output_file.with_suffix('.part.gpkg') if output_file is not None else None
+        if tmp_file is not None and tmp_file.exists():
+            tmp_file.unlink()
+
+        frames = []
+        n_records = 0
+
+        def add(gdf: gpd.GeoDataFrame):
+            if tmp_file is not None:
+                gdf.to_file(tmp_file, driver="GPKG", mode='a' if tmp_file.exists() else 'w')
+            else:
+                frames.append(gdf)
+
+        for species in species_list:
+            logger.info(f"Processing: {species}")
+
+            # Збір з OBIS
+            if use_obis:
+                if tmp_file is not None:
+                    species_file = tmp_file.with_name(f"{tmp_file.stem}.obis.gpkg")
+                    try:
+                        n_species = self.stream_obis_to_file(
+                            species, species_file, bbox, obis_max_records
+                        )
+                    except Exception as e:
+                        # Уже записані батчі виду не потрапляють у результат
+                        logger.error(f"Error collecting OBIS data for {species}: {e}")
+                    else:
+                        for start in range(0, n_species, OBIS_PAGE_SIZE):
+                            add(gpd.read_file(species_file, rows=slice(start, start + OBIS_PAGE_SIZE)))
+                        n_records += n_species
+                    finally:
+                        if species_file.exists():
+                            species_file.unlink()
+                else:
+                    obis_data = self.collect_from_obis(species, bbox, obis_max_records)
+                    if not obis_data.empty:
+                        add(self._stream_schema(obis_data, species, 'OBIS'))
+                        n_records += len(obis_data)
+
+                time.sleep(pause)  # Rate limiting
+
+            # Збір з GBIF
+            if use_gbif:
+                gbif_data = self.collect_from_gbif(species, bbox, gbif_limit)
+                if not gbif_data.empty:
+                    add(self._stream_schema(gbif_data, species, 'GBIF'))
+                    n_records += len(gbif_data)
+
+                time.sleep(pause)  # Rate limiting
+
+        if n_records == 0:
+            if tmp_file is not None and tmp_file.exists():
+                tmp_file.unlink()
+            return gpd.GeoDataFrame()
+
+        if tmp_file is None:
+            return gpd.GeoDataFrame(pd.concat(frames, ignore_index=True), crs="EPSG:4326")
+
+        os.replace(tmp_file, output_file)
+        logger.info(f"Saved {n_records} records to: {output_file}")
+
+        return gpd.read_file(output_file) if return_features else None
+
     def collect_prey_species(
         self,
         species_list: List[str],
         bbox: Optional[dict] = None,
         use_obis: bool = True,
         use_gbif: bool = True,
-        save: bool = True
-    ) -> gpd.GeoDataFrame:
+        save: bool = True,
+        return_features: bool = True
+    ) -> Optional[gpd.GeoDataFrame]:
         """
         Зібрати дані про види здобичі (морські ссавці)
 
@@ -206,68 +646,40 @@ class GBIFOBISCollector:
         use_gbif : bool
             Використовувати GBIF
         save : bool
-            Зберегти результати
+            Зберегти результати (OBIS пишеться у файл потоково)
+        return_features : bool
+            Повернути спостереження; False разом із save=True
+            не завантажує файл назад у пам'ять
 
         Returns:
         --------
-        combined_gdf : gpd.GeoDataFrame
+        combined_gdf : gpd.GeoDataFrame or None
             Всі спостереження
         """
         logger.info("Collecting prey species data...")
 
-        all_data = []
-
-        for species in species_list:
-            logger.info(f"Processing: {species}")
-
-            # Збір з OBIS
-            if use_obis:
-                obis_data = self.collect_from_obis(species, bbox)
-                if not obis_data.empty:
-                    obis_data['Source'] = 'OBIS'
-                    all_data.append(obis_data)
-
-                time.sleep(1)  # Rate limiting
-
-            # Збір з GBIF
-            if use_gbif:
-                gbif_data = self.collect_from_gbif(species, bbox)
-                if not gbif_data.empty:
-                    gbif_data['Source'] = 'GBIF'
-                    all_data.append(gbif_data)
-
-                time.sleep(1)  # Rate limiting
-
-        # Об'єднати всі дані
-        if all_data:
-            combined_gdf = gpd.GeoDataFrame(
-                pd.concat(all_data, ignore_index=True),
-                crs="EPSG:4326"
-            )
-
-            # Перейменувати 'Species' щоб уникнути конфлікту з GPKG
-            if 'Species' in combined_gdf.columns:
-                combined_gdf = combined_gdf.rename(columns={'Species': 'species_name'})
+        combined_gdf = self._collect_occurrences(
+            species_list, bbox, use_obis, use_gbif,
+            output_file=self.data_dir / "prey_species_occurrences.gpkg" if save else None,
+            obis_max_records=10000, gbif_limit=10000, pause=1.0,
+            return_features=return_features
+        )
 
+        if combined_gdf is not None and combined_gdf.empty:
+            logger.warning("No prey species data collected")
+        elif combined_gdf is not None:
             logger.info(f"Total prey species records: {len(combined_gdf)}")
 
-            if save:
-                output_file = self.data_dir / "prey_species_occurrences.gpkg"
-                combined_gdf.to_file(output_file, driver="GPKG")
-                logger.info(f"Saved to: {output_file}")
-
-            return combined_gdf
-        else:
-            logger.warning("No prey species data collected")
-            return gpd.GeoDataFrame()
+        return combined_gdf
 
     def collect_orca_data(
         self,
         bbox: Optional[dict] = None,
         use_obis: bool = True,
         use_gbif: bool = True,
-        save: bool = True
-    ) -> gpd.GeoDataFrame:
+        save: bool = True,
+        return_features: bool = True
+    ) -> Optional[gpd.GeoDataFrame]:
         """
         Зібрати дані про косаток (Orcinus orca)
 
@@ -280,52 +692,30 @@ class GBIFOBISCollector:
         use_gbif : bool
             Використовувати GBIF
         save : bool
-            Зберегти результати
+            Зберегти результати (OBIS пишеться у файл потоково)
+        return_features : bool
+            Повернути спостереження; False разом із save=True
+            не завантажує файл назад у пам'ять
 
         Returns:
         --------
-        orca_gdf : gpd.GeoDataFrame
+        orca_gdf : gpd.GeoDataFrame or None
         """
         logger.info("Collecting Orca (Orcinus orca) data...")
 
-        all_data = []
-
-        # Збір з OBIS
-        if use_obis:
-            obis_data = self.collect_from_obis("Orcinus orca", bbox, max_records=20000)
-            if not obis_data.empty:
-                obis_data['Source'] = 'OBIS'
-                all_data.append(obis_data)
-
-        # Збір з GBIF
-        if use_gbif:
-            gbif_data = self.collect_from_gbif("Orcinus orca", bbox, limit=10000)
-            if not gbif_data.empty:
-                gbif_data['Source'] = 'GBIF'
-                all_data.append(gbif_data)
-
-        # Об'єднати
-        if all_data:
-            orca_gdf = gpd.GeoDataFrame(
-                pd.concat(all_data, ignore_index=True),
-                crs="EPSG:4326"
-            )
-
-            # Перейменувати 'Species' щоб уникнути конфлікту з GPKG
-            if 'Species' in orca_gdf.columns:
-                orca_gdf = orca_gdf.rename(columns={'Species': 'species_name'})
+        orca_gdf = self._collect_occurrences(
+            ["Orcinus orca"], bbox, use_obis, use_gbif,
+            output_file=self.data_dir / "orca_occurrences.gpkg" if save else None,
+            obis_max_records=20000, gbif_limit=None,
+            return_features=return_features
+        )
 
+        if orca_gdf is not None and orca_gdf.empty:
+            logger.warning("No Orca data collected")
+        elif orca_gdf is not None:
             logger.info(f"Total Orca records: {len(orca_gdf)}")
 
-            if save:
-                output_file = self.data_dir / "orca_occurrences.gpkg"
-                orca_gdf.to_file(output_file, driver="GPKG")
-                logger.info(f"Saved to: {output_file}")
-
-            return orca_gdf
-        else:
-            logger.warning("No Orca data collected")
-            return gpd.GeoDataFrame()
+        return orca_gdf
 
     def filter_rookeries(
         self,
@@ -354,30 +744,40 @@ class GBIFOBISCollector:
 
         logger.info("Identifying rookeries/colonies...")
 
-        # Отримати координати
-        coords = species_data.geometry.apply(lambda geom: [geom.x, geom.y]).tolist()
-        coords_array = pd.DataFrame(coords, columns=['lon', 'lat']).values
-
-        # Кластеризація
-        # eps в градусах: ~10 км / 111 км/градус
-        eps = cluster_distance_km / 111.0
+        lon = species_data.geometry.x.values
+        lat = species_data.geometry.y.values
 
-        clustering = DBSCAN(eps=eps, min_samples=min_observations).fit(coords_array)
+        # Кластеризація за відстанню по великому колу:
+        # haversine у sklearn приймає [lat, lon] у радіанах, eps - у радіанах дуги
+        clustering = DBSCAN(
+            eps=cluster_distance_km / EARTH_RADIUS_KM,
+            min_samples=min_observations,
+            metric='haversine',
+            algorithm='ball_tree'
+        ).fit(np.radians(np.column_stack([lat, lon])))
 
         species_data['Cluster'] = clustering.labels_
 
         # Фільтрувати кластери (не шум)
-        rookeries_df = species_data[species_data['Cluster'] != -1]
-
-        # Розрахувати центроїди кластерів
-        centroids = rookeries_df.groupby('Cluster').geometry.apply(
-            lambda x: Point(x.x.mean(), x.y.mean())
-        ).reset_index()
-
-        rookeries = gpd.GeoDataFrame(
-            centroids,
-            geometry='geometry',
-            crs="EPSG:4326"
+        is_member = clustering.labels_ != -1
+        rookeries_df = species_data[is_member]
+
+        # Центроїди кластерів - середні одиничні вектори (коректно через 180°)
+        xyz = pd.DataFrame(unit_vectors(lon[is_member], lat[is_member]), columns=['x', 'y', 'z'])
+        xyz['Cluster'] = rookeries_df['Cluster'].values
+        mean_xyz = xyz.groupby('Cluster', as_index=False).mean()
+
+        centroid_lon, centroid_lat = unit_vectors_to_lonlat(mean_xyz[['x', 'y', 'z']].values)
+        centroids = pd.DataFrame({
+            'Cluster': mean_xyz['Cluster'].values,
+            'lon': centroid_lon,
+            'lat': centroid_lat
+        })
+
+        rookeries = points_to_geodataframe(
+            centroids['lon'].values,
+            centroids['lat'].values,
+            data={'Cluster': centroids['Cluster'].values}
         )
 
         # Додати кількість спостережень
@@ -3,14 +3,6 @@ GEBCO Bathymetry data collector
 Збір даних батиметрії (рельєф дна)
 """
 
-try:
-    import pygmt
-    PYGMT_AVAILABLE = True
-except (ImportError, Exception) as e:
-    PYGMT_AVAILABLE = False
-    print(f"Warning: pygmt not available: {e}")
-    print("GEBCO data collection will be limited. Install GMT for full functionality.")
-
 import xarray as xr
 from pathlib import Path
 import logging
@@ -19,6 +11,26 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _import_pygmt():
+    """
+    Імпортувати pygmt при першому завантаженні (не при імпорті модуля)
+
+    pygmt завантажує бібліотеку GMT і падає не лише з ImportError,
+    якщо GMT не встановлено.
+
+    Returns:
+    --------
+    pygmt : module or None
+    """
+    try:
+        import pygmt
+        return pygmt
+    except Exception as e:
+        logger.warning(f"pygmt not available: {e}")
+        logger.warning("GEBCO data collection will be limited. Install GMT for full functionality.")
+        return None
+
+
 class GEBCOCollector:
     """Collector for GEBCO bathymetry data"""
 
@@ -28,7 +40,8 @@ class GEBCOCollector:
 
     def download_bathymetry(self, bbox: dict, resolution: str = "15s",
                            save: bool = True) -> xr.DataArray:
-        if not PYGMT_AVAILABLE:
+        pygmt = _import_pygmt()
+        if pygmt is None:
             logger.error("pygmt is not available. Cannot download GEBCO data.")
             logger.info("Alternative: Download manually from https://www.gebco.net/data_and_products/gridded_bathymetry_data/")
             raise ImportError("pygmt is required for GEBCO data download. Please install GMT library.")
@@ -8,7 +8,15 @@ import xarray as xr
 import numpy as np
 from pathlib import Path
 import logging
-from typing import Optional, Tuple
+import sys
+from typing import List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.remote_subset import (
+    open_granule_subset, subset_cache_name, granule_name, combine_subsets
+)
+from utils.granule_manager import GranuleManager
+from utils.earthdata import configure_earthdata, ensure_login
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +31,8 @@ class NASAOceanCollector:
         self,
         username: Optional[str] = None,
         password: Optional[str] = None,
-        data_dir: str = "./data/raw/nasa_ocean"
+        data_dir: str = "./data/raw/nasa_ocean",
+        max_workers: int = 4
     ):
         """
         Parameters:
@@ -34,26 +43,25 @@ class NASAOceanCollector:
             NASA Earthdata password
         data_dir : str
             Директорія для збереження даних
+        max_workers : int
+            Кількість паралельних завантажень гранул
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
 
-        # Аутентифікація
-        if username and password:
-            import os
-            os.environ['EARTHDATA_USERNAME'] = username
-            os.environ['EARTHDATA_PASSWORD'] = password
-            earthaccess.login(strategy="environment")
-        else:
-            # Інтерактивний логін або з .netrc
-            earthaccess.login()
+        # Аутентифікація відкладена до першого завантаження
+        configure_earthdata(username, password)
 
     def download_modis_sst(
         self,
         date_range: Tuple[str, str],
         bbox: Optional[dict] = None,
         temporal_resolution: str = "monthly",
-        save: bool = True
+        save: bool = True,
+        remote_subset: bool = False,
+        variables: Optional[List[str]] = None,
+        chunks: Optional[dict] = None
     ) -> xr.Dataset:
         """
         Завантажити дані MODIS SST
@@ -67,7 +75,13 @@ class NASAOceanCollector:
         temporal_resolution : str
             'monthly' or '8day'
         save : bool
-            Зберегти файли
+            Зберегти файли (у режимі remote_subset - лише subset-и)
+        remote_subset : bool
+            Відкривати гранули віддалено та читати лише bbox і variables
+        variables : list, optional
+            Змінні для remote_subset (default: ['sst'])
+        chunks : dict, optional
+            Розбиття dask для віддаленого читання
 
         Returns:
         --------
@@ -96,13 +110,22 @@ class NASAOceanCollector:
             logger.warning("No data found")
             return None
 
+        output_dir = self.data_dir / "modis_sst"
+
+        if remote_subset:
+            ds = self.open_remote_subsets(
+                results, bbox, variables or ['sst'], output_dir, save, chunks
+            )
+            logger.info(f"Loaded SST data: {ds}")
+            return ds
+
         # Завантажити файли
         if save:
-            output_dir = self.data_dir / "modis_sst"
-            output_dir.mkdir(exist_ok=True)
-            files = earthaccess.download(results, str(output_dir))
+            # Завантажити лише гранули, яких немає в маніфесті
+            files = GranuleManager(output_dir, self.max_workers).sync(results)
         else:
             # Відкрити без завантаження
+            ensure_login()
             files = earthaccess.open(results)
 
         # Відкрити як xarray Dataset
@@ -116,7 +139,10 @@ class NASAOceanCollector:
         self,
         date_range: Tuple[str, str],
         bbox: Optional[dict] = None,
-        save: bool = True
+        save: bool = True,
+        remote_subset: bool = False,
+        variables: Optional[List[str]] = None,
+        chunks: Optional[dict] = None
     ) -> xr.Dataset:
         """
         Завантажити дані MODIS Chlorophyll-a
@@ -128,7 +154,13 @@ class NASAOceanCollector:
         bbox : dict, optional
             Bounding box
         save : bool
-            Зберегти файли
+            Зберегти файли (у режимі remote_subset - лише subset-и)
+        remote_subset : bool
+            Відкривати гранули віддалено та читати лише bbox і variables
+        variables : list, optional
+            Змінні для remote_subset (default: ['chlor_a'])
+        chunks : dict, optional
+            Розбиття dask для віддаленого читання
 
         Returns:
         --------
@@ -152,12 +184,21 @@ class NASAOceanCollector:
             logger.warning("No data found")
             return None
 
+        output_dir = self.data_dir / "modis_chlorophyll"
+
+        if remote_subset:
+            ds = self.open_remote_subsets(
+                results, bbox, variables or ['chlor_a'], output_dir, save, chunks
+            )
+            logger.info(f"Loaded Chlorophyll data: {ds}")
+            return ds
+
         # Завантажити
         if save:
-            output_dir = self.data_dir / "modis_chlorophyll"
-            output_dir.mkdir(exist_ok=True)
-            files = earthaccess.download(results, str(output_dir))
+            # Завантажити лише гранули, яких немає в маніфесті
+            files = GranuleManager(output_dir, self.max_workers).sync(results)
         else:
+            ensure_login()
             files = earthaccess.open(results)
 
         # Відкрити
@@ -167,6 +208,86 @@ class NASAOceanCollector:
 
         return ds
 
+    def open_remote_subsets(
+        self,
+        results: list,
+        bbox: dict,
+        variables: List[str],
+        output_dir: Path,
+        save: bool = True,
+        chunks: Optional[dict] = None
+    ) -> xr.Dataset:
+        """
+        Відкрити гранули віддалено з вирізанням bbox та змінних
+
+        Гранули відкриваються як file-like об'єкти earthaccess.open, тому
+        з глобального файлу читаються лише chunks, що перетинають bbox.
+        При save=True subset кожної гранули зберігається у
+        output_dir/subset і при повторному запуску читається локально.
+
+        Parameters:
+        -----------
+        results : list
+            Гранули з earthaccess.search_data
+        bbox : dict
+            Bounding box
+        variables : list
+            Змінні, які потрібно залишити
+        output_dir : Path
+            Директорія продукту
+        save : bool
+            Зберігати subset-и локально
+        chunks : dict, optional
+            Розбиття dask
+
+        Returns:
+        --------
+        ds : xr.Dataset
+            Об'єднані subset-и
+        """
+        if bbox is None:
+            raise ValueError("remote_subset requires a bbox")
+
+        subset_dir = output_dir / "subset"
+        # Маніфест subset-ів: часове покриття для вибору файлів за діапазоном дат
+        manifest = GranuleManager(subset_dir) if save else None
+
+        subsets = []
+        remote = []
+
+        for granule in results:
+            cache_file = subset_dir / subset_cache_name(granule_name(granule), bbox, variables)
+            if save and cache_file.exists():
+                if not manifest.is_current(cache_file.name):
+                    # subset, збережений до появи маніфесту
+                    manifest.record(granule, cache_file)
+                subsets.append(xr.open_dataset(cache_file, chunks=chunks or {}))
+            else:
+                remote.append((granule, cache_file))
+
+        logger.info(
+            f"{len(subsets)} subsets cached locally, {len(remote)} granules to open remotely"
+        )
+
+        if remote:
+            ensure_login()
+            files = earthaccess.open([granule for granule, _ in remote])
+
+            for file_obj, (granule, cache_file) in zip(files, remote):
+                subset = open_granule_subset(file_obj, bbox, variables, chunks)
+
+                if save:
+                    # Записати лише subset (кілька МБ замість глобальної гранули)
+                    tmp_file = cache_file.with_suffix('.part')
+                    subset.load().to_netcdf(tmp_file)
+                    tmp_file.replace(cache_file)
+                    manifest.record(granule, cache_file)
+                    subset = xr.open_dataset(cache_file, chunks=chunks or {})
+
+                subsets.append(subset)
+
+        return combine_subsets(subsets)
+
 
 def main():
     """
@@ -7,12 +7,21 @@ Contact: tracker@ocearch.org for data sharing agreement
 """
 
 import requests
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, List
 from pathlib import Path
+import hashlib
+import json
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.spatial_utils import dataframe_to_geodataframe
+from utils.response_cache import ResponseCache, cached_json
+from utils.http_session import get_session
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,19 +35,33 @@ class OCEARCHCollector:
     потрібен дозвіл від OCEARCH.
     """
 
-    def __init__(self, data_dir: str = "./data/raw/ocearch"):
+    def __init__(self, data_dir: str = "./data/raw/ocearch",
+                 cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None):
         """
         Parameters:
         -----------
         data_dir : str
             Директорія для збереження даних
+        cache : ResponseCache, optional
+            Дисковий кеш відповідей API
+        session : requests.Session, optional
+            HTTP-сесія (за замовчуванням: спільна сесія з пулом з'єднань)
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = cache
+        self.session = session or get_session()
 
         # Базовий URL (неофіційний)
         self.base_url = "https://www.ocearch.org/tracker/api"
 
+    def _get_json(self, url: str):
+        """GET-запит до API OCEARCH"""
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
     def get_shark_list(self) -> pd.DataFrame:
         """
         Отримати список всіх акул у системі OCEARCH
@@ -54,10 +77,8 @@ class OCEARCHCollector:
             # Endpoint для списку акул (може змінюватися)
             url = f"{self.base_url}/v1/sharks"
 
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            data = response.json()
+            data = cached_json(self.cache, 'ocearch', {'url': url},
+                               lambda: self._get_json(url))
 
             # Конвертувати в DataFrame
             sharks_df = pd.DataFrame(data)
@@ -95,25 +116,7 @@ class OCEARCHCollector:
         logger.info(f"Fetching tracks for shark ID: {shark_id}")
 
         try:
-            url = f"{self.base_url}/v1/tracks/{shark_id}"
-
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Конвертувати в DataFrame
-            tracks_df = pd.DataFrame(data)
-
-            # Створити геометрію
-            geometry = [Point(row['longitude'], row['latitude'])
-                       for _, row in tracks_df.iterrows()]
-
-            tracks_gdf = gpd.GeoDataFrame(
-                tracks_df,
-                geometry=geometry,
-                crs="EPSG:4326"
-            )
+            tracks_gdf = self._fetch_shark_tracks(shark_id)
 
             logger.info(f"Retrieved {len(tracks_gdf)} track points")
 
@@ -123,17 +126,85 @@ class OCEARCHCollector:
             logger.error(f"Error fetching tracks: {e}")
             return gpd.GeoDataFrame()
 
+    def _fetch_shark_tracks(self, shark_id: str) -> gpd.GeoDataFrame:
+        """Завантажити треки акули (помилки HTTP не перехоплюються)"""
+        url = f"{self.base_url}/v1/tracks/{shark_id}"
+
+        data = cached_json(self.cache, 'ocearch', {'url': url},
+                           lambda: self._get_json(url))
+
+        # Конвертувати в DataFrame
+        tracks_df = pd.DataFrame(data)
+        if tracks_df.empty:
+            return gpd.GeoDataFrame()
+
+        # Створити геометрію
+        return dataframe_to_geodataframe(tracks_df, 'longitude', 'latitude')
+
+    @staticmethod
+    def _shark_signature(shark: pd.Series) -> str:
+        """
+        Підпис запису акули зі списку OCEARCH
+
+        Змінюється, коли змінюються метадані акули (напр., дата
+        останнього пінгу), тобто коли треки потрібно оновити.
+        """
+        payload = json.dumps(shark.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _load_checkpoint_manifest(self, checkpoint_dir: Path) -> dict:
+        manifest_file = checkpoint_dir / "manifest.json"
+        if manifest_file.exists():
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_checkpoint_manifest(self, checkpoint_dir: Path, manifest: dict):
+        manifest_file = checkpoint_dir / "manifest.json"
+        tmp_file = manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        tmp_file.replace(manifest_file)
+
+    def _collect_shark(self, shark: pd.Series, shark_id: str,
+                       checkpoint_dir: Optional[Path]) -> gpd.GeoDataFrame:
+        """Завантажити треки однієї акули, додати метадані та зберегти checkpoint"""
+        tracks = self._fetch_shark_tracks(shark_id)
+
+        if not tracks.empty:
+            # Додати метадані
+            tracks['Shark_ID'] = shark_id
+            tracks['Shark_Name'] = shark.get('name', '')
+            tracks['Sex'] = shark.get('sex', '')
+            tracks['Length_m'] = shark.get('length', None)
+            tracks['Weight_kg'] = shark.get('weight', None)
+
+        if checkpoint_dir is not None:
+            tracks.to_pickle(checkpoint_dir / f"{shark_id}.pkl")
+
+        return tracks
+
     def collect_all_white_shark_tracks(
         self,
-        save: bool = True
+        save: bool = True,
+        max_workers: int = 8,
+        checkpoint: bool = True
     ) -> gpd.GeoDataFrame:
         """
         Зібрати всі доступні треки білих акул
 
+        Треки акул завантажуються паралельно. Для кожної акули
+        зберігається checkpoint, тому повторний запуск завантажує лише
+        нових акул та акул, чиї метадані у списку OCEARCH змінились.
+
         Parameters:
         -----------
         save : bool
             Зберегти результати у файл
+        max_workers : int
+            Кількість паралельних запитів
+        checkpoint : bool
+            Використовувати checkpoint-и окремих акул
 
         Returns:
         --------
@@ -156,24 +227,62 @@ class OCEARCHCollector:
 
         logger.info(f"Found {len(white_sharks)} white sharks")
 
-        # Зібрати треки для кожної акули
+        checkpoint_dir = None
+        manifest = {}
+        if checkpoint:
+            checkpoint_dir = self.data_dir / "checkpoints"
+            checkpoint_dir.mkdir(exist_ok=True)
+            manifest = self._load_checkpoint_manifest(checkpoint_dir)
+
+        # Розділити акул на вже завантажених та тих, що потребують запиту
         all_tracks = []
+        to_fetch = []
 
-        for idx, shark in white_sharks.iterrows():
+        for _, shark in white_sharks.iterrows():
             shark_id = shark.get('id') or shark.get('shark_id')
+            if not shark_id:
+                continue
+
+            shark_id = str(shark_id)
+            signature = self._shark_signature(shark)
+            checkpoint_file = checkpoint_dir / f"{shark_id}.pkl" if checkpoint_dir else None
+
+            if (checkpoint_file is not None and checkpoint_file.exists()
+                    and manifest.get(shark_id) == signature):
+                all_tracks.append(pd.read_pickle(checkpoint_file))
+            else:
+                to_fetch.append((shark, shark_id, signature))
+
+        logger.info(
+            f"{len(all_tracks)} sharks loaded from checkpoints, "
+            f"{len(to_fetch)} to fetch"
+        )
+
+        # Зібрати треки паралельно
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._collect_shark, shark, shark_id, checkpoint_dir):
+                    (shark_id, signature)
+                for shark, shark_id, signature in to_fetch
+            }
 
-            if shark_id:
-                tracks = self.get_shark_tracks(shark_id)
+            for future in as_completed(futures):
+                shark_id, signature = futures[future]
+                try:
+                    tracks = future.result()
+                except Exception as e:
+                    # Помилка однієї акули (мережа, розбір відповіді) не зупиняє збір;
+                    # у маніфест вона не потрапляє і буде завантажена наступного разу
+                    logger.error(f"Error fetching tracks for shark {shark_id}: {e}")
+                    continue
 
-                if not tracks.empty:
-                    # Додати метадані
-                    tracks['Shark_ID'] = shark_id
-                    tracks['Shark_Name'] = shark.get('name', '')
-                    tracks['Sex'] = shark.get('sex', '')
-                    tracks['Length_m'] = shark.get('length', None)
-                    tracks['Weight_kg'] = shark.get('weight', None)
+                all_tracks.append(tracks)
 
-                    all_tracks.append(tracks)
+                if checkpoint_dir is not None:
+                    manifest[shark_id] = signature
+                    self._save_checkpoint_manifest(checkpoint_dir, manifest)
+
+        all_tracks = [tracks for tracks in all_tracks if not tracks.empty]
 
         # Об'єднати всі треки
         if all_tracks:
@@ -186,10 +295,7 @@ class OCEARCHCollector:
             combined_tracks['Shark_Presence_Status'] = 1
 
             # Визначити стадію життя (спрощено)
-            combined_tracks['Life_Stage'] = combined_tracks.apply(
-                self._classify_life_stage,
-                axis=1
-            )
+            combined_tracks['Life_Stage'] = self.classify_life_stage(combined_tracks)
 
             logger.info(f"Total tracks collected: {len(combined_tracks)}")
 
@@ -204,36 +310,40 @@ class OCEARCHCollector:
             logger.warning("No tracks collected")
             return gpd.GeoDataFrame()
 
-    def _classify_life_stage(self, row) -> str:
+    @staticmethod
+    def classify_life_stage(tracks: pd.DataFrame) -> np.ndarray:
         """
-        Класифікувати стадію життя на основі розміру
+        Класифікувати стадію життя на основі розміру (векторно)
 
         Parameters:
         -----------
-        row : pd.Series
-            Рядок DataFrame
+        tracks : pd.DataFrame
+            Треки з колонками Length_m та Sex
 
         Returns:
         --------
-        life_stage : str
-            'Adult_Male', 'Adult_Female', або 'Juvenile'
+        life_stage : np.ndarray
+            'Adult_Male', 'Adult_Female', 'Adult', 'Juvenile' або 'Unknown'
         """
-        length = row.get('Length_m', None)
-        sex = row.get('Sex', '').lower()
-
-        if length is None:
-            return 'Unknown'
+        length = pd.to_numeric(
+            tracks.get('Length_m', pd.Series(np.nan, index=tracks.index)),
+            errors='coerce'
+        ).to_numpy(dtype=float)
+        sex = (
+            tracks.get('Sex', pd.Series('', index=tracks.index))
+            .fillna('').astype(str).str.strip().str.lower().to_numpy()
+        )
 
         # Білі акули стають дорослими при ~3.5-4 м
-        if length >= 3.5:
-            if sex == 'male' or sex == 'm':
-                return 'Adult_Male'
-            elif sex == 'female' or sex == 'f':
-                return 'Adult_Female'
-            else:
-                return 'Adult'
-        else:
-            return 'Juvenile'
+        adult = length >= 3.5
+        male = np.isin(sex, ['male', 'm'])
+        female = np.isin(sex, ['female', 'f'])
+
+        return np.select(
+            [np.isnan(length), adult & male, adult & female, adult],
+            ['Unknown', 'Adult_Male', 'Adult_Female', 'Adult'],
+            default='Juvenile'
+        )
 
     def separate_by_life_stage(
         self,
@@ -283,14 +393,7 @@ class OCEARCHCollector:
         # Очікувані колонки: Date, Latitude, Longitude, Name, Sex, Length, etc.
 
         # Створити геометрію
-        geometry = [Point(row['Longitude'], row['Latitude'])
-                   for _, row in df.iterrows()]
-
-        tracks_gdf = gpd.GeoDataFrame(
-            df,
-            geometry=geometry,
-            crs="EPSG:4326"
-        )
+        tracks_gdf = dataframe_to_geodataframe(df, 'Longitude', 'Latitude')
 
         # Додати статус присутності
         tracks_gdf['Shark_Presence_Status'] = 1
@@ -4,29 +4,66 @@ Shipping Lanes data collector
 """
 
 import requests
+import pandas as pd
 import geopandas as gpd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator, Optional
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.response_cache import ResponseCache, cached_json
+from utils.http_session import get_session
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Розмір сторінки, якщо сервіс не повідомляє maxRecordCount
+ARCGIS_DEFAULT_PAGE_SIZE = 1000
+
 
 class ShippingLanesCollector:
     """Collector for shipping lanes data from NOAA"""
 
-    def __init__(self, data_dir: str = "./data/raw/shipping"):
+    def __init__(self, data_dir: str = "./data/raw/shipping",
+                 cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None,
+                 max_workers: int = 4):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.base_url = "https://encdirect.noaa.gov/arcgis/rest/services/NavigationChartData/MarineTransportation/FeatureServer/0/query"
+        self.cache = cache
+        self.session = session or get_session()
+        self.max_workers = max_workers
+        self.layer_url = "https://encdirect.noaa.gov/arcgis/rest/services/NavigationChartData/MarineTransportation/FeatureServer/0"
+        self.base_url = f"{self.layer_url}/query"
 
-    def download_shipping_lanes(self, bbox: dict, save: bool = True) -> gpd.GeoDataFrame:
-        logger.info("Downloading shipping lanes from NOAA...")
+    def _get_json(self, url: str, params: dict) -> dict:
+        """GET-запит до ArcGIS REST (з кешем відповідей)"""
+        def fetch():
+            response = self.session.get(url, params=params, timeout=60)
+            response.raise_for_status()
+            data = response.json()
+            # ArcGIS повертає помилки зі статусом 200
+            if 'error' in data:
+                raise requests.exceptions.HTTPError(f"ArcGIS error: {data['error']}")
+            return data
+
+        return cached_json(self.cache, 'noaa_shipping_lanes', dict(params, url=url), fetch)
+
+    def get_layer_info(self) -> dict:
+        """
+        Метадані шару FeatureServer (maxRecordCount, objectIdField, ...)
 
-        params = {
+        Returns:
+        --------
+        info : dict
+        """
+        return self._get_json(self.layer_url, {'f': 'json'})
+
+    def _query_params(self, bbox: dict) -> dict:
+        return {
             'where': '1=1',
-            'outFields': '*',
-            'f': 'geojson',
             'geometry': f'{bbox["min_lon"]},{bbox["min_lat"]},{bbox["max_lon"]},{bbox["max_lat"]}',
             'geometryType': 'esriGeometryEnvelope',
             'spatialRel': 'esriSpatialRelIntersects',
@@ -34,32 +71,196 @@ class ShippingLanesCollector:
             'outSR': '4326'
         }
 
-        response = requests.get(self.base_url, params=params, timeout=60)
-        response.raise_for_status()
+    def count_features(self, bbox: dict) -> int:
+        """
+        Кількість об'єктів у bbox (returnCountOnly)
+
+        Parameters:
+        -----------
+        bbox : dict
+            Bounding box
+
+        Returns:
+        --------
+        count : int
+        """
+        params = dict(self._query_params(bbox), returnCountOnly='true', f='json')
+        return int(self._get_json(self.base_url, params).get('count', 0))
+
+    def _fetch_page(self, params: dict, offset: int, page_size: int) -> dict:
+        page_params = dict(params, resultOffset=offset, resultRecordCount=page_size)
+        return self._get_json(self.base_url, page_params)
+
+    def iter_pages(
+        self,
+        bbox: dict,
+        max_allowable_offset: Optional[float] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[gpd.GeoDataFrame]:
+        """
+        Посторінково завантажити об'єкти шару у bbox
+
+        Кількість об'єктів визначається запитом returnCountOnly, після чого
+        сторінки (resultOffset/resultRecordCount) запитуються паралельно.
+        Сторінки повертаються по порядку; одночасно в пам'яті тримається
+        не більше ~2 * max_workers сторінок.
+
+        Parameters:
+        -----------
+        bbox : dict
+            Bounding box
+        max_allowable_offset : float, optional
+            Допуск генералізації геометрії на сервері (градуси)
+        page_size : int, optional
+            Розмір сторінки (за замовчуванням: maxRecordCount шару; більший
+            розмір зменшується до maxRecordCount, щоб сервер не обрізав сторінки)
+
+        Yields:
+        -------
+        page : gpd.GeoDataFrame
+            Об'єкти однієї сторінки
+        """
+        info = self.get_layer_info()
+
+        max_record_count = int(info.get('maxRecordCount') or ARCGIS_DEFAULT_PAGE_SIZE)
+        if page_size is None:
+            page_size = max_record_count
+        elif page_size > max_record_count:
+            logger.info(f"Page size {page_size} reduced to layer maxRecordCount {max_record_count}")
+            page_size = max_record_count
+
+        params = dict(self._query_params(bbox), outFields='*', f='geojson')
+
+        # Стабільний порядок потрібен для коректного resultOffset
+        params['orderByFields'] = info.get('objectIdField') or 'OBJECTID'
+
+        if max_allowable_offset:
+            params['maxAllowableOffset'] = max_allowable_offset
 
-        data = response.json()
+        total = self.count_features(bbox)
+        logger.info(f"{total} shipping lane features in bbox, page size {page_size}")
 
-        if 'features' not in data or not data['features']:
+        offsets = iter(range(0, total, page_size))
+        window = 2 * self.max_workers
+        received = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = []
+            for offset in offsets:
+                pending.append((offset, executor.submit(self._fetch_page, params, offset, page_size)))
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                page_offset, future = pending.pop(0)
+                data = future.result()
+
+                # Підтримувати вікно запитів наперед
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append((offset, executor.submit(self._fetch_page, params, offset, page_size)))
+
+                features = data.get('features') or []
+                expected = min(page_size, total - page_offset)
+                exceeded = (data.get('exceededTransferLimit')
+                            or (data.get('properties') or {}).get('exceededTransferLimit'))
+                if len(features) < expected:
+                    # Сервер обрізав сторінку попри page_size <= maxRecordCount
+                    # (exceededTransferLimit буває й на повних сторінках: далі є ще записи)
+                    logger.warning(
+                        f"Shipping lanes page at offset {page_offset} truncated: "
+                        f"{len(features)} of {expected} features"
+                        f"{' (exceededTransferLimit)' if exceeded else ''}"
+                    )
+
+                received += len(features)
+                if features:
+                    page = gpd.GeoDataFrame.from_features(features, crs='EPSG:4326')
+                    yield page
+
+        if received != total:
+            logger.warning(f"Received {received} shipping lane features, expected {total}")
+
+    def download_shipping_lanes(
+        self,
+        bbox: dict,
+        save: bool = True,
+        max_allowable_offset: Optional[float] = None,
+        page_size: Optional[int] = None,
+        return_features: bool = True
+    ) -> Optional[gpd.GeoDataFrame]:
+        """
+        Завантажити морські шляхи у bbox
+
+        Parameters:
+        -----------
+        bbox : dict
+            Bounding box
+        save : bool
+            Записувати сторінки у GeoPackage по мірі завантаження
+        max_allowable_offset : float, optional
+            Допуск генералізації геометрії (градуси); для сітки 0.1°
+            достатньо половини кроку сітки
+        page_size : int, optional
+            Розмір сторінки запиту
+        return_features : bool
+            Повернути всі об'єкти як GeoDataFrame; False разом із save=True
+            не тримає завантажені сторінки в пам'яті
+
+        Returns:
+        --------
+        gdf : gpd.GeoDataFrame or None
+            Об'єкти морських шляхів (None, якщо return_features=False)
+
+        Raises:
+        -------
+        requests.exceptions.RequestException: якщо сторінку не вдалося
+            завантажити (незавершений файл видаляється, попередній лишається)
+        """
+        logger.info("Downloading shipping lanes from NOAA...")
+
+        output_file = self.data_dir / "shipping_lanes.gpkg"
+        tmp_file = output_file.with_suffix('.part.gpkg')
+        if save and tmp_file.exists():
+            tmp_file.unlink()
+
+        pages = []
+        n_features = 0
+
+        try:
+            for page in self.iter_pages(bbox, max_allowable_offset, page_size):
+                if save:
+                    page.to_file(tmp_file, driver="GPKG",
+                                 mode='a' if tmp_file.exists() else 'w')
+                if return_features:
+                    pages.append(page)
+                n_features += len(page)
+        except Exception as e:
+            logger.error(f"Error downloading shipping lanes: {e}")
+            if tmp_file.exists():
+                tmp_file.unlink()
+            raise
+
+        if not n_features:
             logger.warning("No shipping lanes found in this region")
             return gpd.GeoDataFrame()
 
-        gdf = gpd.GeoDataFrame.from_features(data['features'])
-        gdf.crs = 'EPSG:4326'
-
-        logger.info(f"Downloaded {len(gdf)} shipping lane features")
+        logger.info(f"Downloaded {n_features} shipping lane features")
 
         if save:
-            output_file = self.data_dir / "shipping_lanes.gpkg"
-            gdf.to_file(output_file, driver="GPKG")
+            tmp_file.replace(output_file)
             logger.info(f"Saved to {output_file}")
 
-        return gdf
+        if not return_features:
+            return None
+
+        return gpd.GeoDataFrame(pd.concat(pages, ignore_index=True), crs='EPSG:4326')
 
 
 def main():
     collector = ShippingLanesCollector()
     bbox = {'min_lon': -130, 'max_lon': -110, 'min_lat': 25, 'max_lat': 45}
-    lanes = collector.download_shipping_lanes(bbox, save=True)
+    lanes = collector.download_shipping_lanes(bbox, save=True, max_allowable_offset=0.05)
 
 
 if __name__ == "__main__":
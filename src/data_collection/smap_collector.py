@@ -7,7 +7,12 @@ import earthaccess
 import xarray as xr
 from pathlib import Path
 import logging
-from typing import Tuple
+import sys
+from typing import Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.granule_manager import GranuleManager
+from utils.earthdata import configure_earthdata, ensure_login
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,10 +21,14 @@ logger = logging.getLogger(__name__)
 class SMAPCollector:
     """Collector for SMAP sea surface salinity data"""
 
-    def __init__(self, data_dir: str = "./data/raw/smap"):
+    def __init__(self, username: Optional[str] = None, password: Optional[str] = None,
+                 data_dir: str = "./data/raw/smap", max_workers: int = 4):
         self.data_dir = Path(data_dir)
+        self.max_workers = max_workers
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        earthaccess.login()
+
+        # Аутентифікація відкладена до першого завантаження
+        configure_earthdata(username, password)
 
     def download_salinity(self, date_range: Tuple[str, str], bbox: dict,
                          save: bool = True) -> xr.Dataset:
@@ -37,8 +46,10 @@ class SMAPCollector:
         logger.info(f"Found {len(results)} granules")
 
         if save:
-            files = earthaccess.download(results, str(self.data_dir))
+            # Завантажити лише гранули, яких немає в маніфесті
+            files = GranuleManager(self.data_dir, self.max_workers).sync(results)
         else:
+            ensure_login()
             files = earthaccess.open(results)
 
         ds = xr.open_mfdataset(files, combine='by_coords')
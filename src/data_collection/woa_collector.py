@@ -3,10 +3,20 @@ World Ocean Atlas 2018 Dissolved Oxygen collector
 Збір кліматологічних даних про розчинений кисень
 """
 
+import os
 import requests
+import shutil
+import tempfile
 import xarray as xr
 from pathlib import Path
+from typing import Optional
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.response_cache import ResponseCache
+from utils.downloader import download_file, log_progress
+from utils.http_session import get_session
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,9 +25,13 @@ logger = logging.getLogger(__name__)
 class WOACollector:
     """Collector for World Ocean Atlas dissolved oxygen data"""
 
-    def __init__(self, data_dir: str = "./data/raw/woa"):
+    def __init__(self, data_dir: str = "./data/raw/woa",
+                 cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = cache
+        self.session = session or get_session()
         self.base_url = "https://www.ncei.noaa.gov/data/oceans/woa/WOA18/DATA/oxygen/netcdf/all/1.00/"
 
     def download_oxygen(self, temporal: str = "annual", resolution: str = "1.00",
@@ -30,17 +44,32 @@ class WOACollector:
 
         output_file = self.data_dir / filename
 
-        if not output_file.exists() or not save:
+        def download(path):
             logger.info(f"Downloading from {url}...")
-            response = requests.get(url, timeout=300)
-            response.raise_for_status()
+            download_file(url, path, session=self.session,
+                          progress_callback=log_progress(filename))
 
-            if save:
-                with open(output_file, 'wb') as f:
-                    f.write(response.content)
+        if save:
+            if not output_file.exists():
+                if self.cache is not None:
+                    cached = self.cache.get_or_download('woa', {'url': url}, download)
+                    # Жорстке посилання: файл у кеші та в data_dir займає місце один раз
+                    try:
+                        os.link(cached, output_file)
+                    except OSError:
+                        # Інша файлова система або без підтримки посилань
+                        shutil.copyfile(cached, output_file)
+                else:
+                    download(output_file)
                 logger.info(f"Saved to {output_file}")
+            ds = xr.open_dataset(output_file)
+        elif self.cache is not None:
+            ds = xr.open_dataset(self.cache.get_or_download('woa', {'url': url}, download))
+        else:
+            temp_file = Path(tempfile.mkdtemp(prefix="woa_")) / filename
+            download(temp_file)
+            ds = xr.open_dataset(temp_file)
 
-        ds = xr.open_dataset(output_file)
         logger.info(f"Loaded Oxygen data: {ds}")
         return ds
 
@@ -5,6 +5,7 @@ Data standardization pipeline
 
 import xarray as xr
 import numpy as np
+import pandas as pd
 import geopandas as gpd
 from pathlib import Path
 import logging
@@ -13,8 +14,8 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from utils import (
     create_target_grid, resample_to_grid, calculate_distance_raster,
-    calculate_slope, calculate_gradient, raster_to_geotiff,
-    aggregate_to_weekly, get_time_coordinate
+    kernel_density_raster, calculate_slope, calculate_gradient, raster_to_geotiff,
+    aggregate_to_weekly, get_time_coordinate, get_season
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -30,9 +31,18 @@ class DataStandardizer:
     """
 
     def __init__(self, bbox: dict, resolution: float = 0.1,
-                 output_dir: str = "./data/processed"):
+                 output_dir: str = "./data/processed", distance_method: str = 'kdtree',
+                 line_distance_method: str = None, regrid_weights_dir: str = None,
+                 regrid_chunk_mb: float = 256):
         self.bbox = bbox
         self.resolution = resolution
+        # Рушій растрів відстаней: 'kdtree' або 'edt' (див. calculate_distance_raster)
+        self.distance_method = distance_method
+        # Рушій для ліній (морські шляхи); None - той самий, що й для точок
+        self.line_distance_method = line_distance_method or distance_method
+        # Кеш ваг перегридингу (див. Regridder) і обсяг порції по часу
+        self.regrid_weights_dir = regrid_weights_dir
+        self.regrid_chunk_mb = regrid_chunk_mb
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -43,6 +53,13 @@ class DataStandardizer:
 
         logger.info(f"Target grid created: {self.lon_grid.shape}")
 
+    def _resample(self, data: xr.DataArray, method: str = 'bilinear') -> xr.DataArray:
+        """Ресемплювати до цільової сітки з кешованими вагами"""
+        return resample_to_grid(
+            data, (self.lon_grid, self.lat_grid), method=method,
+            weights_dir=self.regrid_weights_dir, chunk_mb=self.regrid_chunk_mb
+        )
+
     def process_sst(self, sst_ds: xr.Dataset) -> xr.DataArray:
         """Обробити SST дані"""
         logger.info("Processing SST data...")
@@ -56,25 +73,33 @@ class DataStandardizer:
             raise ValueError("SST variable not found")
 
         # Ресемплювати до цільової сітки
-        sst_resampled = resample_to_grid(sst, (self.lon_grid, self.lat_grid), method='bilinear')
+        sst_resampled = self._resample(sst)
 
         # Агрегувати до тижневого роздільності
         sst_weekly = aggregate_to_weekly(sst_resampled, method='mean')
 
-        # Розрахувати градієнт (океанічні фронти)
-        gradient = calculate_gradient(sst_weekly, self.resolution)
-
         # Зберегти
         output_file = self.output_dir / "SST_weekly.nc"
         sst_weekly.to_netcdf(output_file)
 
-        gradient_file = self.output_dir / "SST_gradient.nc"
-        xr.DataArray(gradient, coords=sst_weekly.coords).to_netcdf(gradient_file)
-
         logger.info(f"SST data saved to {output_file}")
 
         return sst_weekly
 
+    def process_sst_gradient(self, sst_weekly: xr.DataArray) -> xr.DataArray:
+        """Розрахувати градієнт SST (океанічні фронти) з тижневого SST"""
+        logger.info("Processing SST gradient...")
+
+        gradient = xr.DataArray(calculate_gradient(sst_weekly, self.resolution),
+                                coords=sst_weekly.coords)
+
+        gradient_file = self.output_dir / "SST_gradient.nc"
+        gradient.to_netcdf(gradient_file)
+
+        logger.info(f"SST gradient saved to {gradient_file}")
+
+        return gradient
+
     def process_chlorophyll(self, chl_ds: xr.Dataset) -> xr.DataArray:
         """Обробити Chlorophyll-a дані"""
         logger.info("Processing Chlorophyll-a data...")
@@ -86,7 +111,7 @@ class DataStandardizer:
         else:
             raise ValueError("Chlorophyll variable not found")
 
-        chl_resampled = resample_to_grid(chl, (self.lon_grid, self.lat_grid), method='bilinear')
+        chl_resampled = self._resample(chl)
         chl_weekly = aggregate_to_weekly(chl_resampled, method='mean')
 
         output_file = self.output_dir / "Chlorophyll_weekly.nc"
@@ -101,7 +126,7 @@ class DataStandardizer:
         logger.info("Processing bathymetry data...")
 
         # Ресемплювати
-        bathy_resampled = resample_to_grid(bathy_grid, (self.lon_grid, self.lat_grid), method='bilinear')
+        bathy_resampled = self._resample(bathy_grid)
 
         # Конвертувати в глибину (позитивні значення)
         depth = -bathy_resampled.where(bathy_resampled < 0, 0)
@@ -128,7 +153,8 @@ class DataStandardizer:
         dist_raster = calculate_distance_raster(
             rookeries_gdf,
             (self.lon_grid, self.lat_grid),
-            max_distance=500  # км
+            max_distance=500,  # км
+            method=self.distance_method
         )
 
         output_file = self.output_dir / "Dist_to_Rookery.tif"
@@ -142,21 +168,14 @@ class DataStandardizer:
         """Створити растр відстаней до морських шляхів"""
         logger.info("Processing shipping lanes...")
 
-        # Конвертувати лінії в точки для розрахунку відстаней
-        points = []
-        for geom in lanes_gdf.geometry:
-            if geom.geom_type == 'LineString':
-                points.extend([Point(x, y) for x, y in geom.coords])
-            elif geom.geom_type == 'MultiLineString':
-                for line in geom.geoms:
-                    points.extend([Point(x, y) for x, y in line.coords])
-
-        points_gdf = gpd.GeoDataFrame(geometry=points, crs="EPSG:4326")
+        # 'kdtree' рахує відстань до вершин ліній, решта рушіїв - до самих ліній
+        lines = lanes_gdf[lanes_gdf.geom_type.isin(['LineString', 'MultiLineString'])]
 
         dist_raster = calculate_distance_raster(
-            points_gdf,
+            lines,
             (self.lon_grid, self.lat_grid),
-            max_distance=500
+            max_distance=500,
+            method=self.line_distance_method
         )
 
         output_file = self.output_dir / "Dist_to_Shipping_Lane.tif"
@@ -166,36 +185,95 @@ class DataStandardizer:
 
         return dist_raster
 
-    def process_orca_density(self, orca_gdf: gpd.GeoDataFrame) -> np.ndarray:
-        """Створити растр щільності косаток (kernel density)"""
+    def process_orca_density(self, orca_gdf: gpd.GeoDataFrame, bandwidth_km: float = 50.0,
+                             period: str = None) -> np.ndarray:
+        """
+        Створити растр щільності косаток (binned KDE, див. kernel_density_raster)
+
+        Parameters:
+        -----------
+        orca_gdf : gpd.GeoDataFrame
+            Спостереження косаток
+        bandwidth_km : float
+            Ширина ядра (км)
+        period : str, optional
+            'week' або 'season' - додатково зберегти куб щільності за
+            тижнями (Orca_Density_weekly.nc) або сезонами (Orca_Density_seasonal.nc)
+
+        Returns:
+        --------
+        density : np.ndarray
+            Індекс щільності 0-1
+        """
         logger.info("Processing Orca density...")
 
-        from scipy.stats import gaussian_kde
-
-        # Отримати координати
-        coords = np.array([[pt.x, pt.y] for pt in orca_gdf.geometry])
-
-        if len(coords) < 2:
+        if len(orca_gdf) < 2:
             logger.warning("Not enough Orca observations for KDE")
             return np.zeros(self.lon_grid.shape)
 
-        # Kernel Density Estimation
-        kde = gaussian_kde(coords.T)
-
-        # Обчислити на сітці
-        grid_coords = np.column_stack([self.lon_grid.ravel(), self.lat_grid.ravel()])
-        density = kde(grid_coords.T).reshape(self.lon_grid.shape)
+        density = kernel_density_raster(orca_gdf, (self.lon_grid, self.lat_grid), bandwidth_km)
 
         # Нормалізувати до 0-1
-        density = (density - density.min()) / (density.max() - density.min())
+        value_range = density.max() - density.min()
+        density = (density - density.min()) / value_range if value_range > 0 else np.zeros_like(density)
 
         output_file = self.output_dir / "Orca_Density_Index.tif"
         raster_to_geotiff(density, self.transform, str(output_file))
 
         logger.info(f"Orca density raster saved to {output_file}")
 
+        if period is not None:
+            self.process_orca_density_cube(orca_gdf, bandwidth_km, period)
+
         return density
 
+    def process_orca_density_cube(self, orca_gdf: gpd.GeoDataFrame, bandwidth_km: float = 50.0,
+                                  period: str = 'week') -> xr.DataArray:
+        """
+        Куб щільності косаток за тижнями або сезонами
+
+        Шари нормалізовані спільним максимумом, тож тижні з меншою
+        кількістю спостережень лишаються слабшими. Тижні позначені
+        кінцем тижня, як в aggregate_to_weekly.
+        """
+        if period not in ('week', 'season'):
+            raise ValueError(f"Unknown density period: {period}")
+
+        # eventDate може бути інтервалом ('2019-07-01/2019-07-05') - беремо початок
+        dates = pd.to_datetime(orca_gdf['eventDate'].astype(str).str[:10], errors='coerce')
+        dated = dates.notna().values
+        if not dated.any():
+            logger.warning("No dated Orca observations for density cube")
+            return None
+        dates = dates[dated]
+
+        if period == 'week':
+            week_end = dates.dt.to_period('W-SUN').dt.end_time.dt.normalize()
+            labels = pd.date_range(week_end.min(), week_end.max(), freq='W-SUN')
+            groups = labels.get_indexer(week_end)
+            dim, output_file = 'time', self.output_dir / "Orca_Density_weekly.nc"
+        else:
+            labels = pd.Index(['Winter', 'Spring', 'Summer', 'Autumn'])
+            groups = labels.get_indexer(dates.dt.month.map(get_season))
+            dim, output_file = 'season', self.output_dir / "Orca_Density_seasonal.nc"
+
+        cube = kernel_density_raster(
+            orca_gdf[dated], (self.lon_grid, self.lat_grid), bandwidth_km,
+            groups=groups, n_groups=len(labels)
+        )
+        if cube.max() > 0:
+            cube /= cube.max()
+
+        cube = xr.DataArray(
+            cube, dims=(dim, 'lat', 'lon'), name='orca_density',
+            coords={dim: labels, 'lat': self.lat_grid[:, 0], 'lon': self.lon_grid[0, :]}
+        )
+        cube.to_netcdf(output_file)
+
+        logger.info(f"Orca density cube ({len(labels)} {period} layers) saved to {output_file}")
+
+        return cube
+
 
 def main():
     """Приклад використання"""
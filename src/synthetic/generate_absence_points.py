@@ -25,7 +25,8 @@ class AbsencePointsGenerator:
     100 км буферу навколо реальних точок присутності.
     """
 
-    def __init__(self, buffer_distance_km: float = 100, random_seed: int = 42):
+    def __init__(self, buffer_distance_km: float = 100, random_seed: int = 42,
+                 buffer_method: str = 'degrees'):
         """
         Parameters:
         -----------
@@ -33,8 +34,11 @@ class AbsencePointsGenerator:
             Відстань буферу від точок присутності (км)
         random_seed : int
             Seed для генератора випадкових чисел
+        buffer_method : str
+            'degrees' або 'geodesic' (див. buffer_points)
         """
         self.buffer_distance = buffer_distance_km
+        self.buffer_method = buffer_method
         self.random_seed = random_seed
         np.random.seed(random_seed)
 
@@ -83,7 +87,7 @@ class AbsencePointsGenerator:
         logger.info(f"Generating {n_absence} absence points...")
 
         # Створити буфер навколо точок присутності
-        buffered = buffer_points(presence_filtered, self.buffer_distance)
+        buffered = buffer_points(presence_filtered, self.buffer_distance, method=self.buffer_method)
 
         # Об'єднати всі буфери в одну геометрію
         exclusion_zone = buffered.unary_union
@@ -187,13 +187,13 @@ class NurserySuitabilityCalculator:
         # Завантажити та усереднити SST для літніх місяців
         sst_summer_data = []
         for sst_file in sst_files:
-            ds = xr.open_dataset(sst_file)
+            # Файл містить одну змінну (SST_weekly.nc з DataStandardizer)
+            sst = xr.load_dataarray(sst_file)
             # Фільтрувати літні місяці
-            time_coord = list(ds.coords.keys())[0]
-            if 'time' in ds.coords or 'Time' in ds.coords:
-                time_var = 'time' if 'time' in ds.coords else 'Time'
-                summer_mask = ds[time_var].dt.month.isin(self.summer_months)
-                sst_summer = ds.where(summer_mask, drop=True)
+            if 'time' in sst.coords or 'Time' in sst.coords:
+                time_var = 'time' if 'time' in sst.coords else 'Time'
+                summer_mask = sst[time_var].dt.month.isin(self.summer_months)
+                sst_summer = sst.where(summer_mask, drop=True)
                 sst_summer_data.append(sst_summer.mean(dim=time_var).values)
 
         sst_summer = np.nanmean(sst_summer_data, axis=0) if sst_summer_data else np.zeros_like(depth)
@@ -201,7 +201,7 @@ class NurserySuitabilityCalculator:
         # Завантажити та усереднити хлорофіл
         chl_data = []
         for chl_file in chlorophyll_files:
-            ds = xr.open_dataset(chl_file)
+            ds = xr.load_dataset(chl_file)
             chl_data.append(ds['chlor_a'].mean(dim='time').values if 'time' in ds.coords else ds['chlor_a'].values)
 
         chlorophyll = np.nanmean(chl_data, axis=0) if chl_data else np.zeros_like(depth)
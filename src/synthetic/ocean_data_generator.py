@@ -0,0 +1,350 @@
+"""
+Synthetic ocean data generator
+Генерація синтетичних океанографічних даних для тестів масштабування
+
+Генерує кубики SST/Chl/SLA/SSS на нативних роздільностях продуктів,
+GEBCO-подібну батиметрію, треки акул, спостереження та морські шляхи,
+і записує їх у тих самих форматах і директоріях, що й колектори.
+"""
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+import geopandas as gpd
+from shapely import linestrings
+from pathlib import Path
+from typing import Tuple
+import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.spatial_utils import points_to_geodataframe
+from data_collection.ocearch_collector import OCEARCHCollector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Нативні роздільності продуктів (градуси)
+MODIS_RESOLUTION = 1 / 24      # 4 км
+SMAP_RESOLUTION = 0.25
+CMEMS_RESOLUTION = 0.25
+GEBCO_RESOLUTION = 1 / 240     # 15 arc-seconds
+
+# Частоти продуктів (pandas freq)
+PRODUCT_FREQ = {
+    'monthly': 'MS',
+    '8day': '8D',
+    'daily': 'D'
+}
+
+
+def _axis(min_value: float, max_value: float, resolution: float,
+          descending: bool = False) -> np.ndarray:
+    """Центри комірок осі (як у L3 гранулах)"""
+    n = max(int(round((max_value - min_value) / resolution)), 1)
+    centers = min_value + (np.arange(n) + 0.5) * resolution
+    return centers[::-1] if descending else centers
+
+
+class SyntheticOceanDataGenerator:
+    """
+    Генератор реалістичних синтетичних даних для bbox
+
+    Поля мають реалістичну структуру: широтний градієнт і сезонний цикл
+    SST, шельф уздовж східного краю bbox (берег), підвищений хлорофіл
+    над шельфом, мезомасштабні вихори SLA.
+    """
+
+    def __init__(self, bbox: dict, random_seed: int = 42):
+        """
+        Parameters:
+        -----------
+        bbox : dict
+            Bounding box з ключами: min_lon, max_lon, min_lat, max_lat
+        random_seed : int
+            Seed генератора
+        """
+        self.bbox = bbox
+        self.rng = np.random.default_rng(random_seed)
+
+    def _grid(self, resolution: float, descending_lat: bool = True):
+        lats = _axis(self.bbox['min_lat'], self.bbox['max_lat'], resolution, descending_lat)
+        lons = _axis(self.bbox['min_lon'], self.bbox['max_lon'], resolution)
+        return lats, lons
+
+    def _coast_distance(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Відстань (градуси) до умовного берега на східному краї bbox"""
+        lon2d = np.broadcast_to(lons[None, :], (lats.size, lons.size))
+        return (self.bbox['max_lon'] - lon2d).astype(np.float32)
+
+    def _smooth_noise(self, shape: Tuple[int, int], scale: int = 16) -> np.ndarray:
+        """Просторово корельований шум (білий шум, розтягнутий з грубої сітки)"""
+        coarse = self.rng.standard_normal(
+            (max(shape[0] // scale, 2), max(shape[1] // scale, 2))
+        ).astype(np.float32)
+        rows = np.linspace(0, coarse.shape[0] - 1, shape[0]).round().astype(int)
+        cols = np.linspace(0, coarse.shape[1] - 1, shape[1]).round().astype(int)
+        return coarse[np.ix_(rows, cols)]
+
+    def _times(self, date_range: Tuple[str, str], temporal_resolution: str) -> pd.DatetimeIndex:
+        freq = PRODUCT_FREQ.get(temporal_resolution, temporal_resolution)
+        return pd.date_range(date_range[0], date_range[1], freq=freq)
+
+    def sst(self, date_range: Tuple[str, str], temporal_resolution: str = 'monthly',
+            resolution: float = MODIS_RESOLUTION) -> xr.Dataset:
+        """
+        MODIS-подібний куб SST (змінна 'sst', °C, широти за спаданням)
+        """
+        lats, lons = self._grid(resolution)
+        times = self._times(date_range, temporal_resolution)
+
+        base = 28 - 0.35 * np.abs(lats)[:, None] - 2.0 / (1 + self._coast_distance(lats, lons))
+        season = np.cos(2 * np.pi * (times.dayofyear.values - 220) / 365.25)
+        noise = self._smooth_noise((lats.size, lons.size))
+
+        sst = (base[None] + 3.0 * season[:, None, None] + 0.5 * noise[None]).astype(np.float32)
+        sst += self.rng.normal(0, 0.2, sst.shape).astype(np.float32)
+
+        return xr.Dataset(
+            {'sst': (('time', 'lat', 'lon'), sst, {'units': 'degree_C'})},
+            coords={'time': times, 'lat': lats, 'lon': lons}
+        )
+
+    def chlorophyll(self, date_range: Tuple[str, str], temporal_resolution: str = '8day',
+                    resolution: float = MODIS_RESOLUTION) -> xr.Dataset:
+        """
+        MODIS-подібний куб хлорофілу (змінна 'chlor_a', mg m^-3, лог-нормальний)
+        """
+        lats, lons = self._grid(resolution)
+        times = self._times(date_range, temporal_resolution)
+
+        shelf = np.exp(-self._coast_distance(lats, lons) / 2.0)
+        log_chl = np.log(0.15) + 2.5 * shelf + 0.4 * self._smooth_noise((lats.size, lons.size))
+        season = 0.3 * np.sin(2 * np.pi * times.dayofyear.values / 365.25)
+
+        chl = np.exp(log_chl[None] + season[:, None, None] +
+                     self.rng.normal(0, 0.3, (times.size, lats.size, lons.size))).astype(np.float32)
+
+        # Хмарність: ~20% пропусків
+        chl[self.rng.random(chl.shape) < 0.2] = np.nan
+
+        return xr.Dataset(
+            {'chlor_a': (('time', 'lat', 'lon'), chl, {'units': 'mg m^-3'})},
+            coords={'time': times, 'lat': lats, 'lon': lons}
+        )
+
+    def sea_level(self, date_range: Tuple[str, str], temporal_resolution: str = 'daily',
+                  resolution: float = CMEMS_RESOLUTION) -> xr.Dataset:
+        """
+        CMEMS-подібний куб SLA/ADT (координати latitude/longitude, метри)
+        """
+        lats, lons = self._grid(resolution, descending_lat=False)
+        times = self._times(date_range, temporal_resolution)
+
+        eddies = 0.1 * self._smooth_noise((lats.size, lons.size), scale=4)
+        drift = 0.002 * np.arange(times.size, dtype=np.float32)
+        sla = (eddies[None] + drift[:, None, None] +
+               self.rng.normal(0, 0.01, (times.size, lats.size, lons.size))).astype(np.float32)
+
+        return xr.Dataset(
+            {
+                'sla': (('time', 'latitude', 'longitude'), sla, {'units': 'm'}),
+                'adt': (('time', 'latitude', 'longitude'), sla + 0.5, {'units': 'm'})
+            },
+            coords={'time': times, 'latitude': lats, 'longitude': lons}
+        )
+
+    def salinity(self, date_range: Tuple[str, str], temporal_resolution: str = 'monthly',
+                 resolution: float = SMAP_RESOLUTION) -> xr.Dataset:
+        """
+        SMAP-подібний куб солоності (змінна 'sss_smap', PSU)
+        """
+        lats, lons = self._grid(resolution)
+        times = self._times(date_range, temporal_resolution)
+
+        base = 34.5 - 1.5 * np.exp(-self._coast_distance(lats, lons))
+        sss = (base[None] + self.rng.normal(0, 0.1, (times.size, lats.size, lons.size))).astype(np.float32)
+
+        return xr.Dataset(
+            {'sss_smap': (('time', 'lat', 'lon'), sss, {'units': 'PSU'})},
+            coords={'time': times, 'lat': lats, 'lon': lons}
+        )
+
+    def bathymetry(self, resolution: float = GEBCO_RESOLUTION) -> xr.DataArray:
+        """
+        GEBCO-подібна батиметрія ('elevation', м; від'ємна в океані)
+
+        Профіль: шельф до ~200 м, континентальний схил, абісаль ~4000 м.
+        """
+        lats, lons = self._grid(resolution, descending_lat=False)
+        distance = self._coast_distance(lats, lons)
+
+        depth = np.where(
+            distance < 0.5,
+            400 * distance,                                           # шельф
+            200 + 3800 * (1 - np.exp(-(distance - 0.5) / 1.5))       # схил і абісаль
+        )
+        depth = depth + 50 * self._smooth_noise(depth.shape, scale=32)
+        elevation = np.where(distance < 0.05, 10.0, -depth).astype(np.float32)
+
+        return xr.DataArray(
+            elevation, dims=('lat', 'lon'),
+            coords={'lat': lats, 'lon': lons}, name='elevation',
+            attrs={'units': 'm'}
+        )
+
+    def _random_walk(self, n_points: int, n_tracks: int, step_deg: float = 0.05):
+        """Треки як обмежені bbox випадкові блукання"""
+        track_id = np.repeat(np.arange(n_tracks), int(np.ceil(n_points / n_tracks)))[:n_points]
+
+        steps = self.rng.normal(0, step_deg, (n_points, 2))
+        starts = np.column_stack([
+            self.rng.uniform(self.bbox['min_lon'], self.bbox['max_lon'], n_tracks),
+            self.rng.uniform(self.bbox['min_lat'], self.bbox['max_lat'], n_tracks)
+        ])
+
+        coords = np.empty((n_points, 2))
+        for t in range(n_tracks):
+            idx = np.flatnonzero(track_id == t)
+            coords[idx] = starts[t] + np.cumsum(steps[idx], axis=0)
+
+        coords[:, 0] = np.clip(coords[:, 0], self.bbox['min_lon'], self.bbox['max_lon'])
+        coords[:, 1] = np.clip(coords[:, 1], self.bbox['min_lat'], self.bbox['max_lat'])
+
+        return track_id, coords[:, 0], coords[:, 1]
+
+    def shark_tracks(self, n_points: int = 10000, n_sharks: int = 50) -> gpd.GeoDataFrame:
+        """
+        Треки акул у форматі OCEARCHCollector.collect_all_white_shark_tracks
+        """
+        track_id, lons, lats = self._random_walk(n_points, n_sharks)
+
+        sex = self.rng.choice(['Male', 'Female'], n_sharks)
+        length = self.rng.uniform(1.5, 5.5, n_sharks).round(2)
+
+        dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(
+            self.rng.integers(0, 4 * 365 * 24, n_points), unit='h'
+        )
+
+        gdf = points_to_geodataframe(lons, lats)
+        gdf['Shark_ID'] = [f"synthetic-{i:04d}" for i in track_id]
+        gdf['Shark_Name'] = [f"Shark {i}" for i in track_id]
+        gdf['Sex'] = sex[track_id]
+        gdf['Length_m'] = length[track_id]
+        gdf['Weight_kg'] = (length[track_id] ** 3 * 12).round(1)
+        gdf['Date'] = dates
+        gdf['Shark_Presence_Status'] = 1
+        gdf['Life_Stage'] = OCEARCHCollector.classify_life_stage(gdf)
+
+        return gdf
+
+    def occurrences(self, n_points: int = 10000, species: str = 'Zalophus californianus',
+                    n_colonies: int = 20) -> gpd.GeoDataFrame:
+        """
+        Спостереження у форматі GBIFOBISCollector (кластери навколо колоній)
+        """
+        centers = np.column_stack([
+            self.rng.uniform(self.bbox['max_lon'] - 2, self.bbox['max_lon'], n_colonies),
+            self.rng.uniform(self.bbox['min_lat'], self.bbox['max_lat'], n_colonies)
+        ])
+        colony = self.rng.integers(0, n_colonies, n_points)
+        coords = centers[colony] + self.rng.normal(0, 0.1, (n_points, 2))
+        coords[:, 0] = np.clip(coords[:, 0], self.bbox['min_lon'], self.bbox['max_lon'])
+        coords[:, 1] = np.clip(coords[:, 1], self.bbox['min_lat'], self.bbox['max_lat'])
+
+        gdf = points_to_geodataframe(coords[:, 0], coords[:, 1])
+        gdf['decimalLongitude'] = coords[:, 0]
+        gdf['decimalLatitude'] = coords[:, 1]
+        gdf['eventDate'] = (pd.Timestamp('2020-01-01') + pd.to_timedelta(
+            self.rng.integers(0, 4 * 365, n_points), unit='D')).strftime('%Y-%m-%d')
+        gdf['Species'] = species
+
+        return gdf
+
+    def shipping_lanes(self, n_lanes: int = 200, n_vertices: int = 50) -> gpd.GeoDataFrame:
+        """
+        Морські шляхи у форматі ShippingLanesCollector (LineString)
+        """
+        track_id, lons, lats = self._random_walk(n_lanes * n_vertices, n_lanes, step_deg=0.1)
+        coords = np.column_stack([lons, lats])
+
+        geometry = linestrings(coords, indices=track_id)
+
+        return gpd.GeoDataFrame(
+            {'OBJECTID': np.arange(1, n_lanes + 1), 'THEMELAYER': 'Shipping Lanes'},
+            geometry=geometry, crs="EPSG:4326"
+        )
+
+    def write_all(
+        self,
+        data_dir: str,
+        date_range: Tuple[str, str] = ("2020-01-01", "2020-12-31"),
+        n_track_points: int = 10000,
+        n_occurrences: int = 10000,
+        n_lanes: int = 200,
+        bathymetry_resolution: float = GEBCO_RESOLUTION
+    ) -> dict:
+        """
+        Записати повний набір даних у структуру data/raw колекторів
+
+        Parameters:
+        -----------
+        data_dir : str
+            Корінь (аналог ./data/raw)
+        date_range : tuple
+            Діапазон дат динамічних продуктів
+        n_track_points, n_occurrences, n_lanes : int
+            Розміри точкових наборів
+        bathymetry_resolution : float
+            Роздільність батиметрії (градуси)
+
+        Returns:
+        --------
+        paths : dict
+            Шляхи до записаних файлів
+        """
+        root = Path(data_dir)
+        paths = {}
+
+        def write_nc(ds, path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            ds.to_netcdf(path)
+            return path
+
+        def write_gpkg(gdf, path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            gdf.to_file(path, driver="GPKG")
+            return path
+
+        tag = f"{date_range[0]}_{date_range[1]}"
+        paths['sst'] = write_nc(self.sst(date_range), root / "nasa_ocean" / "modis_sst" / f"sst_{tag}.nc")
+        paths['chlorophyll'] = write_nc(self.chlorophyll(date_range),
+                                        root / "nasa_ocean" / "modis_chlorophyll" / f"chl_{tag}.nc")
+        paths['sla'] = write_nc(self.sea_level(date_range), root / "copernicus" / f"sla_{tag}.nc")
+        paths['salinity'] = write_nc(self.salinity(date_range), root / "smap" / f"sss_{tag}.nc")
+        paths['bathymetry'] = write_nc(self.bathymetry(bathymetry_resolution),
+                                       root / "gebco" / "gebco_bathymetry_15s.nc")
+        paths['tracks'] = write_gpkg(self.shark_tracks(n_track_points),
+                                     root / "ocearch" / "white_shark_tracks.gpkg")
+        paths['prey'] = write_gpkg(self.occurrences(n_occurrences),
+                                   root / "biodiversity" / "prey_species_occurrences.gpkg")
+        paths['orca'] = write_gpkg(self.occurrences(max(n_occurrences // 10, 10), 'Orcinus orca'),
+                                   root / "biodiversity" / "orca_occurrences.gpkg")
+        paths['shipping'] = write_gpkg(self.shipping_lanes(n_lanes),
+                                       root / "shipping" / "shipping_lanes.gpkg")
+
+        for name, path in paths.items():
+            logger.info(f"{name}: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+        return paths
+
+
+def main():
+    """Приклад використання"""
+    bbox = {'min_lon': -130, 'max_lon': -110, 'min_lat': 25, 'max_lat': 45}
+    generator = SyntheticOceanDataGenerator(bbox, random_seed=42)
+    generator.write_all("./data/synthetic/raw", bathymetry_resolution=1 / 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,53 +2,71 @@
 Utilities package for Shark Voyager AI
 """
 
-from .spatial_utils import (
-    create_target_grid,
-    resample_to_grid,
-    calculate_distance_raster,
-    calculate_slope,
-    calculate_gradient,
-    points_to_geodataframe,
-    raster_to_geotiff,
-    buffer_points,
-    clip_to_bbox
-)
+from importlib import import_module
 
-from .temporal_utils import (
-    aggregate_to_weekly,
-    get_time_coordinate,
-    add_temporal_features,
-    filter_date_range,
-    get_season,
-    add_season_column,
-    create_weekly_dates,
-    interpolate_to_weekly,
-    get_climatology,
-    align_time_series,
-    is_summer_month
-)
-
-from .config_loader import (
-    load_config,
-    get_credentials,
-    get_bbox,
-    get_date_range,
-    get_target_species,
-    get_prey_species,
-    get_data_product_config,
-    create_output_paths,
-    validate_config,
-    setup_nasa_credentials
-)
+# Функції завантажуються з підмодулів при першому зверненні (PEP 562):
+# 'from utils import load_config' не тягне xarray/rasterio зі spatial_utils
+_EXPORTS = {
+    # Spatial utilities
+    'create_target_grid': 'spatial_utils',
+    'resample_to_grid': 'spatial_utils',
+    'Regridder': 'regrid',
+    'calculate_distance_raster': 'spatial_utils',
+    'kernel_density_raster': 'spatial_utils',
+    'haversine_km': 'spatial_utils',
+    'unit_vectors': 'spatial_utils',
+    'unit_vectors_to_lonlat': 'spatial_utils',
+    'geodesic_circles': 'spatial_utils',
+    'calculate_slope': 'spatial_utils',
+    'calculate_gradient': 'spatial_utils',
+    'points_to_geodataframe': 'spatial_utils',
+    'dataframe_to_geodataframe': 'spatial_utils',
+    'valid_coordinate_mask': 'spatial_utils',
+    'raster_to_geotiff': 'spatial_utils',
+    'buffer_points': 'spatial_utils',
+    'clip_to_bbox': 'spatial_utils',
+    # Temporal utilities
+    'aggregate_to_weekly': 'temporal_utils',
+    'get_time_coordinate': 'temporal_utils',
+    'add_temporal_features': 'temporal_utils',
+    'filter_date_range': 'temporal_utils',
+    'get_season': 'temporal_utils',
+    'add_season_column': 'temporal_utils',
+    'create_weekly_dates': 'temporal_utils',
+    'split_date_range': 'temporal_utils',
+    'interpolate_to_weekly': 'temporal_utils',
+    'get_climatology': 'temporal_utils',
+    'align_time_series': 'temporal_utils',
+    'is_summer_month': 'temporal_utils',
+    # Config loader
+    'load_config': 'config_loader',
+    'get_credentials': 'config_loader',
+    'get_bbox': 'config_loader',
+    'get_date_range': 'config_loader',
+    'get_target_species': 'config_loader',
+    'get_prey_species': 'config_loader',
+    'get_data_product_config': 'config_loader',
+    'create_output_paths': 'config_loader',
+    'validate_config': 'config_loader',
+    'setup_nasa_credentials': 'config_loader',
+}
 
 __all__ = [
     # Spatial utilities
     'create_target_grid',
     'resample_to_grid',
+    'Regridder',
     'calculate_distance_raster',
+    'kernel_density_raster',
+    'haversine_km',
+    'unit_vectors',
+    'unit_vectors_to_lonlat',
+    'geodesic_circles',
     'calculate_slope',
     'calculate_gradient',
     'points_to_geodataframe',
+    'dataframe_to_geodataframe',
+    'valid_coordinate_mask',
     'raster_to_geotiff',
     'buffer_points',
     'clip_to_bbox',
@@ -60,6 +78,7 @@ __all__ = [
     'get_season',
     'add_season_column',
     'create_weekly_dates',
+    'split_date_range',
     'interpolate_to_weekly',
     'get_climatology',
     'align_time_series',
@@ -76,3 +95,17 @@ __all__ = [
     'validate_config',
     'setup_nasa_credentials'
 ]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
@@ -0,0 +1,191 @@
+"""
+Incremental build cache for Shark Voyager AI project
+Відбитки (fingerprints) входів задач pipeline для пропуску незмінених кроків
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .response_cache import _normalize
+
+logger = logging.getLogger(__name__)
+
+# Розмір блоку для хешування файлів
+_CHUNK_SIZE = 1024 * 1024
+
+
+class BuildCache:
+    """
+    Маніфест відбитків виходів задач
+
+    Відбиток задачі - SHA-256 від вмісту вхідних файлів, вихідного коду
+    модулів, що її реалізують, та релевантних параметрів конфігурації.
+    Якщо відбиток збігається із записаним у маніфесті, а виходи на місці
+    і не змінені, задача пропускається.
+
+    Хеші вмісту файлів кешуються за (розмір, mtime), тому повторна
+    перевірка великих гранул не читає їх знову. Оскільки виходи задачі
+    є входами наступних, перерахунок з ідентичним результатом не
+    інвалідовує залежні задачі.
+    """
+
+    def __init__(self, manifest_path: str = "./data/processed/.build_manifest.json",
+                 enabled: bool = True):
+        """
+        Parameters:
+        -----------
+        manifest_path : str
+            Файл маніфесту (JSON)
+        enabled : bool
+            False - кожна задача вважається застарілою (повний перерахунок),
+            маніфест при цьому оновлюється
+        """
+        self.manifest_path = Path(manifest_path)
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._manifest = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        empty = {'tasks': {}, 'files': {}}
+        if not self.manifest_path.exists():
+            return empty
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable build manifest {self.manifest_path}: {e}")
+            return empty
+
+        manifest.setdefault('tasks', {})
+        manifest.setdefault('files', {})
+        return manifest
+
+    def save(self):
+        """Атомарно записати маніфест"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f".{threading.get_ident()}.tmp")
+
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+
+    def file_digest(self, path: str) -> Optional[str]:
+        """
+        SHA-256 вмісту файлу (None, якщо файлу немає)
+
+        Результат запам'ятовується за шляхом, розміром і mtime.
+        """
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        key = str(path.resolve())
+        signature = [stat.st_size, stat.st_mtime_ns]
+
+        with self._lock:
+            cached = self._manifest['files'].get(key)
+        if cached and cached['stat'] == signature:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+        with self._lock:
+            self._manifest['files'][key] = {'stat': signature, 'sha256': digest.hexdigest()}
+
+        return digest.hexdigest()
+
+    def module_digest(self, module: str) -> Optional[str]:
+        """SHA-256 вихідного коду модуля без його імпорту (напр., 'processing.standardize_data')"""
+        spec = importlib.util.find_spec(module)
+        if spec is None or not spec.origin:
+            return None
+        return self.file_digest(spec.origin)
+
+    def fingerprint(self, inputs: Iterable[str] = (), params: Optional[Dict[str, Any]] = None,
+                    code: Iterable[str] = ()) -> str:
+        """
+        Відбиток задачі
+
+        Parameters:
+        -----------
+        inputs : iterable of str
+            Вхідні файли (порядок не важливий)
+        params : dict, optional
+            Параметри, від яких залежить результат (bbox, роздільність, пороги)
+        code : iterable of str
+            Модулі, що реалізують задачу
+
+        Returns:
+        --------
+        fingerprint : str
+            SHA-256 hex digest
+        """
+        payload = {
+            'inputs': sorted(
+                [str(Path(p).resolve()), self.file_digest(p)] for p in inputs
+            ),
+            'params': _normalize(params or {}),
+            'code': sorted([m, self.module_digest(m)] for m in code)
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def is_fresh(self, task: str, fingerprint: str, outputs: Iterable[str]) -> bool:
+        """
+        Чи актуальні виходи задачі
+
+        Виходи мають існувати і збігатися з записаними хешами, тож
+        видалений або змінений вручну файл призводить до перерахунку.
+        """
+        with self._lock:
+            entry = self._manifest['tasks'].get(task)
+
+        fresh = (
+            self.enabled
+            and entry is not None
+            and entry['fingerprint'] == fingerprint
+            and all(entry['outputs'].get(str(Path(p).resolve())) == self.file_digest(p)
+                    for p in outputs)
+        )
+
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return fresh
+
+    def record(self, task: str, fingerprint: str, outputs: Iterable[str]):
+        """Записати відбиток і хеші виходів після успішного виконання задачі"""
+        hashes = {str(Path(p).resolve()): self.file_digest(p) for p in outputs}
+        if None in hashes.values():
+            # Задача нічого не записала (напр., немає вхідних даних)
+            logger.debug(f"Not recording {task}: some outputs are missing")
+            return
+
+        with self._lock:
+            self._manifest['tasks'][task] = {'fingerprint': fingerprint, 'outputs': hashes}
+
+        self.save()
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика: пропущені (hits) та перераховані (misses) задачі"""
+        return {'hits': self.hits, 'misses': self.misses}
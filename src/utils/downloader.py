@@ -0,0 +1,281 @@
+"""
+File downloader for Shark Voyager AI project
+Потокове завантаження файлів з докачуванням та перевіркою цілісності
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import requests
+
+from .profiling import increment_counter
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class DownloadError(IOError):
+    """Завантажений файл не пройшов перевірку розміру або контрольної суми"""
+
+
+def _parse_checksum(checksum: str):
+    """'sha256:abcd...' -> ('sha256', 'abcd...'); без префікса - sha256"""
+    if ':' in checksum:
+        algorithm, digest = checksum.split(':', 1)
+    else:
+        algorithm, digest = 'sha256', checksum
+    return algorithm.lower(), digest.lower()
+
+
+def file_checksum(path: Union[str, Path], algorithm: str = 'sha256',
+                  chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Порахувати контрольну суму файлу блоками (пам'ять не залежить від розміру)
+
+    Parameters:
+    -----------
+    path : str or Path
+        Шлях до файлу
+    algorithm : str
+        Алгоритм hashlib: 'sha256', 'md5', ...
+
+    Returns:
+    --------
+    digest : str
+        Hex digest
+    """
+    h = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _content_range_total(response: requests.Response) -> Optional[int]:
+    """Повний розмір файлу з Content-Range ('bytes 0-99/1234' або 'bytes */1234')"""
+    content_range = response.headers.get('Content-Range', '')
+    total = content_range.rpartition('/')[2]
+    return int(total) if total.isdigit() else None
+
+
+def _remote_size(http, url: str, timeout: tuple) -> Optional[int]:
+    """Розмір файлу на сервері за HEAD-запитом (None, якщо невідомий)"""
+    try:
+        response = http.head(url, allow_redirects=True, timeout=timeout)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return None
+    length = response.headers.get('Content-Length')
+    return int(length) if length is not None and length.isdigit() else None
+
+
+def _discard_partial(part_file: Path, meta_file: Path):
+    """Видалити .part і його валідатори"""
+    for path in (part_file, meta_file):
+        if path.exists():
+            path.unlink()
+
+
+def log_progress(name: str, step_percent: int = 10) -> Callable[[int, Optional[int]], None]:
+    """
+    Progress callback, що пише в лог кожні step_percent відсотків
+
+    Parameters:
+    -----------
+    name : str
+        Назва файлу для повідомлень
+    step_percent : int
+        Крок логування у відсотках
+
+    Returns:
+    --------
+    callback : callable
+        callback(bytes_done, bytes_total)
+    """
+    state = {'next': step_percent}
+
+    def callback(done: int, total: Optional[int]):
+        if not total:
+            return
+        percent = done * 100 // total
+        if percent >= state['next']:
+            logger.info(f"{name}: {percent}% ({done / 1e6:.1f} / {total / 1e6:.1f} MB)")
+            state['next'] = (percent // step_percent + 1) * step_percent
+
+    return callback
+
+
+def download_file(
+    url: str,
+    output_file: Union[str, Path],
+    session: Optional[requests.Session] = None,
+    expected_size: Optional[int] = None,
+    checksum: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_retries: int = 5,
+    backoff: float = 2.0,
+    timeout: tuple = (30, 300)
+) -> Path:
+    """
+    Завантажити файл потоково з докачуванням
+
+    Дані пишуться блоками у файл '<output_file>.part'. Якщо з'єднання
+    обірвалось (або .part лишився з попереднього запуску), завантаження
+    продовжується з HTTP Range від поточного розміру .part. ETag /
+    Last-Modified першої відповіді зберігаються поруч ('.part.meta') і
+    надсилаються як If-Range, тож якщо файл на сервері змінився, він
+    завантажується заново, а не дописується до старого .part. Після
+    завершення перевіряються розмір і (опційно) контрольна сума, і лише
+    тоді .part атомарно перейменовується в output_file.
+
+    Parameters:
+    -----------
+    url : str
+        URL файлу
+    output_file : str or Path
+        Шлях для збереження
+    session : requests.Session, optional
+        HTTP-сесія (для пулу з'єднань)
+    expected_size : int, optional
+        Очікуваний розмір у байтах (інакше береться з Content-Length)
+    checksum : str, optional
+        Очікувана контрольна сума: 'sha256:<hex>', 'md5:<hex>' або '<sha256 hex>'
+    progress_callback : callable, optional
+        callback(bytes_done, bytes_total)
+    chunk_size : int
+        Розмір блоку запису
+    max_retries : int
+        Кількість спроб докачування після обриву
+    backoff : float
+        Базова затримка між спробами (с)
+    timeout : tuple
+        (connect, read) таймаути requests
+
+    Returns:
+    --------
+    output_file : Path
+
+    Raises:
+    -------
+    DownloadError: розмір або контрольна сума не збігаються
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    part_file = output_file.with_name(output_file.name + '.part')
+    meta_file = output_file.with_name(output_file.name + '.part.meta')
+    http = session or requests
+
+    total = expected_size
+
+    for attempt in range(max_retries + 1):
+        done = part_file.stat().st_size if part_file.exists() else 0
+
+        if total is not None and done > total:
+            # .part більший за файл - залишок іншої версії
+            logger.warning(f"Discarding oversized partial {part_file.name}")
+            _discard_partial(part_file, meta_file)
+            done = 0
+
+        if total is not None and done == total:
+            break
+
+        headers = {}
+        if done:
+            headers['Range'] = f'bytes={done}-'
+            validators = json.loads(meta_file.read_text()) if meta_file.exists() else {}
+            validator = validators.get('etag') or validators.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
+
+        try:
+            with http.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 416:
+                    # Діапазон за межами файлу: .part повний лише якщо розмір збігається
+                    remote = _content_range_total(response) or _remote_size(http, url, timeout)
+                    if remote is not None and remote == done:
+                        total = remote
+                        break
+                    logger.warning(
+                        f"Partial {part_file.name} ({done} bytes) does not match remote size "
+                        f"{remote}, restarting"
+                    )
+                    _discard_partial(part_file, meta_file)
+                    raise requests.exceptions.ChunkedEncodingError("range not satisfiable")
+
+                response.raise_for_status()
+
+                if done and response.status_code != 206:
+                    # Сервер не підтримує Range або файл змінився (If-Range) - почати спочатку
+                    logger.warning(f"Server returned full content, restarting {output_file.name}")
+                    done = 0
+
+                if not done:
+                    validators = {'etag': response.headers.get('ETag'),
+                                  'last_modified': response.headers.get('Last-Modified')}
+                    meta_file.write_text(json.dumps(validators))
+
+                if total is None:
+                    total = _content_range_total(response) if response.status_code == 206 else None
+                if total is None:
+                    length = response.headers.get('Content-Length')
+                    if length is not None:
+                        total = done + int(length)
+
+                with open(part_file, 'ab' if done else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        done += len(chunk)
+                        increment_counter('download.bytes', len(chunk))
+                        if progress_callback:
+                            progress_callback(done, total)
+
+            if total is not None and done < total:
+                # З'єднання закрито до кінця файлу - докачати
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"connection closed at {done}/{total} bytes"
+                )
+            break
+
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            logger.warning(
+                f"Download of {output_file.name} interrupted ({e}), "
+                f"resuming in {delay:.0f}s"
+            )
+            time.sleep(delay)
+
+    # Перевірка розміру
+    size = part_file.stat().st_size if part_file.exists() else 0
+    if total is not None and size != total:
+        raise DownloadError(f"{output_file.name}: expected {total} bytes, got {size}")
+
+    # Перевірка контрольної суми
+    if checksum:
+        algorithm, expected = _parse_checksum(checksum)
+        actual = file_checksum(part_file, algorithm)
+        if actual != expected:
+            _discard_partial(part_file, meta_file)
+            raise DownloadError(
+                f"{output_file.name}: {algorithm} mismatch (expected {expected}, got {actual})"
+            )
+
+    os.replace(part_file, output_file)
+    if meta_file.exists():
+        meta_file.unlink()
+    increment_counter('download.files')
+    logger.info(f"Downloaded {output_file.name} ({size / 1e6:.1f} MB)")
+
+    return output_file
@@ -0,0 +1,84 @@
+"""
+Earthdata authentication for Shark Voyager AI project
+Спільна для процесу лінива автентифікація NASA Earthdata
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_credentials = {}
+_auth = None
+_https_session = None
+_lock = threading.Lock()
+
+
+def configure_earthdata(username: Optional[str] = None, password: Optional[str] = None):
+    """
+    Запам'ятати облікові дані Earthdata без звернення до мережі
+
+    Логін виконується пізніше, при першому реальному завантаженні
+    (див. ensure_login). Без облікових даних використовуються
+    змінні середовища або ~/.netrc.
+
+    Parameters:
+    -----------
+    username : str, optional
+        NASA Earthdata username
+    password : str, optional
+        NASA Earthdata password
+    """
+    if username and password:
+        with _lock:
+            _credentials['username'] = username
+            _credentials['password'] = password
+
+
+def ensure_login():
+    """
+    Автентифікуватися в Earthdata (один раз на процес)
+
+    Returns:
+    --------
+    auth : earthaccess.Auth
+    """
+    global _auth
+
+    with _lock:
+        if _auth is not None:
+            return _auth
+
+        import earthaccess
+
+        if _credentials:
+            os.environ['EARTHDATA_USERNAME'] = _credentials['username']
+            os.environ['EARTHDATA_PASSWORD'] = _credentials['password']
+            _auth = earthaccess.login(strategy="environment")
+        else:
+            # Змінні середовища, .netrc або інтерактивний логін
+            _auth = earthaccess.login()
+
+        logger.info("Authenticated with NASA Earthdata")
+        return _auth
+
+
+def get_https_session():
+    """
+    Спільна автентифікована HTTPS-сесія Earthdata
+
+    Returns:
+    --------
+    session : requests.Session
+    """
+    global _https_session
+
+    ensure_login()
+
+    with _lock:
+        if _https_session is None:
+            import earthaccess
+            _https_session = earthaccess.get_requests_https_session()
+        return _https_session
@@ -0,0 +1,273 @@
+"""
+Granule manager for Shark Voyager AI project
+Інкрементальне завантаження гранул Earthdata з локальним маніфестом
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from .downloader import download_file, file_checksum
+from .profiling import increment_counter
+from .earthdata import get_https_session
+from .remote_subset import granule_name
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+def granule_checksum(granule: Any) -> Optional[str]:
+    """
+    Контрольна сума з метаданих UMM гранули ('md5:<hex>', ...), якщо є
+    """
+    try:
+        infos = granule['umm']['DataGranule']['ArchiveAndDistributionInformation']
+    except (KeyError, TypeError):
+        return None
+
+    for info in infos:
+        checksum = info.get('Checksum')
+        if checksum and checksum.get('Value'):
+            algorithm = checksum.get('Algorithm', 'SHA-256').replace('-', '').lower()
+            return f"{algorithm}:{checksum['Value']}"
+    return None
+
+
+def granule_temporal(granule: Any) -> Dict[str, Optional[str]]:
+    """
+    Часове покриття гранули з метаданих UMM
+
+    Returns:
+    --------
+    coverage : dict
+        {'start': ISO-рядок або None, 'end': ISO-рядок або None}
+    """
+    try:
+        extent = granule['umm']['TemporalExtent']['RangeDateTime']
+        return {'start': extent.get('BeginningDateTime'), 'end': extent.get('EndingDateTime')}
+    except (KeyError, TypeError):
+        return {'start': None, 'end': None}
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """ISO-рядок (дата або дата-час, з 'Z' чи зсувом) -> naive UTC datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def files_in_range(directory: str, date_range: Optional[Tuple[str, str]] = None) -> List[Path]:
+    """
+    Файли з маніфесту директорії, часове покриття яких перетинає date_range
+
+    Гранули без часового покриття в маніфесті включаються завжди.
+    Файли, яких немає на диску, пропускаються.
+
+    Parameters:
+    -----------
+    directory : str
+        Директорія з manifest.json
+    date_range : tuple, optional
+        (start, end) - ISO-дати; end включно (None - усі файли)
+
+    Returns:
+    --------
+    files : list of Path
+        Відсортовані шляхи
+    """
+    directory = Path(directory)
+    manifest_file = directory / MANIFEST_NAME
+    if not manifest_file.exists():
+        return []
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    range_start = range_end = None
+    if date_range is not None:
+        range_start = _parse_time(date_range[0])
+        # Кінцева дата включно: до початку наступного дня
+        range_end = _parse_time(date_range[1]) + timedelta(days=1)
+
+    files = []
+    for entry in manifest.values():
+        path = directory / entry['file']
+        if not path.exists():
+            continue
+        temporal = entry.get('temporal') or {}
+        start, end = _parse_time(temporal.get('start')), _parse_time(temporal.get('end'))
+        if range_start is not None:
+            if start is not None and start >= range_end:
+                continue
+            if end is not None and end < range_start:
+                continue
+        files.append(path)
+
+    return sorted(files)
+
+
+class GranuleManager:
+    """
+    Локальне сховище гранул з маніфестом
+
+    Маніфест (manifest.json у директорії продукту) зберігає для кожної
+    гранули ім'я файлу, розмір, контрольну суму та часове покриття.
+    sync() завантажує лише гранули, яких немає в маніфесті (або файл
+    яких зник чи змінився), у пулі потоків.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_workers: int = 4,
+        session: Optional[requests.Session] = None
+    ):
+        """
+        Parameters:
+        -----------
+        directory : str
+            Директорія продукту
+        max_workers : int
+            Кількість паралельних завантажень
+        session : requests.Session, optional
+            Автентифікована HTTP-сесія Earthdata
+            (за замовчуванням: спільна сесія utils.earthdata, яка
+            створюється лише якщо є що завантажувати)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.session = session
+
+        self.manifest_file = self.directory / MANIFEST_NAME
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self):
+        """Атомарно записати маніфест (викликати під lock)"""
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        tmp_file.replace(self.manifest_file)
+
+    def _get_session(self) -> requests.Session:
+        if self.session is None:
+            self.session = get_https_session()
+        return self.session
+
+    def is_current(self, granule_id: str) -> bool:
+        """Чи є гранула в маніфесті і чи відповідає їй файл на диску"""
+        entry = self.manifest.get(granule_id)
+        if entry is None:
+            return False
+        path = self.directory / entry['file']
+        return path.exists() and path.stat().st_size == entry['size']
+
+    def _download(self, granule: Any, granule_id: str) -> Path:
+        url = granule.data_links()[0]
+        output_file = self.directory / granule_id
+        checksum = granule_checksum(granule)
+
+        start = time.perf_counter()
+        download_file(url, output_file, session=self._get_session(), checksum=checksum)
+        seconds = time.perf_counter() - start
+
+        size = output_file.stat().st_size
+        increment_counter(f'granules.bytes.{self.directory.name}', size)
+        increment_counter(f'granules.files.{self.directory.name}')
+        throughput = size / 1e6 / seconds if seconds > 0 else float('inf')
+        logger.info(f"{granule_id}: {size / 1e6:.1f} MB in {seconds:.1f}s ({throughput:.1f} MB/s)")
+
+        self.record(granule, output_file, checksum=checksum, seconds=seconds)
+
+        return output_file
+
+    def record(self, granule: Any, path: Path, checksum: Optional[str] = None,
+               seconds: Optional[float] = None):
+        """
+        Записати локальний файл гранули в маніфест (ключ - ім'я файлу)
+
+        Використовується і для завантажених гранул, і для subset-ів,
+        збережених колектором, щоб files_in_range знаходив їх за датами.
+
+        Parameters:
+        -----------
+        granule : earthaccess.DataGranule
+            Гранула (джерело часового покриття)
+        path : Path
+            Файл у директорії менеджера
+        checksum : str, optional
+            Контрольна сума '<algorithm>:<hex>' (default: sha256 файлу)
+        seconds : float, optional
+            Тривалість завантаження
+        """
+        path = Path(path)
+        entry = {
+            'file': path.name,
+            'size': path.stat().st_size,
+            'checksum': checksum or f"sha256:{file_checksum(path)}",
+            'temporal': granule_temporal(granule),
+            'downloaded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'seconds': round(seconds, 3) if seconds is not None else None
+        }
+
+        with self._lock:
+            self.manifest[path.name] = entry
+            self._save_manifest()
+
+    def sync(self, results: list) -> List[Path]:
+        """
+        Завантажити відсутні гранули
+
+        Parameters:
+        -----------
+        results : list
+            Гранули з earthaccess.search_data
+
+        Returns:
+        --------
+        files : list of Path
+            Локальні файли всіх гранул (у порядку results)
+        """
+        ids = [granule_name(granule) for granule in results]
+        missing = [(granule, gid) for granule, gid in zip(results, ids)
+                   if not self.is_current(gid)]
+
+        logger.info(
+            f"{self.directory.name}: {len(results) - len(missing)} granules up to date, "
+            f"{len(missing)} to download"
+        )
+
+        if missing:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(self._download, granule, gid)
+                           for granule, gid in missing]
+                for future in futures:
+                    future.result()
+
+            seconds = time.perf_counter() - start
+            total_mb = sum(self.manifest[gid]['size'] for _, gid in missing) / 1e6
+            logger.info(
+                f"{self.directory.name}: downloaded {total_mb:.1f} MB in {seconds:.1f}s "
+                f"({total_mb / max(seconds, 1e-9):.1f} MB/s)"
+            )
+
+        return [self.directory / self.manifest[gid]['file'] for gid in ids]
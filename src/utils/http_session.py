@@ -0,0 +1,161 @@
+"""
+HTTP session utilities for Shark Voyager AI project
+Спільна HTTP-сесія з пулом з'єднань, повторними спробами та лімітами запитів
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Статуси, при яких запит повторюється з backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_shared_session = None
+_shared_settings: Dict = {}
+_shared_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Обмеження частоти запитів (не більше rate запитів на секунду)
+
+    Безпечний для використання з кількох потоків: кожен виклик wait()
+    резервує наступний вільний часовий слот.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Parameters:
+        -----------
+        rate : float
+            Максимальна кількість запитів на секунду
+        """
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Дочекатися свого слоту"""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session з лімітами частоти запитів для окремих хостів
+    """
+
+    def __init__(self, rate_limits: Optional[Dict[str, float]] = None):
+        """
+        Parameters:
+        -----------
+        rate_limits : dict, optional
+            Ліміти {hostname: запитів на секунду}
+        """
+        super().__init__()
+        self.rate_limiters = {
+            host: RateLimiter(rate) for host, rate in (rate_limits or {}).items()
+        }
+
+    def request(self, method, url, *args, **kwargs):
+        limiter = self.rate_limiters.get(urlparse(url).hostname)
+        if limiter is not None:
+            limiter.wait()
+        return super().request(method, url, *args, **kwargs)
+
+
+def create_session(
+    pool_size: int = 16,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    rate_limits: Optional[Dict[str, float]] = None
+) -> PooledSession:
+    """
+    Створити HTTP-сесію з keep-alive пулом з'єднань
+
+    Parameters:
+    -----------
+    pool_size : int
+        Максимум з'єднань у пулі на один хост
+    max_retries : int
+        Повторні спроби при помилках з'єднання та статусах 429/5xx
+    backoff_factor : float
+        Базова затримка експоненційного backoff (с)
+    rate_limits : dict, optional
+        Ліміти {hostname: запитів на секунду}
+
+    Returns:
+    --------
+    session : PooledSession
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+
+    session = PooledSession(rate_limits=rate_limits)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def configure_session(**settings):
+    """
+    Задати параметри спільної сесії (див. create_session)
+
+    Викликається один раз на старті pipeline; попередня спільна сесія
+    (якщо була) закривається.
+    """
+    global _shared_session
+
+    with _shared_lock:
+        _shared_settings.clear()
+        _shared_settings.update({k: v for k, v in settings.items() if v is not None})
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
+
+def get_session() -> PooledSession:
+    """
+    Спільна для процесу HTTP-сесія (створюється при першому виклику)
+
+    Returns:
+    --------
+    session : PooledSession
+    """
+    global _shared_session
+
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session(**_shared_settings)
+            logger.debug(f"Created shared HTTP session: {_shared_settings}")
+        return _shared_session
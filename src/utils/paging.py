@@ -0,0 +1,164 @@
+"""
+Paging utilities for Shark Voyager AI project
+Допоміжні функції для посторінкового збору даних з API
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def retry_with_backoff(
+    func: Callable,
+    *args,
+    retries: int = 3,
+    backoff: float = 1.0,
+    exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    **kwargs
+) -> Any:
+    """
+    Викликати функцію з повторними спробами та експоненційною затримкою
+
+    Parameters:
+    -----------
+    func : callable
+        Функція для виклику
+    retries : int
+        Кількість повторних спроб після першої невдачі
+    backoff : float
+        Базова затримка (с); затримка перед спробою n = backoff * 2**(n-1)
+    exceptions : tuple
+        Типи винятків, при яких потрібно повторити виклик
+
+    Returns:
+    --------
+    result : any
+        Результат func(*args, **kwargs)
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except exceptions as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            logger.warning(
+                f"{getattr(func, '__name__', 'call')} failed ({e}), "
+                f"retry {attempt + 1}/{retries} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def split_bbox(bbox: dict, n_lon: int = 2, n_lat: int = 2) -> List[dict]:
+    """
+    Розбити bounding box на прямокутні тайли
+
+    Parameters:
+    -----------
+    bbox : dict
+        Bounding box з ключами: min_lon, max_lon, min_lat, max_lat
+    n_lon, n_lat : int
+        Кількість тайлів по довготі та широті
+
+    Returns:
+    --------
+    tiles : list
+        Список bbox-словників
+    """
+    lon_step = (bbox['max_lon'] - bbox['min_lon']) / n_lon
+    lat_step = (bbox['max_lat'] - bbox['min_lat']) / n_lat
+
+    tiles = []
+    for i in range(n_lat):
+        for j in range(n_lon):
+            tiles.append({
+                'min_lon': bbox['min_lon'] + j * lon_step,
+                'max_lon': bbox['min_lon'] + (j + 1) * lon_step if j < n_lon - 1 else bbox['max_lon'],
+                'min_lat': bbox['min_lat'] + i * lat_step,
+                'max_lat': bbox['min_lat'] + (i + 1) * lat_step if i < n_lat - 1 else bbox['max_lat'],
+            })
+
+    return tiles
+
+
+class ColumnarBuffer:
+    """
+    Колонковий буфер для записів з API
+
+    Записи (list of dicts) одразу розкладаються по колонках, тому
+    не потрібно тримати в пам'яті тисячі окремих словників до кінця збору.
+    Безпечний для запису з кількох потоків.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None):
+        """
+        Parameters:
+        -----------
+        columns : list, optional
+            Зберігати лише ці колонки (за замовчуванням: всі)
+        """
+        self.keep = set(columns) if columns is not None else None
+        self._columns: Dict[str, list] = {}
+        self._n_rows = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def append(self, records: Iterable[dict]) -> int:
+        """
+        Додати сторінку записів
+
+        Parameters:
+        -----------
+        records : iterable of dict
+            Записи однієї сторінки
+
+        Returns:
+        --------
+        n : int
+            Кількість доданих записів
+        """
+        records = list(records)
+        if not records:
+            return 0
+
+        keys = set()
+        for rec in records:
+            keys.update(rec.keys())
+        if self.keep is not None:
+            keys &= self.keep
+
+        n_new = len(records)
+
+        with self._lock:
+            for key in keys:
+                column = self._columns.get(key)
+                if column is None:
+                    column = self._columns[key] = [None] * self._n_rows
+                column.extend(rec.get(key) for rec in records)
+
+            # Колонки, відсутні на цій сторінці
+            for key, column in self._columns.items():
+                if key not in keys:
+                    column.extend([None] * n_new)
+
+            self._n_rows += n_new
+
+        return n_new
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Перетворити буфер у DataFrame
+
+        Returns:
+        --------
+        df : pd.DataFrame
+        """
+        with self._lock:
+            return pd.DataFrame(self._columns, index=pd.RangeIndex(self._n_rows))
@@ -0,0 +1,350 @@
+"""
+Profiling utilities for Shark Voyager AI project
+Вимірювання часу та пам'яті процесу (RSS) під час виконання етапів
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    _PROCESS = psutil.Process(os.getpid())
+except ImportError:
+    _PROCESS = None
+
+
+def current_rss_mb() -> float:
+    """
+    Поточний resident set size процесу (МБ)
+
+    Використовує psutil, якщо встановлено, інакше /proc/self/statm
+    (Linux) або пікове значення з resource.getrusage.
+    """
+    if _PROCESS is not None:
+        return _PROCESS.memory_info().rss / 1024 ** 2
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS повертає байти, Linux - кілобайти
+        return maxrss / 1024 ** 2 if sys.platform == 'darwin' else maxrss / 1024
+
+
+class PeakMemoryMonitor:
+    """
+    Пік RSS за час виконання блоку коду
+
+    Фоновий потік опитує RSS з інтервалом interval; піки, коротші за
+    інтервал, можуть бути пропущені.
+
+    Usage:
+        with PeakMemoryMonitor() as mem:
+            run_stage()
+        print(mem.peak_mb, mem.delta_mb)
+    """
+
+    def __init__(self, interval: float = 0.05):
+        """
+        Parameters:
+        -----------
+        interval : float
+            Інтервал опитування (с)
+        """
+        self.interval = interval
+        self.start_mb: Optional[float] = None
+        self.peak_mb: Optional[float] = None
+        self.end_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def delta_mb(self) -> Optional[float]:
+        """Приріст піку відносно RSS на початку блоку"""
+        if self.peak_mb is None or self.start_mb is None:
+            return None
+        return self.peak_mb - self.start_mb
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.end_mb = current_rss_mb()
+        self.peak_mb = max(self.peak_mb, self.end_mb)
+        return False
+
+
+def traced_peak_mb(func: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    """
+    Пік алокацій під час виклику func (МБ) за tracemalloc
+
+    На відміну від RSS, не залежить від фрагментації купи та інших
+    потоків, тому придатний для порівняння з baseline. Враховує об'єкти
+    Python і масиви numpy; пам'ять C-бібліотек (GEOS, cKDTree) не видно.
+
+    Returns:
+    --------
+    result : Any
+        Результат func
+    peak_mb : float
+        Пік алокацій відносно початку виклику
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return result, (peak - baseline) / 1024 ** 2
+
+
+_active_metrics = None
+
+
+def set_active_metrics(metrics: Optional['RunMetrics']):
+    """Зробити metrics отримувачем increment_counter для всього процесу"""
+    global _active_metrics
+    _active_metrics = metrics
+
+
+def increment_counter(name: str, value: float = 1):
+    """
+    Збільшити лічильник активних RunMetrics (без активних - нічого не робить)
+
+    Дозволяє колекторам рахувати байти і файли без передачі metrics
+    через усі виклики.
+    """
+    metrics = _active_metrics
+    if metrics is not None:
+        metrics.increment(name, value)
+
+
+class RunMetrics:
+    """
+    Метрики одного запуску pipeline
+
+    Таймери етапів (wall time, пік RSS процесу, статус), лічильники
+    (запити, байти, файли) і, за бажанням, cProfile для зовнішнього етапу
+    кожного потоку. report() / write_report() повертають машинозчитуваний звіт.
+
+    Usage:
+        metrics = RunMetrics(profile_dir="./data/processed/profiles")
+        with metrics.stage("collect"):
+            run_collectors()
+        metrics.write_report("./data/processed/run_report.json")
+    """
+
+    def __init__(self, profile_dir: Optional[str] = None, memory_interval: float = 0.2):
+        """
+        Parameters:
+        -----------
+        profile_dir : str, optional
+            Директорія для .prof файлів cProfile (None - без профілювання)
+        memory_interval : float
+            Інтервал опитування RSS для етапів (с)
+        """
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.memory_interval = memory_interval
+        self.stages: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profile_names: Dict[str, int] = {}
+
+        # Пік RSS за весь запуск
+        self._run_memory = PeakMemoryMonitor(interval=memory_interval)
+        self._run_memory.__enter__()
+
+    def increment(self, name: str, value: float = 1):
+        """Збільшити лічильник name на value (потокобезпечно)"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Виміряти блок коду як етап name
+
+        Вкладені етапи записуються з повною назвою через '/'.
+        cProfile вмикається для зовнішнього етапу кожного потоку: профайлер
+        Python діє лише в потоці, де його увімкнено, тож задачі з робочих
+        потоків TaskGraph отримують власні .prof файли, а профіль головного
+        потоку показує лише очікування.
+
+        process_peak_rss_mb / process_delta_rss_mb - RSS усього процесу за
+        час етапу: паралельні етапи в інших потоках теж до нього входять.
+        """
+        parents = getattr(self._local, 'stack', [])
+        self._local.stack = parents + [name]
+        full_name = "/".join(self._local.stack)
+
+        profiler = None
+        if self.profile_dir is not None and not parents:
+            profiler = cProfile.Profile()
+
+        record = {
+            'name': full_name,
+            'thread': threading.current_thread().name,
+            'started_at': time.time(),
+            'status': 'ok'
+        }
+
+        memory = PeakMemoryMonitor(interval=self.memory_interval)
+        start = time.perf_counter()
+        memory.__enter__()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Python 3.12+: лише один активний профайлер на процес
+                logger.debug(f"cProfile for stage {full_name} skipped: {e}")
+                profiler = None
+
+        try:
+            yield record
+        except BaseException as e:
+            record['status'] = 'failed'
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            memory.__exit__(None, None, None)
+            self._local.stack = parents
+
+            record['seconds'] = round(time.perf_counter() - start, 3)
+            record['process_peak_rss_mb'] = round(memory.peak_mb, 1)
+            record['process_delta_rss_mb'] = round(memory.delta_mb, 1)
+
+            if profiler is not None:
+                profile_file = self._profile_path(full_name)
+                profiler.dump_stats(str(profile_file))
+                record['profile'] = str(profile_file)
+
+            with self._lock:
+                self.stages.append(record)
+
+            logger.info(f"[metrics] {full_name}: {record['seconds']:.2f}s, "
+                        f"process peak RSS {record['process_peak_rss_mb']:.0f} MB "
+                        f"({record['status']})")
+
+    def _profile_path(self, stage_name: str) -> Path:
+        """Унікальний шлях .prof для етапу (повтори етапу отримують суфікс .2, .3, ...)"""
+        base = stage_name.replace('/', '.')
+        with self._lock:
+            count = self._profile_names.get(base, 0) + 1
+            self._profile_names[base] = count
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".{count}" if count > 1 else ""
+        return self.profile_dir / f"{base}{suffix}.prof"
+
+    def instrument(self, obj: Any, prefix: str, method_prefix: str = 'process_'):
+        """
+        Обгорнути методи obj, що починаються з method_prefix, етапами
+
+        Етап отримує назву '<prefix>.<method>'. Змінює лише екземпляр obj.
+        """
+        for attr in dir(obj):
+            if not attr.startswith(method_prefix):
+                continue
+            method = getattr(obj, attr)
+            if not callable(method):
+                continue
+
+            def timed(*args, _method=method, _name=f"{prefix}.{attr}", **kwargs):
+                with self.stage(_name):
+                    return _method(*args, **kwargs)
+
+            functools.update_wrapper(timed, method)
+            setattr(obj, attr, timed)
+
+        return obj
+
+    def http_hook(self, response, *args, **kwargs):
+        """
+        Response hook для requests.Session: кількість запитів і байтів
+
+        Байти беруться з Content-Length (тіло не читається, тож streaming
+        не ламається); відповіді без заголовка рахуються лише як запити.
+        """
+        host = urlparse(response.url).hostname or 'unknown'
+        self.increment('http.requests')
+        self.increment(f'http.requests.{host}')
+
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            self.increment('http.bytes', int(length))
+            self.increment(f'http.bytes.{host}', int(length))
+
+        return response
+
+    def report(self) -> Dict[str, Any]:
+        """Звіт про запуск (JSON-сумісний словник)"""
+        self._run_memory.peak_mb = max(self._run_memory.peak_mb, current_rss_mb())
+
+        with self._lock:
+            stages = sorted(self.stages, key=lambda s: s['started_at'])
+            counters = dict(sorted(self.counters.items()))
+
+        return {
+            'started_at': self.started_at,
+            'wall_seconds': round(time.perf_counter() - self._start, 3),
+            'pid': os.getpid(),
+            'python': platform.python_version(),
+            'peak_rss_mb': round(self._run_memory.peak_mb, 1),
+            'stages': stages,
+            'counters': counters
+        }
+
+    def write_report(self, path: str) -> Path:
+        """Записати звіт у JSON файл"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+        logger.info(f"Run report saved to {path}")
+        return path
+
+    def close(self):
+        """Зупинити фоновий моніторинг пам'яті запуску"""
+        self._run_memory.__exit__(None, None, None)
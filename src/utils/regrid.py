@@ -0,0 +1,311 @@
+"""
+Regridding with reusable sparse weights for Shark Voyager AI project
+Перегридинг з розрідженими вагами, що обчислюються один раз для пари сіток
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+import xarray as xr
+
+logger = logging.getLogger(__name__)
+
+# Методи, що реалізуються вагами
+METHODS = ('bilinear', 'nearest', 'conservative')
+
+# Версія формату ваг (змінити при зміні алгоритму - старий кеш стане недійсним)
+_WEIGHTS_VERSION = 1
+
+# Ваги в пам'яті процесу: SST і Chl на одній сітці MODIS рахуються один раз
+_MEMORY_CACHE: Dict[str, Tuple[sp.csr_matrix, sp.csr_matrix]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _sorted_source(source: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Відсортовані координати джерела і їхні початкові індекси (MODIS lat спадає)"""
+    order = np.argsort(source, kind='stable')
+    return source[order], order
+
+
+def _bilinear_weights(source: np.ndarray, target: np.ndarray) -> sp.csr_matrix:
+    """1D лінійні ваги (target x source); поза діапазоном джерела - порожні рядки"""
+    coords, order = _sorted_source(source)
+    inside = np.flatnonzero((target >= coords[0]) & (target <= coords[-1]))
+
+    right = np.clip(np.searchsorted(coords, target[inside], side='right'), 1, len(coords) - 1)
+    left = right - 1
+    span = coords[right] - coords[left]
+    frac = np.divide(target[inside] - coords[left], span, out=np.zeros(len(inside)), where=span > 0)
+
+    rows = np.concatenate([inside, inside])
+    cols = order[np.concatenate([left, right])]
+    weights = np.concatenate([1 - frac, frac])
+    keep = weights > 0
+    return sp.csr_matrix((weights[keep], (rows[keep], cols[keep])), shape=(len(target), len(source)))
+
+
+def _nearest_weights(source: np.ndarray, target: np.ndarray) -> sp.csr_matrix:
+    """1D ваги найближчого сусіда (target x source)"""
+    coords, order = _sorted_source(source)
+    inside = np.flatnonzero((target >= coords[0]) & (target <= coords[-1]))
+
+    right = np.clip(np.searchsorted(coords, target[inside]), 1, len(coords) - 1)
+    left = right - 1
+    nearest = np.where(target[inside] - coords[left] <= coords[right] - target[inside], left, right)
+
+    return sp.csr_matrix((np.ones(len(inside)), (inside, order[nearest])),
+                         shape=(len(target), len(source)))
+
+
+def _cell_edges(coords: np.ndarray) -> np.ndarray:
+    """Межі клітинок за центрами (відсортованими за зростанням)"""
+    mid = (coords[1:] + coords[:-1]) / 2
+    first = coords[0] - (mid[0] - coords[0]) if len(coords) > 1 else coords[0] - 0.5
+    last = coords[-1] + (coords[-1] - mid[-1]) if len(coords) > 1 else coords[-1] + 0.5
+    return np.concatenate([[first], mid, [last]])
+
+
+def _conservative_weights(source: np.ndarray, target: np.ndarray, latitude: bool = False) -> sp.csr_matrix:
+    """
+    1D ваги перекриття клітинок (target x source)
+
+    По широті перекриття міряється в sin(lat), тож добуток ваг широти і
+    довготи дає частку площі клітинки на сфері.
+    """
+    coords, order = _sorted_source(source)
+    target_order = np.argsort(target, kind='stable')
+
+    source_edges = _cell_edges(coords)
+    target_edges = _cell_edges(target[target_order])
+    if latitude:
+        source_edges = np.sin(np.radians(np.clip(source_edges, -90, 90)))
+        target_edges = np.sin(np.radians(np.clip(target_edges, -90, 90)))
+
+    # Кандидати: клітинки джерела між межами кожної цільової клітинки
+    first = np.searchsorted(source_edges, target_edges[:-1], side='right') - 1
+    last = np.searchsorted(source_edges, target_edges[1:], side='left')
+    first = np.clip(first, 0, len(coords) - 1)
+    last = np.clip(last, 0, len(coords))
+    counts = np.maximum(last - first, 0)
+
+    rows = np.repeat(np.arange(len(target)), counts)
+    cols = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    overlap = (np.minimum(source_edges[cols + 1], target_edges[rows + 1])
+               - np.maximum(source_edges[cols], target_edges[rows]))
+    weights = overlap / (target_edges[rows + 1] - target_edges[rows])
+    keep = weights > 1e-12
+
+    return sp.csr_matrix((weights[keep], (target_order[rows[keep]], order[cols[keep]])),
+                         shape=(len(target), len(source)))
+
+
+def _weights_1d(source: np.ndarray, target: np.ndarray, method: str, latitude: bool) -> sp.csr_matrix:
+    if method == 'bilinear':
+        return _bilinear_weights(source, target)
+    if method == 'nearest':
+        return _nearest_weights(source, target)
+    return _conservative_weights(source, target, latitude=latitude)
+
+
+class Regridder:
+    """
+    Перегридинг прямокутної сітки lat/lon на іншу прямокутну сітку
+
+    Ваги сепарабельні: розріджені матриці по широті (W_lat) і довготі
+    (W_lon), повна матриця - їхній кронекерів добуток, тож шар
+    перераховується як W_lat @ X @ W_lon.T без побудови kron. Ваги для
+    пари сіток обчислюються один раз, кешуються в пам'яті процесу і
+    (опційно) на диску у форматі scipy.sparse .npz.
+
+    Дані обробляються порціями по першому виміру (час), тож в пам'ять
+    завантажується лише chunk_mb джерела - лінивий xarray/dask масив
+    не читається цілком.
+
+    Пропуски (NaN, напр. хмари) не поширюються на сусідів з нульовою
+    вагою: результат нормалізується на вагу валідних клітинок. Для
+    'bilinear' і 'nearest' потрібні всі клітинки з ненульовою вагою
+    (як у xarray.interp), для 'conservative' - щонайменше половина площі.
+    """
+
+    def __init__(self, source_lon: np.ndarray, source_lat: np.ndarray,
+                 target_lon: np.ndarray, target_lat: np.ndarray,
+                 method: str = 'bilinear', weights_dir: Union[str, Path] = None):
+        """
+        Parameters:
+        -----------
+        source_lon, source_lat : np.ndarray
+            1D координати сітки джерела
+        target_lon, target_lat : np.ndarray
+            1D координати цільової сітки
+        method : str
+            'bilinear', 'nearest' або 'conservative'
+        weights_dir : str or Path, optional
+            Каталог дискового кешу ваг (None - лише кеш у пам'яті)
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown regrid method: {method} (expected one of {METHODS})")
+
+        self.method = method
+        self.source_lon = np.asarray(source_lon, dtype=np.float64)
+        self.source_lat = np.asarray(source_lat, dtype=np.float64)
+        self.target_lon = np.asarray(target_lon, dtype=np.float64)
+        self.target_lat = np.asarray(target_lat, dtype=np.float64)
+        self.weights_dir = Path(weights_dir) if weights_dir is not None else None
+
+        self.w_lat, self.w_lon = self._load_or_build()
+        # Частка ваги в межах джерела для кожної цільової клітинки
+        self._coverage = np.outer(
+            np.asarray(self.w_lat.sum(axis=1)).ravel(), np.asarray(self.w_lon.sum(axis=1)).ravel()
+        )
+
+    @property
+    def key(self) -> str:
+        """Ключ пари сіток і методу"""
+        digest = hashlib.sha256(f"v{_WEIGHTS_VERSION}:{self.method}".encode())
+        for coords in (self.source_lon, self.source_lat, self.target_lon, self.target_lat):
+            digest.update(np.ascontiguousarray(coords).tobytes())
+            digest.update(b'|')
+        return digest.hexdigest()[:32]
+
+    def _weight_paths(self, key: str) -> Tuple[Path, Path]:
+        return (self.weights_dir / f"{key}_lat.npz", self.weights_dir / f"{key}_lon.npz")
+
+    def _load_or_build(self) -> Tuple[sp.csr_matrix, sp.csr_matrix]:
+        key = self.key
+        with _CACHE_LOCK:
+            cached = _MEMORY_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        weights = None
+        if self.weights_dir is not None:
+            lat_path, lon_path = self._weight_paths(key)
+            if lat_path.exists() and lon_path.exists():
+                try:
+                    weights = (sp.load_npz(lat_path).tocsr(), sp.load_npz(lon_path).tocsr())
+                    logger.debug(f"Loaded {self.method} regrid weights {key}")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable regrid weights {key}: {e}")
+
+        if weights is None:
+            weights = (
+                _weights_1d(self.source_lat, self.target_lat, self.method, latitude=True),
+                _weights_1d(self.source_lon, self.target_lon, self.method, latitude=False)
+            )
+            logger.debug(f"Computed {self.method} regrid weights {key}")
+            if self.weights_dir is not None:
+                self._save(key, weights)
+
+        with _CACHE_LOCK:
+            _MEMORY_CACHE[key] = weights
+        return weights
+
+    def _save(self, key: str, weights: Tuple[sp.csr_matrix, sp.csr_matrix]):
+        """Атомарно записати ваги на диск"""
+        self.weights_dir.mkdir(parents=True, exist_ok=True)
+        for path, matrix in zip(self._weight_paths(key), weights):
+            tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp.npz")
+            sp.save_npz(tmp_path, matrix)
+            os.replace(tmp_path, path)
+
+    def _apply(self, block: np.ndarray) -> np.ndarray:
+        """W_lat @ X @ W_lon.T для кожного шару блоку (k, lat, lon)"""
+        result = np.empty((len(block), len(self.target_lat), len(self.target_lon)))
+        for i, layer in enumerate(block):
+            result[i] = (self.w_lon @ (self.w_lat @ layer).T).T
+        return result
+
+    def regrid_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Перегридити масив (..., lat, lon)
+
+        Parameters:
+        -----------
+        values : np.ndarray
+            Дані на сітці джерела; останні два виміри - lat, lon
+
+        Returns:
+        --------
+        regridded : np.ndarray
+            Дані на цільовій сітці (float32 для float32 джерела)
+        """
+        values = np.asarray(values)
+        lead_shape = values.shape[:-2]
+        block = values.reshape((-1,) + values.shape[-2:]).astype(np.float64, copy=False)
+
+        valid = np.isfinite(block)
+        if valid.all():
+            coverage = self._coverage
+            result = self._apply(block)
+        else:
+            coverage = self._apply(valid.astype(np.float64))
+            result = self._apply(np.where(valid, block, 0.0))
+
+        required = 0.5 if self.method == 'conservative' else 1 - 1e-6
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(coverage >= required, result / coverage, np.nan)
+
+        dtype = np.float32 if values.dtype == np.float32 else np.float64
+        return result.astype(dtype, copy=False).reshape(lead_shape + result.shape[-2:])
+
+    def regrid_dataarray(self, data: xr.DataArray, chunk_mb: float = 256) -> xr.DataArray:
+        """Перегридити DataArray з вимірами lat/lon порціями по першому іншому виміру"""
+        dims = data.dims
+        data = data.transpose(..., 'lat', 'lon')
+        lead_dims = data.dims[:-2]
+
+        target_shape = tuple(data.sizes[d] for d in lead_dims) + (len(self.target_lat), len(self.target_lon))
+        dtype = np.float32 if data.dtype == np.float32 else np.float64
+        result = np.empty(target_shape, dtype=dtype)
+
+        if lead_dims:
+            slice_bytes = data.isel({lead_dims[0]: 0}).size * 8
+            step = max(1, int(chunk_mb * 1024 ** 2 // max(slice_bytes, 1)))
+            for start in range(0, data.sizes[lead_dims[0]], step):
+                stop = min(start + step, data.sizes[lead_dims[0]])
+                result[start:stop] = self.regrid_array(data.isel({lead_dims[0]: slice(start, stop)}).values)
+        else:
+            result[...] = self.regrid_array(data.values)
+
+        coords = {name: coord for name, coord in data.coords.items()
+                  if 'lat' not in coord.dims and 'lon' not in coord.dims}
+        coords.update({'lat': self.target_lat, 'lon': self.target_lon})
+        regridded = xr.DataArray(result, dims=data.dims, coords=coords, name=data.name, attrs=data.attrs)
+
+        return regridded.transpose(*dims)
+
+    def __call__(self, data: Union[xr.DataArray, xr.Dataset],
+                 chunk_mb: float = 256) -> Union[xr.DataArray, xr.Dataset]:
+        """
+        Перегридити DataArray або Dataset (змінні без lat/lon лишаються як є)
+
+        Parameters:
+        -----------
+        data : xr.DataArray or xr.Dataset
+            Дані з 1D координатами 'lat' і 'lon' сітки джерела
+        chunk_mb : float
+            Обсяг джерела, що завантажується за раз (МБ)
+
+        Returns:
+        --------
+        regridded : xr.DataArray or xr.Dataset
+            Дані на цільовій сітці
+        """
+        if isinstance(data, xr.DataArray):
+            return self.regrid_dataarray(data, chunk_mb)
+
+        variables = {}
+        for name, variable in data.data_vars.items():
+            if 'lat' in variable.dims and 'lon' in variable.dims:
+                variables[name] = self.regrid_dataarray(variable, chunk_mb)
+            else:
+                variables[name] = variable
+        regridded = xr.Dataset(variables, attrs=data.attrs)
+        return regridded.assign_coords(lat=self.target_lat, lon=self.target_lon)
@@ -0,0 +1,173 @@
+"""
+Remote subsetting utilities for Shark Voyager AI project
+Віддалене відкриття гранул NetCDF/HDF5 з вирізанням bbox та змінних
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+logger = logging.getLogger(__name__)
+
+LAT_NAMES = ('lat', 'latitude', 'y')
+LON_NAMES = ('lon', 'longitude', 'x')
+
+
+def _coord_name(ds: xr.Dataset, candidates: Sequence[str]) -> Optional[str]:
+    for name in candidates:
+        if name in ds.coords or name in ds.dims:
+            return name
+    return None
+
+
+def subset_bbox(
+    ds: xr.Dataset,
+    bbox: dict,
+    variables: Optional[Sequence[str]] = None
+) -> xr.Dataset:
+    """
+    Вирізати bbox та потрібні змінні (ліниво, без читання даних)
+
+    Враховує спадний порядок широт (типово для L3 гранул) та довготи
+    у діапазоні 0..360.
+
+    Parameters:
+    -----------
+    ds : xr.Dataset
+        Вхідний dataset (може бути відкритий віддалено)
+    bbox : dict
+        Bounding box з ключами: min_lon, max_lon, min_lat, max_lat
+    variables : list, optional
+        Змінні, які потрібно залишити
+
+    Returns:
+    --------
+    subset : xr.Dataset
+    """
+    if variables:
+        ds = ds[list(variables)]
+
+    lat = _coord_name(ds, LAT_NAMES)
+    lon = _coord_name(ds, LON_NAMES)
+    if lat is None or lon is None:
+        raise ValueError(f"No lat/lon coordinates in dataset: {list(ds.coords)}")
+
+    lats = ds[lat].values
+    if lats[0] > lats[-1]:
+        lat_slice = slice(bbox['max_lat'], bbox['min_lat'])
+    else:
+        lat_slice = slice(bbox['min_lat'], bbox['max_lat'])
+
+    min_lon, max_lon = bbox['min_lon'], bbox['max_lon']
+    if float(ds[lon].max()) > 180 and min_lon < 0:
+        # Довготи 0..360
+        min_lon, max_lon = min_lon % 360, max_lon % 360
+
+    if min_lon <= max_lon:
+        return ds.sel({lat: lat_slice, lon: slice(min_lon, max_lon)})
+
+    # bbox перетинає шов довгот
+    return xr.concat([
+        ds.sel({lat: lat_slice, lon: slice(min_lon, None)}),
+        ds.sel({lat: lat_slice, lon: slice(None, max_lon)})
+    ], dim=lon)
+
+
+def _add_time_from_attrs(ds: xr.Dataset) -> xr.Dataset:
+    """Додати вимір time з атрибуту time_coverage_start (гранули L3m без time)"""
+    if 'time' in ds.dims or 'time_coverage_start' not in ds.attrs:
+        return ds
+    time = pd.to_datetime(ds.attrs['time_coverage_start']).tz_localize(None)
+    return ds.expand_dims(time=[np.datetime64(time, 'ns')])
+
+
+def open_granule_subset(
+    source: Any,
+    bbox: dict,
+    variables: Optional[Sequence[str]] = None,
+    chunks: Optional[dict] = None,
+    engine: Optional[str] = None
+) -> xr.Dataset:
+    """
+    Відкрити гранулу та вирізати bbox до читання даних
+
+    source може бути локальним шляхом, OPeNDAP URL або file-like
+    об'єктом з earthaccess.open: у двох останніх випадках по мережі
+    передаються лише метадані та chunks, що перетинають bbox.
+
+    Parameters:
+    -----------
+    source : str, Path or file-like
+        Гранула
+    bbox : dict
+        Bounding box
+    variables : list, optional
+        Змінні, які потрібно залишити
+    chunks : dict, optional
+        Розбиття dask (за замовчуванням: chunks файлу)
+    engine : str, optional
+        Рушій xarray ('h5netcdf' для file-like, 'netcdf4' для OPeNDAP)
+
+    Returns:
+    --------
+    subset : xr.Dataset
+        Лінивий subset гранули
+    """
+    if engine is None and hasattr(source, 'read'):
+        engine = 'h5netcdf'
+
+    ds = xr.open_dataset(source, engine=engine, chunks={} if chunks is None else chunks)
+    return _add_time_from_attrs(subset_bbox(ds, bbox, variables))
+
+
+def subset_digest(bbox: dict, variables: Optional[Sequence[str]] = None) -> str:
+    """Короткий хеш bbox і змінних, що входить в ім'я subset-у"""
+    payload = json.dumps(
+        {'bbox': {k: float(bbox[k]) for k in sorted(bbox)},
+         'variables': sorted(variables) if variables else None},
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:10]
+
+
+def subset_cache_name(granule_name: str, bbox: dict,
+                      variables: Optional[Sequence[str]] = None) -> str:
+    """
+    Ім'я файлу локального кешу subset-у гранули
+
+    Parameters:
+    -----------
+    granule_name : str
+        Ім'я файлу гранули
+    bbox : dict
+        Bounding box
+    variables : list, optional
+        Змінні subset-у
+
+    Returns:
+    --------
+    name : str
+        '<granule stem>.<hash>.nc'
+    """
+    return f"{Path(granule_name).stem}.{subset_digest(bbox, variables)}.nc"
+
+
+def granule_name(granule: Any) -> str:
+    """Ім'я файлу гранули earthaccess (за першим data link)"""
+    links = granule.data_links()
+    if links:
+        return links[0].rstrip('/').split('/')[-1]
+    return str(granule['meta']['native-id'])
+
+
+def combine_subsets(subsets: List[xr.Dataset]) -> xr.Dataset:
+    """Об'єднати subset-и гранул по координатах (зазвичай по time)"""
+    if len(subsets) == 1:
+        return subsets[0]
+    return xr.combine_by_coords(subsets, combine_attrs='drop_conflicts')
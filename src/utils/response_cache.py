@@ -0,0 +1,388 @@
+"""
+Response cache for Shark Voyager AI project
+Дисковий кеш відповідей API з TTL та LRU-витісненням
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMissError(LookupError):
+    """Запис відсутній у кеші, а мережа недоступна (offline режим)"""
+
+
+def _normalize(value: Any) -> Any:
+    """Привести параметри запиту до канонічного вигляду для ключа"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return repr(round(value, 9))
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class ResponseCache:
+    """
+    Content-addressed дисковий кеш відповідей
+
+    Ключ - SHA-256 від назви сервісу та нормалізованих параметрів запиту
+    (bbox, вид, діапазон дат, offset тощо). Записи старші за TTL
+    вважаються застарілими; при перевищенні ліміту розміру видаляються
+    записи, до яких найдовше не звертались (LRU). Недокачані файли
+    get_or_download ('.download.part') теж входять у ліміт.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "./data/cache/responses",
+        ttl_hours: Optional[float] = 168,
+        max_size_mb: Optional[float] = 2048,
+        offline: bool = False
+    ):
+        """
+        Parameters:
+        -----------
+        cache_dir : str
+            Директорія кешу
+        ttl_hours : float, optional
+            Час життя запису в годинах (None - без обмеження)
+        max_size_mb : float, optional
+            Максимальний розмір кешу в МБ (None - без обмеження)
+        offline : bool
+            Використовувати лише кеш, без звернень до мережі
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl_hours * 3600 if ttl_hours is not None else None
+        self.max_size = int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None
+        self.offline = offline
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._total_size = sum(f.stat().st_size for f in self.cache_dir.glob('*/*.bin'))
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """
+        Ключ кешу для запиту
+
+        Parameters:
+        -----------
+        namespace : str
+            Назва сервісу/ендпоінту (напр., 'gbif_search')
+        params : dict
+            Параметри запиту
+
+        Returns:
+        --------
+        key : str
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            {'namespace': namespace, 'params': _normalize(params)},
+            sort_keys=True, separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def path(self, namespace: str, params: Dict[str, Any]) -> Optional[Path]:
+        """
+        Шлях до файлу запису (якщо він є в кеші)
+
+        Returns:
+        --------
+        path : Path or None
+        """
+        path = self._entry_path(self.make_key(namespace, params))
+        return path if path.exists() else None
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        """Lock одного ключа: один файл не качається двома потоками одночасно"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _is_fresh(self, path: Path) -> bool:
+        if self.ttl is None:
+            return True
+        return (time.time() - path.stat().st_mtime) <= self.ttl
+
+    def _touch(self, path: Path):
+        """Оновити час доступу (для LRU), не змінюючи час запису (для TTL)"""
+        stat = path.stat()
+        os.utime(path, (time.time(), stat.st_mtime))
+
+    def _lookup(self, path: Path) -> bool:
+        """Перевірити наявність актуального запису (викликати під lock)"""
+        if not path.exists():
+            self.misses += 1
+            return False
+
+        if not self._is_fresh(path) and not self.offline:
+            self.expired += 1
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        self._touch(path)
+        return True
+
+    def _commit(self, tmp_path: Path, path: Path):
+        """Атомарно перемістити тимчасовий файл у кеш (викликати під lock)"""
+        old_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+        self._total_size += path.stat().st_size - old_size
+        self._evict()
+
+    def get(self, namespace: str, params: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Отримати запис з кешу
+
+        У offline режимі застарілі записи теж повертаються.
+
+        Returns:
+        --------
+        data : bytes or None
+        """
+        path = self._entry_path(self.make_key(namespace, params))
+
+        with self._lock:
+            if not self._lookup(path):
+                return None
+            return path.read_bytes()
+
+    def set(self, namespace: str, params: Dict[str, Any], data: bytes) -> Path:
+        """
+        Записати дані в кеш
+
+        Returns:
+        --------
+        path : Path
+            Шлях до файлу запису
+        """
+        path = self._entry_path(self.make_key(namespace, params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Атомарний запис
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+
+        with self._lock:
+            self._commit(tmp_path, path)
+
+        return path
+
+    def get_or_download(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        download: Callable[[Path], Any]
+    ) -> Path:
+        """
+        Повернути шлях до закешованого файлу або завантажити його в кеш
+
+        На відміну від get_or_fetch, дані не проходять через пам'ять:
+        download сам записує файл (напр., через utils.downloader.download_file).
+
+        Parameters:
+        -----------
+        namespace : str
+            Назва сервісу
+        params : dict
+            Параметри запиту
+        download : callable
+            Функція download(path), що записує файл за вказаним шляхом
+
+        Returns:
+        --------
+        path : Path
+            Шлях до файлу в кеші
+
+        Raises:
+        -------
+        CacheMissError: у offline режимі, якщо запису немає в кеші
+        """
+        key = self.make_key(namespace, params)
+        path = self._entry_path(key)
+
+        # Сталий тимчасовий шлях: '.download.part', залишений обірваним
+        # запуском, підхоплюється наступним (HTTP Range). Паралельні
+        # завантаження одного ключа серіалізуються lock-ом ключа.
+        with self._key_lock(key):
+            with self._lock:
+                if self._lookup(path):
+                    return path
+
+            if self.offline:
+                raise CacheMissError(f"Offline mode: no cached file for {namespace} {params}")
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.download')
+            download(tmp_path)
+
+            with self._lock:
+                self._commit(tmp_path, path)
+
+        return path
+
+    def _partial_entries(self) -> list:
+        """
+        Недокачані файли, які зараз ніхто не завантажує (викликати під lock)
+
+        Returns:
+        --------
+        entries : list
+            (mtime, розмір з '.part.meta', [файли])
+        """
+        entries = []
+        for part in self.cache_dir.glob('*/*.download.part'):
+            key_lock = self._key_locks.get(part.name.split('.')[0])
+            if key_lock is not None and key_lock.locked():
+                continue
+            meta = part.with_name(part.name + '.meta')
+            files = [part, meta] if meta.exists() else [part]
+            try:
+                entries.append((part.stat().st_mtime, sum(f.stat().st_size for f in files), files))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _evict(self):
+        """
+        Видалити найдавніше використані записи, доки кеш не влізе в ліміт
+
+        Покинуті '.download.part' рахуються разом із записами і
+        видаляються в тому ж LRU-порядку (за часом останнього запису).
+        """
+        if self.max_size is None:
+            return
+
+        partials = self._partial_entries()
+        partial_size = sum(size for _, size, _ in partials)
+        if self._total_size + partial_size <= self.max_size:
+            return
+
+        entries = sorted(
+            [(f.stat().st_atime, f.stat().st_size, [f]) for f in self.cache_dir.glob('*/*.bin')]
+            + partials,
+            key=lambda entry: entry[0]
+        )
+
+        for _, size, files in entries:
+            if self._total_size + partial_size <= self.max_size:
+                break
+            for f in files:
+                f.unlink(missing_ok=True)
+            if files[0].suffix == '.bin':
+                self._total_size -= size
+            else:
+                partial_size -= size
+            self.evictions += 1
+
+    def get_or_fetch(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        fetch: Callable[[], bytes]
+    ) -> bytes:
+        """
+        Повернути дані з кешу або завантажити та закешувати
+
+        Parameters:
+        -----------
+        namespace : str
+            Назва сервісу
+        params : dict
+            Параметри запиту
+        fetch : callable
+            Функція без аргументів, що повертає bytes
+
+        Returns:
+        --------
+        data : bytes
+
+        Raises:
+        -------
+        CacheMissError: у offline режимі, якщо запису немає в кеші
+        """
+        data = self.get(namespace, params)
+        if data is not None:
+            return data
+
+        if self.offline:
+            raise CacheMissError(f"Offline mode: no cached response for {namespace} {params}")
+
+        data = fetch()
+        self.set(namespace, params, data)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Лічильники кешу
+
+        Returns:
+        --------
+        stats : dict
+            hits, misses, expired, evictions, size_mb
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'size_mb': round(self._total_size / (1024 * 1024), 2)
+        }
+
+
+def cached_json(
+    cache: Optional[ResponseCache],
+    namespace: str,
+    params: Dict[str, Any],
+    fetch: Callable[[], Any]
+) -> Any:
+    """
+    Закешувати JSON-відповідь (або просто викликати fetch, якщо кешу немає)
+
+    Parameters:
+    -----------
+    cache : ResponseCache or None
+        Кеш
+    namespace : str
+        Назва сервісу
+    params : dict
+        Параметри запиту
+    fetch : callable
+        Функція без аргументів, що повертає JSON-сумісний об'єкт
+
+    Returns:
+    --------
+    data : any
+        Розпарсена JSON-відповідь
+    """
+    if cache is None:
+        return fetch()
+
+    raw = cache.get_or_fetch(
+        namespace, params,
+        lambda: json.dumps(fetch(), default=str).encode('utf-8')
+    )
+    return json.loads(raw)
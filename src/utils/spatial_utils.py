@@ -8,11 +8,25 @@ import xarray as xr
 import rasterio
 from rasterio.transform import from_bounds
 from rasterio.warp import reproject, Resampling
+import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
 from scipy.spatial import cKDTree
+from scipy.ndimage import distance_transform_edt
+import shapely
+from shapely import STRtree
 from typing import Tuple, Union, List
 import rioxarray
+import logging
+
+from .regrid import Regridder, METHODS as REGRID_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Середній радіус Землі (км)
+EARTH_RADIUS_KM = 6371.0
+
+# Довжина градуса меридіана (км)
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
 
 
 def create_target_grid(
@@ -64,11 +78,17 @@ def create_target_grid(
 def resample_to_grid(
     data: Union[xr.DataArray, xr.Dataset],
     target_grid: Tuple[np.ndarray, np.ndarray],
-    method: str = 'bilinear'
+    method: str = 'bilinear',
+    weights_dir: str = None,
+    chunk_mb: float = 256
 ) -> xr.DataArray:
     """
     Ресемплювати дані до цільової сітки
 
+    'bilinear', 'nearest' і 'conservative' виконуються через Regridder:
+    розріджені ваги рахуються один раз для пари сіток і застосовуються
+    порціями по часу. 'cubic' - через xarray.interp.
+
     Parameters:
     -----------
     data : xr.DataArray or xr.Dataset
@@ -76,7 +96,11 @@ def resample_to_grid(
     target_grid : tuple
         Кортеж (lon_grid, lat_grid) цільової сітки
     method : str
-        Метод інтерполяції: 'bilinear', 'nearest', 'cubic'
+        Метод інтерполяції: 'bilinear', 'nearest', 'conservative', 'cubic'
+    weights_dir : str, optional
+        Каталог дискового кешу ваг
+    chunk_mb : float
+        Обсяг джерела, що завантажується за раз (МБ)
 
     Returns:
     --------
@@ -91,6 +115,11 @@ def resample_to_grid(
     if 'lat' not in data.coords and 'latitude' in data.coords:
         data = data.rename({'latitude': 'lat'})
 
+    if method in REGRID_METHODS:
+        regridder = Regridder(data['lon'].values, data['lat'].values, lon_grid[0, :], lat_grid[:, 0],
+                              method=method, weights_dir=weights_dir)
+        return regridder(data, chunk_mb=chunk_mb)
+
     # Інтерполяція
     resampled = data.interp(
         lon=lon_grid[0, :],
@@ -101,10 +130,466 @@ def resample_to_grid(
     return resampled
 
 
+def haversine_km(
+    lon1: Union[float, np.ndarray],
+    lat1: Union[float, np.ndarray],
+    lon2: Union[float, np.ndarray],
+    lat2: Union[float, np.ndarray]
+) -> np.ndarray:
+    """
+    Відстань по великому колу між точками (км)
+
+    Parameters:
+    -----------
+    lon1, lat1, lon2, lat2 : float or np.ndarray
+        Координати у градусах (масиви поелементно, з broadcasting)
+
+    Returns:
+    --------
+    distance : np.ndarray
+        Відстань у кілометрах
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(v) for v in (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def unit_vectors(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """Одиничні вектори (..., 3) на сфері для координат у градусах"""
+    lon, lat = np.radians(lon), np.radians(lat)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def unit_vectors_to_lonlat(xyz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Координати (градуси) для векторів (..., 3), не обов'язково одиничних"""
+    lon = np.degrees(np.arctan2(xyz[..., 1], xyz[..., 0]))
+    lat = np.degrees(np.arctan2(xyz[..., 2], np.hypot(xyz[..., 0], xyz[..., 1])))
+    return lon, lat
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Довжина хорди одиничної сфери -> відстань по великому колу (км)"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def km_to_chord(distance_km: float) -> float:
+    """Відстань по великому колу (км) -> довжина хорди одиничної сфери"""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def _source_coordinates(geometries: gpd.GeoSeries, spacing: float = None) -> np.ndarray:
+    """
+    Координати джерел відстані (N, 2)
+
+    Точки беруться як є; лінії та полігони - їхні вершини, а якщо задано
+    spacing (градуси), ребра дробляться до цього кроку вздовж дуг великого
+    кола (_split_long_arcs) - та ж модель ребра, що й у 'segments'.
+    """
+    if spacing is None:
+        return shapely.get_coordinates(geometries.values)
+
+    starts, ends = _split_long_arcs(*_segments(geometries))
+    samples, _ = _segment_samples(starts, ends, spacing)
+    return samples
+
+
+def _latitude_bands(lats: np.ndarray, max_ratio: float = 1.1) -> List[Tuple[int, int]]:
+    """
+    Розбити рядки сітки на смуги, в межах яких крок по довготі (км)
+    змінюється не більше ніж у max_ratio разів
+    """
+    cos_lat = np.maximum(np.cos(np.radians(lats)), 0.01)
+    bands = []
+    start = 0
+    for row in range(1, len(lats) + 1):
+        if row == len(lats):
+            bands.append((start, row))
+            break
+        band = cos_lat[start:row + 1]
+        if band.max() / band.min() > max_ratio:
+            bands.append((start, row))
+            start = row
+    return bands
+
+
+# Зсуви (рядок, стовпець), з яких беруться кандидати для геодезичної поправки EDT:
+# сусіди на 1, 4 і 16 клітинок ловлять джерела, які площинна метрика смуги
+# віддала іншій клітинці Вороного (далекі джерела на іншій широті)
+_EDT_STENCIL = ((0, 0),) + tuple(
+    (k * dr, k * dc) for k in (1, 4, 16) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+)
+
+
+def _distance_raster_edt(
+    source_coords: np.ndarray,
+    lon_grid: np.ndarray,
+    lat_grid: np.ndarray,
+    max_distance: float = None
+) -> np.ndarray:
+    """
+    Растр відстаней через евклідове перетворення відстані (EDT) - наближено
+
+    Джерела растеризуються на сітку, розширену на max_distance (щоб
+    врахувати джерела за межами bbox). Для кожної широтної смуги
+    distance_transform_edt з кроком у км на широті смуги знаходить
+    найближчу клітинку-джерело за лінійний час, після чого відстань
+    рахується по великому колу до джерел цієї клітинки та клітинок
+    _EDT_STENCIL.
+
+    Результат не точний: у клітинці лишається одне джерело, а найближче
+    джерело може лежати в клітинці, яку EDT не вибрав. Похибка - до
+    ~1 діагоналі клітинки сітки (на 0.1° з max_distance=500 - до ~12 км
+    за будь-якої широти), тож відносна похибка велика на малих відстанях.
+    Без max_distance кожна смуга рахується по всій розширеній сітці
+    (повільніше, похибка на далеких джерелах більша - до ~20 км).
+    Точні відстані - _distance_raster_geodesic.
+    """
+    lon0, lat0 = lon_grid[0, 0], lat_grid[0, 0]
+    dlon = lon_grid[0, 1] - lon0
+    dlat = lat_grid[1, 0] - lat0
+    n_rows, n_cols = lon_grid.shape
+
+    rows = np.rint((source_coords[:, 1] - lat0) / dlat).astype(np.int64)
+    cols = np.rint((source_coords[:, 0] - lon0) / dlon).astype(np.int64)
+
+    # Розширення сітки, щоб джерела поза bbox теж впливали на відстані
+    row_min, row_max = min(0, rows.min()), max(n_rows - 1, rows.max())
+    col_min, col_max = min(0, cols.min()), max(n_cols - 1, cols.max())
+    pad_rows = row_max - row_min + 1
+    if max_distance is not None:
+        max_cos = np.cos(np.radians(min(np.abs(lat_grid).max(), 89.0)))
+        pad_rows = int(np.ceil(max_distance / (abs(dlat) * KM_PER_DEGREE))) + 1
+        pad_cols = int(np.ceil(max_distance / (abs(dlon) * KM_PER_DEGREE * max_cos))) + 1
+        row_min, row_max = max(row_min, -pad_rows), min(row_max, n_rows - 1 + pad_rows)
+        col_min, col_max = max(col_min, -pad_cols), min(col_max, n_cols - 1 + pad_cols)
+
+    inside = (rows >= row_min) & (rows <= row_max) & (cols >= col_min) & (cols <= col_max)
+    if not inside.any():
+        return np.full(lon_grid.shape, np.inf if max_distance is None else float(max_distance))
+
+    shape = (row_max - row_min + 1, col_max - col_min + 1)
+    rows, cols = rows[inside] - row_min, cols[inside] - col_min
+    src = source_coords[inside]
+
+    # Номер джерела в кожній клітинці-джерелі (-1 - немає джерела).
+    # З кількох джерел у клітинці лишається найближче до її центру.
+    offset = (((src[:, 0] - lon0) / dlon - (cols + col_min)) ** 2
+              + ((src[:, 1] - lat0) / dlat - (rows + row_min)) ** 2)
+    order = np.argsort(-offset, kind='stable')
+    source_id = np.full(shape, -1, dtype=np.int32)
+    source_id[rows[order], cols[order]] = order.astype(np.int32)
+    del rows, cols, offset, order
+
+    # Лишити по одному джерелу на клітинку
+    occupied = source_id >= 0
+    src_xyz = unit_vectors(*src[source_id[occupied]].T)
+    source_id[occupied] = np.arange(occupied.sum(), dtype=np.int32)
+    del src, occupied
+    distances_km = np.empty(lon_grid.shape)
+
+    # Без max_distance кожна смуга бачить усю розширену сітку (pad_rows - її висота)
+    for band_start, band_stop in _latitude_bands(lat_grid[:, 0]):
+        # Рядки розширеної сітки, що можуть містити найближче джерело смуги
+        top = max(band_start - row_min - pad_rows, 0)
+        bottom = min(band_stop - row_min + pad_rows, shape[0])
+        band_sources = source_id[top:bottom]
+        if not (band_sources >= 0).any():
+            distances_km[band_start:band_stop] = np.inf
+            continue
+
+        mid_lat = lat_grid[(band_start + band_stop - 1) // 2, 0]
+        sampling = (abs(dlat) * KM_PER_DEGREE,
+                    abs(dlon) * KM_PER_DEGREE * max(np.cos(np.radians(mid_lat)), 0.01))
+        near_rows, near_cols = distance_transform_edt(
+            band_sources < 0, sampling=sampling, return_distances=False, return_indices=True
+        )
+
+        # Геодезична поправка: найближче по великому колу з джерел,
+        # знайдених для клітинки та клітинок _EDT_STENCIL. Порівнюються скалярні
+        # добутки одиничних векторів, arcsin рахується один раз; блоки
+        # рядків обмежують пам'ять.
+        block = max(1, 2 ** 18 // n_cols)
+        for start in range(band_start, band_stop, block):
+            stop = min(start + block, band_stop)
+            cell_xyz = unit_vectors(lon_grid[start:stop], lat_grid[start:stop])
+            block_rows = np.arange(start, stop)[:, None] - row_min - top
+            block_cols = np.arange(n_cols)[None, :] - col_min
+
+            best = np.full((stop - start, n_cols), -1.0)
+            for dr, dc in _EDT_STENCIL:
+                r = np.clip(block_rows + dr, 0, band_sources.shape[0] - 1)
+                c = np.clip(block_cols + dc, 0, shape[1] - 1)
+                nearest = src_xyz[band_sources[near_rows[r, c], near_cols[r, c]]]
+                np.maximum(best, np.einsum('ijk,ijk->ij', cell_xyz, nearest), out=best)
+
+            # Хорда -> дуга великого кола
+            distances_km[start:stop] = chord_to_km(np.sqrt(np.clip(2 - 2 * best, 0, 4)))
+
+    if max_distance is not None:
+        distances_km = np.minimum(distances_km, max_distance)
+
+    return distances_km
+
+
+def _distance_raster_geodesic(
+    source_coords: np.ndarray,
+    lon_grid: np.ndarray,
+    lat_grid: np.ndarray,
+    max_distance: float = None
+) -> np.ndarray:
+    """
+    Растр відстаней по великому колу через cKDTree одиничних векторів
+
+    Хорда між одиничними векторами монотонна щодо дуги великого кола,
+    тож найближчий сусід за хордою - точний геодезичний найближчий
+    (на сфері), включно з переходом через 180° та біля полюсів.
+    """
+    tree = cKDTree(unit_vectors(source_coords[:, 0], source_coords[:, 1]))
+    upper_bound = np.inf if max_distance is None else km_to_chord(max_distance) * (1 + 1e-9)
+
+    distances_km = np.empty(lon_grid.shape)
+    n_rows, n_cols = lon_grid.shape
+    block = max(1, 2 ** 18 // n_cols)
+    for start in range(0, n_rows, block):
+        stop = min(start + block, n_rows)
+        cell_xyz = unit_vectors(lon_grid[start:stop], lat_grid[start:stop]).reshape(-1, 3)
+        chord, _ = tree.query(cell_xyz, distance_upper_bound=upper_bound)
+        distances_km[start:stop] = chord_to_km(chord).reshape(stop - start, n_cols)
+
+    if max_distance is not None:
+        distances_km = np.minimum(distances_km, max_distance)
+
+    return distances_km
+
+
+def _segments(geometries: gpd.GeoSeries) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Відрізки геометрій: масиви початків і кінців (N, 2)
+
+    Частини Multi* та межі полігонів розбиваються на окремі лінії;
+    точки стають відрізками нульової довжини.
+    """
+    parts = shapely.get_parts(geometries.values)
+    polygonal = shapely.get_type_id(parts) == 3
+    if polygonal.any():
+        rings = shapely.get_parts(shapely.boundary(parts[polygonal]))
+        parts = np.concatenate([parts[~polygonal], rings])
+
+    coords, index = shapely.get_coordinates(parts, return_index=True)
+    same_part = index[1:] == index[:-1]
+    single = np.bincount(index, minlength=len(parts))[index] == 1
+
+    starts = np.concatenate([coords[:-1][same_part], coords[single]])
+    ends = np.concatenate([coords[1:][same_part], coords[single]])
+    return starts, ends
+
+
+def _point_arc_km(p_xyz: np.ndarray, a_xyz: np.ndarray, b_xyz: np.ndarray) -> np.ndarray:
+    """
+    Відстань по великому колу від точок до дуг AB (км), поелементно
+
+    Якщо перпендикуляр з точки на велике коло AB потрапляє на дугу -
+    cross-track відстань, інакше - до ближчого кінця дуги.
+    """
+    normal = np.cross(a_xyz, b_xyz)
+    norm = np.linalg.norm(normal, axis=-1)
+    degenerate = norm < 1e-12
+    normal /= np.where(degenerate, 1.0, norm)[:, None]
+
+    on_arc = (~degenerate
+              & (np.einsum('ij,ij->i', np.cross(a_xyz, p_xyz), normal) >= 0)
+              & (np.einsum('ij,ij->i', np.cross(p_xyz, b_xyz), normal) >= 0))
+    cross_track = EARTH_RADIUS_KM * np.arcsin(np.clip(np.abs(np.einsum('ij,ij->i', p_xyz, normal)), 0, 1))
+    to_end = chord_to_km(np.minimum(np.linalg.norm(p_xyz - a_xyz, axis=-1),
+                                    np.linalg.norm(p_xyz - b_xyz, axis=-1)))
+
+    return np.where(on_arc, cross_track, to_end)
+
+
+def _arc_offset_km(start_xyz: np.ndarray, end_xyz: np.ndarray,
+                   starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Відхилення дуги великого кола від прямого відрізка в lon/lat (у середині, км)"""
+    arc_mid_lon, arc_mid_lat = unit_vectors_to_lonlat(start_xyz + end_xyz)
+    return haversine_km(arc_mid_lon, arc_mid_lat, *((starts + ends) / 2).T)
+
+
+def _split_long_arcs(starts: np.ndarray, ends: np.ndarray,
+                     tolerance_km: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Розбити відрізки, дуга яких відходить від прямої в lon/lat більше
+    за tolerance_km, на частини тієї ж дуги (відхилення ~ довжина^2)
+    """
+    start_xyz = unit_vectors(starts[:, 0], starts[:, 1])
+    end_xyz = unit_vectors(ends[:, 0], ends[:, 1])
+    offset = _arc_offset_km(start_xyz, end_xyz, starts, ends)
+    n = np.ceil(np.sqrt(np.maximum(offset, 0) / tolerance_km)).astype(np.int64)
+    n = np.maximum(n, 1)
+    if (n == 1).all():
+        return starts, ends
+
+    # Точки на дузі: нормовані лінійні комбінації кінців
+    segment = np.repeat(np.arange(len(starts)), n + 1)
+    position = np.arange(len(segment)) - np.repeat(np.cumsum(n + 1) - (n + 1), n + 1)
+    t = (position / n[segment])[:, None]
+    lon, lat = unit_vectors_to_lonlat((1 - t) * start_xyz[segment] + t * end_xyz[segment])
+    points = np.column_stack([lon, lat])
+
+    last = np.cumsum(n + 1) - 1
+    is_start = np.ones(len(segment), dtype=bool)
+    is_start[last] = False
+    return points[is_start], points[np.flatnonzero(is_start) + 1]
+
+
+def _local_metric_margin(lat: np.ndarray, distance_km: np.ndarray) -> np.ndarray:
+    """
+    Відносна різниця між відстанню по великому колу і локальною
+    рівнопромiжною (км) на відстанях до distance_km від широти lat:
+    зміна cos(lat) у межах радіуса плюс кривина сфери (з запасом)
+    """
+    angle = np.asarray(distance_km) / EARTH_RADIUS_KM
+    reach = np.minimum(np.abs(lat) + np.degrees(angle), 89.0)
+    return angle * np.tan(np.radians(reach)) + angle ** 2
+
+
+def _segment_samples(starts: np.ndarray, ends: np.ndarray, spacing: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Точки вздовж відрізків з кроком не більше spacing (включно з кінцями)
+
+    Returns:
+    --------
+    samples : np.ndarray
+        Координати точок (M, 2)
+    segment : np.ndarray
+        Номер відрізка для кожної точки
+    """
+    delta = ends - starts
+    n = np.ceil(np.hypot(delta[:, 0], delta[:, 1]) / spacing).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(starts)), n)
+    position = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    t = position / np.maximum(n - 1, 1)[segment]
+    return starts[segment] + t[:, None] * delta[segment], segment
+
+
+def _distance_raster_segments(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    lon_grid: np.ndarray,
+    lat_grid: np.ndarray,
+    max_distance: float = None
+) -> np.ndarray:
+    """
+    Растр відстаней до відрізків через STRtree
+
+    Відстань - по великому колу до дуг між сусідніми вершинами
+    (_point_arc_km). Пошук кандидатів іде у площині: для кожної
+    широтної смуги відрізки індексуються в просторі, де довгота стиснута
+    на cos(lat) смуги (ratio = scale / cos(lat) <= 1.1 між ним і
+    локальними км клітинки). Точки вздовж відрізків (cKDTree) дають
+    верхню межу відстані - до дуги найближчої точки - і відкидають
+    клітинки, далі за max_distance. Радіус пошуку STRtree розширюється
+    на різницю між локальною метрикою і великим колом
+    (_local_metric_margin) та на відхилення дуги від прямого відрізка в
+    lon/lat (довгі дуги попередньо діляться, _split_long_arcs), тож
+    результат не залежить від кроку точок.
+    """
+    lats = lat_grid[:, 0]
+    n_cols = lon_grid.shape[1]
+    distances_km = np.full(lon_grid.shape, np.inf)
+
+    dlon = abs(lon_grid[0, 1] - lon_grid[0, 0])
+    dlat = abs(lats[1] - lats[0])
+
+    # Довгі дуги - на частини, щоб пряма в lon/lat ледь відходила від дуги
+    starts, ends = _split_long_arcs(starts, ends)
+    seg_lat_min = np.minimum(starts[:, 1], ends[:, 1])
+    seg_lat_max = np.maximum(starts[:, 1], ends[:, 1])
+    pad = np.inf if max_distance is None else max_distance / KM_PER_DEGREE
+
+    start_xyz = unit_vectors(starts[:, 0], starts[:, 1])
+    end_xyz = unit_vectors(ends[:, 0], ends[:, 1])
+    arc_offset_km = _arc_offset_km(start_xyz, end_xyz, starts, ends)
+
+    for band_start, band_stop in _latitude_bands(lats):
+        band_lats = lats[band_start:band_stop]
+        scale = np.maximum(np.cos(np.radians(band_lats)), 0.01).max()
+
+        # Відрізки, що можуть бути ближчими за max_distance до смуги
+        in_reach = ((seg_lat_max >= band_lats.min() - pad)
+                    & (seg_lat_min <= band_lats.max() + pad))
+        if not in_reach.any():
+            continue
+        in_reach = np.flatnonzero(in_reach)
+        band_starts = starts[in_reach] * [scale, 1.0]
+        band_ends = ends[in_reach] * [scale, 1.0]
+        band_offset_km = 2 * arc_offset_km[in_reach].max()
+        tree = STRtree(shapely.linestrings(np.stack([band_starts, band_ends], axis=1)))
+
+        # Кожна точка відрізка не далі spacing / 2 від найближчої точки вибірки
+        spacing = min(dlon * scale, dlat)
+        samples, sample_segment = _segment_samples(band_starts, band_ends, spacing)
+        sample_tree = cKDTree(samples)
+
+        rows_per_block = max(1, 2 ** 16 // n_cols)
+        for start in range(band_start, band_stop, rows_per_block):
+            stop = min(start + rows_per_block, band_stop)
+            cell_lon = lon_grid[start:stop].ravel()
+            cell_lat = lat_grid[start:stop].ravel()
+            ratio = scale / np.maximum(np.cos(np.radians(cell_lat)), 0.01)
+
+            # Локальні км не менші за (d - spacing / 2) * KM_PER_DEGREE / ratio,
+            # велике коло - не менше за локальні км / (1 + margin) - дуга
+            upper_bound = np.inf
+            if max_distance is not None:
+                reach_km = (max_distance + band_offset_km) * (
+                    1 + _local_metric_margin(np.abs(cell_lat).max(), max_distance))
+                upper_bound = reach_km / KM_PER_DEGREE * ratio.max() + spacing
+            nearest, sample = sample_tree.query(
+                np.column_stack([cell_lon * scale, cell_lat]), distance_upper_bound=upper_bound
+            )
+            cell_idx = np.flatnonzero(np.isfinite(nearest))
+            if max_distance is not None:
+                lower_km = ((nearest[cell_idx] - spacing / 2) * KM_PER_DEGREE / ratio[cell_idx]
+                            / (1 + _local_metric_margin(cell_lat[cell_idx], max_distance))
+                            - band_offset_km)
+                cell_idx = cell_idx[lower_km <= max_distance]
+            if len(cell_idx) == 0:
+                continue
+            cell_xyz = unit_vectors(cell_lon, cell_lat)
+
+            # Верхня межа: відстань до дуги найближчої точки
+            segment = in_reach[sample_segment[sample[cell_idx]]]
+            bound_km = _point_arc_km(cell_xyz[cell_idx], start_xyz[segment], end_xyz[segment])
+            if max_distance is not None:
+                bound_km = np.minimum(bound_km, max_distance)
+
+            # Усі відрізки, що можуть бути ближчими за межу
+            reach_km = (bound_km + band_offset_km) * (
+                1 + _local_metric_margin(cell_lat[cell_idx], bound_km))
+            radius = reach_km / KM_PER_DEGREE * ratio[cell_idx] * (1 + 1e-9) + 1e-12
+            cells = shapely.points(cell_lon[cell_idx] * scale, cell_lat[cell_idx])
+            pair_cell, pair_seg = tree.query(cells, predicate='dwithin', distance=radius)
+            cell = cell_idx[pair_cell]
+            pair_seg = in_reach[pair_seg]
+
+            pair_km = _point_arc_km(cell_xyz[cell], start_xyz[pair_seg], end_xyz[pair_seg])
+            block_km = np.full(cell_lon.size, np.inf)
+            block_km[cell_idx] = bound_km
+            np.minimum.at(block_km, cell, pair_km)
+            distances_km[start:stop] = block_km.reshape(stop - start, n_cols)
+
+    if max_distance is not None:
+        distances_km = np.minimum(distances_km, max_distance)
+
+    return distances_km
+
+
 def calculate_distance_raster(
     points: gpd.GeoDataFrame,
     target_grid: Tuple[np.ndarray, np.ndarray],
-    max_distance: float = None
+    max_distance: float = None,
+    method: str = 'kdtree'
 ) -> np.ndarray:
     """
     Розрахувати растр відстаней до найближчої точки
@@ -112,11 +597,23 @@ def calculate_distance_raster(
     Parameters:
     -----------
     points : gpd.GeoDataFrame
-        GeoDataFrame з точками
+        GeoDataFrame з точками (для 'edt' також лінії та полігони)
     target_grid : tuple
         Кортеж (lon_grid, lat_grid)
     max_distance : float, optional
         Максимальна відстань (км). Значення більше будуть обмежені.
+    method : str
+        'kdtree' - cKDTree по вершинах, відстань у градусах x 111 км;
+        'edt' - растеризація джерел і distance transform з поправкою
+        по великому колу; наближений: похибка до ~1 діагоналі клітинки
+        сітки (на 0.1° - до ~12 км), без max_distance більша. Пам'ять і
+        час 'edt' залежать від розміру сітки, а не від кількості вершин,
+        тож він значно швидший на дрібних сітках і довгих лініях;
+        'geodesic' - cKDTree одиничних векторів: точна відстань по
+        великому колу, коректна через 180°;
+        'segments' - STRtree по відрізках ліній: відстань по великому
+        колу до самих відрізків (дуг між вершинами), а не до вершин, без
+        дроблення ліній.
 
     Returns:
     --------
@@ -125,8 +622,27 @@ def calculate_distance_raster(
     """
     lon_grid, lat_grid = target_grid
 
-    # Отримати координати точок
-    point_coords = np.array([(pt.x, pt.y) for pt in points.geometry])
+    if method == 'segments':
+        starts, ends = _segments(points.geometry)
+        if len(starts) == 0:
+            raise ValueError("No source geometries for distance raster")
+        return _distance_raster_segments(starts, ends, lon_grid, lat_grid, max_distance)
+
+    if method in ('edt', 'geodesic'):
+        # Сегменти дробляться до кроку сітки, щоб лінія не мала пропусків
+        spacing = min(abs(lon_grid[0, 1] - lon_grid[0, 0]), abs(lat_grid[1, 0] - lat_grid[0, 0]))
+        source_coords = _source_coordinates(points.geometry, spacing)
+        if len(source_coords) == 0:
+            raise ValueError("No source geometries for distance raster")
+        if method == 'edt':
+            return _distance_raster_edt(source_coords, lon_grid, lat_grid, max_distance)
+        return _distance_raster_geodesic(source_coords, lon_grid, lat_grid, max_distance)
+
+    if method != 'kdtree':
+        raise ValueError(f"Unknown distance method: {method}")
+
+    # Отримати координати точок (вершини для ліній)
+    point_coords = _source_coordinates(points.geometry)
 
     # Створити дерево KDTree для швидкого пошуку
     tree = cKDTree(point_coords)
@@ -151,6 +667,126 @@ def calculate_distance_raster(
     return distance_raster
 
 
+def _gaussian_fft(values: np.ndarray, sigma: np.ndarray, axis: int, period: int = None) -> np.ndarray:
+    """
+    Згладжування гаусовим ядром уздовж осі через FFT
+
+    Ядро задається аналітично у частотній області, тож sigma (у
+    клітинках) може бути масивом, що транслюється на спектр - напр.,
+    своя ширина для кожного рядка. Без period масив доповнюється
+    нулями на 4 sigma, щоб уникнути циклічного загортання; з period
+    згортка циклічна (глобальна сітка по довготі).
+    """
+    from scipy import fft
+
+    size = values.shape[axis]
+    if period is not None:
+        n = period
+    else:
+        n = fft.next_fast_len(size + min(int(np.ceil(4 * np.max(sigma))), size) + 1, real=True)
+
+    spectrum = fft.rfft(values, n=n, axis=axis)
+    freq = fft.rfftfreq(n)
+    shape = [1] * values.ndim
+    shape[axis] = freq.size
+    spectrum *= np.exp(-2 * (np.pi * np.asarray(sigma) * freq.reshape(shape)) ** 2)
+
+    smoothed = fft.irfft(spectrum, n=n, axis=axis)
+    return np.take(smoothed, np.arange(size), axis=axis)
+
+
+def kernel_density_raster(
+    points: gpd.GeoDataFrame,
+    target_grid: Tuple[np.ndarray, np.ndarray],
+    bandwidth_km: float = 50.0,
+    groups: np.ndarray = None,
+    n_groups: int = None
+) -> np.ndarray:
+    """
+    Ядрова оцінка щільності точок на сітці (binned KDE)
+
+    Точки накопичуються в клітинках сітки, після чого гістограма
+    згладжується гаусовим ядром через FFT: O(cells log cells) замість
+    O(points x cells) для scipy.stats.gaussian_kde. Ширина ядра задана
+    в км: по широті вона стала в клітинках, по довготі розширюється як
+    1 / cos(lat) для кожного рядка. Глобальна сітка загортається через 180°.
+    Ядро сепарабельне і площинне, тож вище ~80° хвости ядра відхиляються
+    від гаусового по великому колу на 10-25%.
+
+    Parameters:
+    -----------
+    points : gpd.GeoDataFrame
+        GeoDataFrame з точками
+    target_grid : tuple
+        Кортеж (lon_grid, lat_grid)
+    bandwidth_km : float
+        Стандартне відхилення гаусового ядра (км)
+    groups : np.ndarray, optional
+        Номер шару (0..n_groups-1) для кожної точки, напр. тиждень;
+        від'ємні значення відкидаються
+    n_groups : int, optional
+        Кількість шарів (за замовчуванням groups.max() + 1)
+
+    Returns:
+    --------
+    density : np.ndarray
+        Щільність (точок на км^2): (rows, cols) або куб
+        (n_groups, rows, cols) у float32, якщо задано groups
+    """
+    lon_grid, lat_grid = target_grid
+    lats = lat_grid[:, 0]
+    n_rows, n_cols = lon_grid.shape
+    dlon = lon_grid[0, 1] - lon_grid[0, 0]
+    dlat = lats[1] - lats[0]
+
+    # Сітка охоплює 360° (можливо, з дублем меридіана 180°)
+    period = int(round(360 / abs(dlon)))
+    period = period if n_cols >= period else None
+    width = period or n_cols
+
+    # Найближча клітинка для кожної точки
+    lon = points.geometry.x.values
+    lat = points.geometry.y.values
+    valid = valid_coordinate_mask(lon, lat)
+    col = np.rint((np.where(valid, lon, lon_grid[0, 0]) - lon_grid[0, 0]) / dlon).astype(np.int64)
+    row = np.rint((np.where(valid, lat, lats[0]) - lats[0]) / dlat).astype(np.int64)
+    if period is not None:
+        col %= period
+    valid &= (col >= 0) & (col < width) & (row >= 0) & (row < n_rows)
+
+    if groups is None:
+        layer = np.zeros(len(lon), dtype=np.int64)
+        n_layers = 1
+    else:
+        layer = np.asarray(groups, dtype=np.int64)
+        n_layers = n_groups if n_groups is not None else int(layer.max(initial=-1)) + 1
+        valid &= (layer >= 0) & (layer < n_layers)
+
+    cos_lat = np.maximum(np.cos(np.radians(lats)), 0.01)
+    sigma_lat = bandwidth_km / (KM_PER_DEGREE * abs(dlat))
+    sigma_lon = (bandwidth_km / (KM_PER_DEGREE * abs(dlon) * cos_lat))[:, None]
+    cell_area_km2 = (KM_PER_DEGREE ** 2 * abs(dlat * dlon) * cos_lat)[:, None]
+
+    density = np.zeros((n_layers, n_rows, n_cols), dtype=np.float64 if groups is None else np.float32)
+    columns = np.arange(n_cols) % width
+
+    # Шари обробляються порціями, щоб спектр не перевищував ~256 MB
+    chunk = max(1, (256 * 1024 ** 2) // (16 * 2 * n_rows * width))
+    for first in range(0, n_layers, chunk):
+        last = min(first + chunk, n_layers)
+        in_chunk = valid & (layer >= first) & (layer < last)
+
+        counts = np.zeros((last - first, n_rows, width))
+        np.add.at(counts, (layer[in_chunk] - first, row[in_chunk], col[in_chunk]), 1.0)
+
+        # Ширина ядра по довготі - за широтою рядка точки
+        smoothed = _gaussian_fft(counts, sigma_lon, axis=2, period=period)
+        smoothed = _gaussian_fft(smoothed, sigma_lat, axis=1)
+        density[first:last] = np.maximum(smoothed, 0)[:, :, columns] / cell_area_km2
+
+    return density[0] if groups is None else density
+
+
 def calculate_slope(
     elevation: Union[xr.DataArray, np.ndarray],
     resolution: float = 0.1
@@ -216,7 +852,8 @@ def calculate_gradient(
     # Розрахунок градієнтів
     pixel_size = resolution * 111  # км
 
-    dy, dx = np.gradient(arr, pixel_size)
+    # Градієнт по двох останніх (просторових) осях - підтримує кубики (time, lat, lon)
+    dy, dx = np.gradient(arr, pixel_size, axis=(-2, -1))
 
     # Магнітуда градієнту
     gradient_magnitude = np.sqrt(dx**2 + dy**2)
@@ -224,6 +861,35 @@ def calculate_gradient(
     return gradient_magnitude
 
 
+def valid_coordinate_mask(
+    lons: np.ndarray,
+    lats: np.ndarray
+) -> np.ndarray:
+    """
+    Маска коректних координат (скінченні, у межах WGS 84)
+
+    Parameters:
+    -----------
+    lons : np.ndarray
+        Довготи
+    lats : np.ndarray
+        Широти
+
+    Returns:
+    --------
+    mask : np.ndarray
+        Булевий масив: True для коректних пар координат
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+
+    return (
+        np.isfinite(lons) & np.isfinite(lats)
+        & (lons >= -180) & (lons <= 180)
+        & (lats >= -90) & (lats <= 90)
+    )
+
+
 def points_to_geodataframe(
     lons: np.ndarray,
     lats: np.ndarray,
@@ -233,6 +899,9 @@ def points_to_geodataframe(
     """
     Перетворити масиви координат у GeoDataFrame
 
+    Геометрія створюється векторно; для некоректних координат
+    (NaN, поза межами WGS 84) геометрія буде порожньою (None).
+
     Parameters:
     -----------
     lons : np.ndarray
@@ -248,7 +917,16 @@ def points_to_geodataframe(
     --------
     gdf : gpd.GeoDataFrame
     """
-    geometry = [Point(lon, lat) for lon, lat in zip(lons, lats)]
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+
+    valid = valid_coordinate_mask(lons, lats)
+    geometry = gpd.points_from_xy(
+        np.where(valid, lons, np.nan),
+        np.where(valid, lats, np.nan),
+        crs=crs
+    )
+    geometry[~valid] = None
 
     if data is None:
         data = {}
@@ -258,6 +936,59 @@ def points_to_geodataframe(
     return gdf
 
 
+def dataframe_to_geodataframe(
+    df: pd.DataFrame,
+    lon_column: str,
+    lat_column: str,
+    crs: str = "EPSG:4326",
+    drop_invalid: bool = True
+) -> gpd.GeoDataFrame:
+    """
+    Перетворити DataFrame з колонками координат у точковий GeoDataFrame
+
+    Координати конвертуються в числа та перевіряються в NumPy,
+    геометрія створюється одним векторним викликом.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Вхідні дані
+    lon_column : str
+        Назва колонки довготи
+    lat_column : str
+        Назва колонки широти
+    crs : str
+        Система координат
+    drop_invalid : bool
+        Видалити рядки з некоректними координатами.
+        Якщо False, такі рядки отримують порожню геометрію.
+
+    Returns:
+    --------
+    gdf : gpd.GeoDataFrame
+    """
+    lons = pd.to_numeric(df[lon_column], errors='coerce').to_numpy(dtype=float)
+    lats = pd.to_numeric(df[lat_column], errors='coerce').to_numpy(dtype=float)
+
+    valid = valid_coordinate_mask(lons, lats)
+    n_invalid = int((~valid).sum())
+
+    if drop_invalid and n_invalid:
+        logger.warning(f"Dropping {n_invalid} rows with missing or invalid coordinates")
+        df = df[valid]
+        lons, lats, valid = lons[valid], lats[valid], valid[valid]
+
+    geometry = gpd.points_from_xy(
+        np.where(valid, lons, np.nan),
+        np.where(valid, lats, np.nan),
+        crs=crs
+    )
+    if n_invalid and not drop_invalid:
+        geometry[~valid] = None
+
+    return gpd.GeoDataFrame(df, geometry=geometry, crs=crs)
+
+
 def raster_to_geotiff(
     data: np.ndarray,
     transform: rasterio.Affine,
@@ -309,9 +1040,45 @@ def raster_to_geotiff(
         dst.write(data)
 
 
+def geodesic_circles(
+    lon: np.ndarray,
+    lat: np.ndarray,
+    distance_km: float,
+    n_vertices: int = 64
+) -> np.ndarray:
+    """
+    Полігони точок на відстані distance_km по великому колу від центрів
+
+    Parameters:
+    -----------
+    lon, lat : np.ndarray
+        Центри (градуси)
+    distance_km : float
+        Радіус (км)
+    n_vertices : int
+        Кількість вершин кола
+
+    Returns:
+    --------
+    circles : np.ndarray
+        Масив shapely Polygon (довготи вершин не загортаються через 180°)
+    """
+    lon1 = np.radians(np.asarray(lon, dtype=float))[:, None]
+    lat1 = np.radians(np.asarray(lat, dtype=float))[:, None]
+    azimuth = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)[None, :]
+    delta = distance_km / EARTH_RADIUS_KM
+
+    lat2 = np.arcsin(np.sin(lat1) * np.cos(delta) + np.cos(lat1) * np.sin(delta) * np.cos(azimuth))
+    lon2 = lon1 + np.arctan2(np.sin(azimuth) * np.sin(delta) * np.cos(lat1),
+                             np.cos(delta) - np.sin(lat1) * np.sin(lat2))
+
+    return shapely.polygons(np.stack([np.degrees(lon2), np.degrees(lat2)], axis=-1))
+
+
 def buffer_points(
     points: gpd.GeoDataFrame,
-    distance_km: float
+    distance_km: float,
+    method: str = 'degrees'
 ) -> gpd.GeoDataFrame:
     """
     Створити буфер навколо точок
@@ -322,18 +1089,29 @@ def buffer_points(
         Точки
     distance_km : float
         Відстань буферу в кілометрах
+    method : str
+        'degrees' - коло в градусах (1° ≈ 111 км по обох осях, тож
+        на 45° пн.ш. буфер по довготі завужений на ~30%);
+        'geodesic' - коло по великому колу (geodesic_circles)
 
     Returns:
     --------
     buffered : gpd.GeoDataFrame
         GeoDataFrame з буферами
     """
-    # Перепроєктувати в метричну систему для точних буферів
-    # Використаємо UTM або аналог
+    buffered = points.copy()
+
+    if method == 'geodesic':
+        buffered['geometry'] = geodesic_circles(
+            points.geometry.x.values, points.geometry.y.values, distance_km
+        )
+        return buffered
+
+    if method != 'degrees':
+        raise ValueError(f"Unknown buffer method: {method}")
+
     # Для спрощення: 1 градус ≈ 111 км
     distance_degrees = distance_km / 111.0
-
-    buffered = points.copy()
     buffered['geometry'] = points.geometry.buffer(distance_degrees)
 
     return buffered
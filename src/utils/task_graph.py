@@ -0,0 +1,290 @@
+"""
+Task graph executor for Shark Voyager AI project
+Виконання задач pipeline як графа залежностей (DAG) на пулі потоків
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    """
+    Вузол графа: функція, її залежності та результат виконання
+    """
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                 deps: Iterable[str] = (), source: Optional[str] = None):
+        """
+        Parameters:
+        -----------
+        name : str
+            Унікальна назва задачі (напр., 'standardize.sst')
+        func : callable
+            func(inputs) - inputs є словником {назва залежності: результат}
+        deps : iterable of str
+            Назви задач, які мають успішно завершитися раніше
+        source : str, optional
+            Група для обмеження паралельності (напр., 'earthdata', 'processing').
+            Задачі без групи обмежені лише розміром пулу.
+        """
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.source = source
+
+        # Результати виконання
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Тривалість виконання у секундах"""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class TaskGraph:
+    """
+    Планувальник задач із залежностями
+
+    Задача запускається, щойно всі її залежності успішно завершились,
+    є вільний потік і місце в ліміті її групи. Так обробка шару
+    починається одразу після завантаження його даних, паралельно з
+    іншими завантаженнями. Якщо задача падає, усі залежні від неї
+    задачі позначаються 'skipped', а незалежні гілки продовжуються.
+    """
+
+    def __init__(self, max_workers: int = 4, source_limits: Optional[Dict[str, int]] = None):
+        """
+        Parameters:
+        -----------
+        max_workers : int
+            Загальна кількість потоків
+        source_limits : dict, optional
+            Ліміти паралельності для груп {source: max_concurrent}.
+            Групи без ліміту отримують 1.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.source_limits = dict(source_limits or {})
+        self.tasks: Dict[str, Task] = {}
+        self.wall_time = None
+
+    def add_task(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                 deps: Iterable[str] = (), source: Optional[str] = None) -> Task:
+        """
+        Додати задачу
+
+        Залежності можуть посилатися на задачі, додані пізніше;
+        граф перевіряється перед запуском.
+
+        Returns:
+        --------
+        task : Task
+        """
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+
+        task = Task(name, func, deps, source)
+        self.tasks[name] = task
+        return task
+
+    def _source_limit(self, source: Optional[str]) -> int:
+        if source is None:
+            return self.max_workers
+        return max(1, int(self.source_limits.get(source, 1)))
+
+    def topological_order(self) -> List[str]:
+        """
+        Порядок задач, сумісний із залежностями (алгоритм Кана)
+
+        Raises:
+        -------
+        ValueError: невідома залежність або цикл
+        """
+        for task in self.tasks.values():
+            unknown = [dep for dep in task.deps if dep not in self.tasks]
+            if unknown:
+                raise ValueError(f"Task {task.name} depends on unknown tasks: {unknown}")
+
+        remaining = {name: len(set(task.deps)) for name, task in self.tasks.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        for task in self.tasks.values():
+            for dep in set(task.deps):
+                dependents[dep].append(task.name)
+
+        # Зберегти порядок додавання серед готових задач
+        ready = [name for name in self.tasks if remaining[name] == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in dependents[name]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(self.tasks):
+            cycle = sorted(name for name in self.tasks if name not in order)
+            raise ValueError(f"Dependency cycle between tasks: {cycle}")
+
+        return order
+
+    def _run_task(self, task: Task) -> Task:
+        logger.info(f"[{task.name}] started")
+        inputs = {dep: self.tasks[dep].result for dep in task.deps}
+        task.started = time.perf_counter()
+        try:
+            task.result = task.func(inputs)
+            task.status = 'ok'
+        except Exception as e:
+            task.error = e
+            task.status = 'failed'
+            logger.error(f"[{task.name}] failed: {e}")
+        finally:
+            task.finished = time.perf_counter()
+
+        if task.status == 'ok':
+            logger.info(f"[{task.name}] finished in {task.duration:.1f}s")
+
+        return task
+
+    def _skip_dependents(self, failed: Task, pending: List[Task]):
+        """Позначити 'skipped' усі задачі, що транзитивно залежать від failed"""
+        blocked = {failed.name}
+        changed = True
+        while changed:
+            changed = False
+            for task in list(pending):
+                if any(dep in blocked for dep in task.deps):
+                    task.status = 'skipped'
+                    task.error = f"dependency {failed.name} {failed.status}"
+                    blocked.add(task.name)
+                    pending.remove(task)
+                    changed = True
+                    logger.warning(f"[{task.name}] skipped: {task.error}")
+
+    def run(self) -> Dict[str, Task]:
+        """
+        Виконати граф
+
+        Returns:
+        --------
+        tasks : dict
+            Словник {name: Task} з результатами та таймінгами
+        """
+        order = self.topological_order()
+        pending = [self.tasks[name] for name in order if self.tasks[name].status == 'pending']
+        running = {}
+        active_per_source: Dict[Optional[str], int] = {}
+
+        logger.info(f"Running {len(pending)} tasks on {self.max_workers} workers")
+        wall_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="task") as executor:
+            while pending or running:
+                # Запустити все готове, що дозволяють ліміти
+                for task in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    if any(self.tasks[dep].status != 'ok' for dep in task.deps):
+                        continue
+                    active = active_per_source.get(task.source, 0)
+                    if active >= self._source_limit(task.source):
+                        continue
+
+                    pending.remove(task)
+                    task.status = 'running'
+                    active_per_source[task.source] = active + 1
+                    running[executor.submit(self._run_task, task)] = task
+
+                if not running:
+                    # Залишились лише задачі із заблокованими залежностями
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    task = running.pop(future)
+                    active_per_source[task.source] -= 1
+                    if task.status != 'ok':
+                        self._skip_dependents(task, pending)
+
+        self.wall_time = time.perf_counter() - wall_start
+
+        return dict(self.tasks)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Підсумок виконання
+
+        Returns:
+        --------
+        rows : list
+            Список словників: name, source, deps, status, duration_s, error
+        """
+        return [
+            {
+                'name': task.name,
+                'source': task.source,
+                'deps': task.deps,
+                'status': task.status,
+                'duration_s': task.duration,
+                'error': str(task.error) if task.error else None
+            }
+            for task in self.tasks.values()
+        ]
+
+    def critical_path(self) -> List[str]:
+        """Найдовший за тривалістю ланцюжок залежностей виконаних задач"""
+        longest: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+
+        for name in self.topological_order():
+            task = self.tasks[name]
+            best = max(task.deps, key=lambda dep: longest[dep], default=None)
+            longest[name] = (task.duration or 0) + (longest[best] if best else 0)
+            previous[name] = best
+
+        if not longest:
+            return []
+
+        name = max(longest, key=longest.get)
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1]
+
+    def log_summary(self):
+        """Вивести підсумок у лог"""
+        logger.info("-" * 70)
+        logger.info(f"{'Task':<32}{'Source':<14}{'Status':<10}{'Time, s':>10}")
+        logger.info("-" * 70)
+
+        for row in self.summary():
+            duration = f"{row['duration_s']:.1f}" if row['duration_s'] is not None else "-"
+            logger.info(
+                f"{row['name']:<32}{(row['source'] or '-'):<14}{row['status']:<10}{duration:>10}"
+            )
+
+        serial_time = sum(task.duration or 0 for task in self.tasks.values())
+        logger.info("-" * 70)
+        if self.wall_time:
+            logger.info(
+                f"Wall time: {self.wall_time:.1f}s, serial time: {serial_time:.1f}s "
+                f"(x{serial_time / self.wall_time:.1f} overlap)"
+            )
+        logger.info(f"Critical path: {' -> '.join(self.critical_path())}")
+
+        failed = [task.name for task in self.tasks.values() if task.status == 'failed']
+        if failed:
+            logger.warning(f"Failed tasks: {', '.join(failed)}")
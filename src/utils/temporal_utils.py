@@ -7,7 +7,7 @@ import pandas as pd
 import xarray as xr
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Union, Tuple
+from typing import List, Union, Tuple
 
 
 def aggregate_to_weekly(
@@ -235,6 +235,45 @@ def create_weekly_dates(
     return dates
 
 
+def split_date_range(
+    start_date: str,
+    end_date: str,
+    freq: str = 'MS'
+) -> List[Tuple[str, str]]:
+    """
+    Розбити діапазон дат на послідовні вікна
+
+    Parameters:
+    -----------
+    start_date : str
+        Початкова дата (формат: 'YYYY-MM-DD')
+    end_date : str
+        Кінцева дата (формат: 'YYYY-MM-DD'), включно
+    freq : str
+        Частота початків вікон pandas ('MS' - місяці, 'QS' - квартали, ...)
+
+    Returns:
+    --------
+    windows : list of tuple
+        [(start, end), ...] у форматі 'YYYY-MM-DD', кінець включно
+    """
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+
+    bounds = pd.date_range(start=start, end=end, freq=freq)
+    starts = [start] + [b for b in bounds if b > start]
+
+    windows = []
+    for i, window_start in enumerate(starts):
+        if i + 1 < len(starts):
+            window_end = starts[i + 1] - pd.Timedelta(days=1)
+        else:
+            window_end = end
+        windows.append((window_start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+
+    return windows
+
+
 def interpolate_to_weekly(
     data: xr.DataArray,
     start_date: str,